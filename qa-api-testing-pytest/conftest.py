@@ -1,38 +1,225 @@
 """
 Pytest configuration and fixtures for API tests.
 """
+import os
+
 import pytest
 import requests
 from typing import Generator
 
+from utils.async_api_client import DEFAULT_MAX_CONCURRENCY, AsyncAPIClient
+from utils.cassette import RECORD_MODES, use_cassette
+from utils.fuzz import DEFAULT_CASES, DEFAULT_CONCURRENCY, DEFAULT_TIME_BUDGET, Fuzzer
+from utils.http_session import (
+    DEFAULT_POOL_MAXSIZE,
+    create_pooled_session,
+    isolated_session,
+    warm_up,
+)
+from utils.json_codec import CODEC_NAMES, set_default_codec
+from utils.local_server import LocalAPIServer
+from utils.response_cache import DEFAULT_MAX_ENTRIES, DEFAULT_TTL, ResponseCache, use_response_cache
+from utils.transport import TRANSPORTS, create_transport, mount_transport
+
+
+pytest_plugins = [
+    "qa_plugins.coverage_map",
+    "qa_plugins.profiling",
+    "qa_plugins.results",
+    "qa_plugins.scheduling",
+    "utils.latency_budget",
+    "utils.load",
+    "utils.timings",
+]
+
+
+def pytest_addoption(parser):
+    """Register command line options for the API suite."""
+    group = parser.getgroup("api", "API client options")
+    group.addoption("--api-pool-size", type=int, default=DEFAULT_POOL_MAXSIZE,
+                    help="Maximum pooled connections per host (default: %(default)s)")
+    group.addoption("--api-no-keepalive", action="store_true", default=False,
+                    help="Close connections after every request instead of keeping them alive")
+    group.addoption("--api-concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY,
+                    help="Maximum concurrent requests for async_api_client (default: %(default)s)")
+    group.addoption("--local-server", action="store_true", default=False,
+                    help="Run against the in-process JSONPlaceholder stand-in instead of the public API")
+    group.addoption("--record-mode", choices=RECORD_MODES, default="off",
+                    help="Cassette mode for recording/replaying API traffic (default: %(default)s)")
+    group.addoption("--cassette-dir", default="cassettes",
+                    help="Directory of the recorded cassette store (default: %(default)s)")
+    group.addoption("--api-transport", choices=TRANSPORTS, default="http1",
+                    help="HTTP transport: pooled HTTP/1.1 or multiplexed HTTP/2 (default: %(default)s)")
+    group.addoption("--json-codec", choices=CODEC_NAMES, default="auto",
+                    help="JSON codec for request bodies and response.json() (default: %(default)s)")
+    group.addoption("--api-cache", action="store_true", default=False,
+                    help="Cache GET responses across tests (invalidated by writes to the same resource)")
+    group.addoption("--api-cache-ttl", type=float, default=DEFAULT_TTL,
+                    help="Seconds a cached response is served before revalidation (default: %(default)s)")
+    group.addoption("--api-cache-size", type=int, default=DEFAULT_MAX_ENTRIES,
+                    help="Maximum number of cached responses (default: %(default)s)")
+    group.addoption("--api-cache-file", default=None,
+                    help="SQLite file to share the response cache between xdist workers")
+
+    group = parser.getgroup("fuzz", "Contract fuzzing")
+    group.addoption("--fuzz", action="store_true", default=False,
+                    help="Run the tests marked 'fuzz' (skipped otherwise)")
+    group.addoption("--fuzz-cases", type=int, default=DEFAULT_CASES,
+                    help="Maximum cases per fuzzed resource (default: %(default)s)")
+    group.addoption("--fuzz-time", type=float, default=DEFAULT_TIME_BUDGET,
+                    help="Seconds spent sending cases per fuzzed resource (default: %(default)s)")
+    group.addoption("--fuzz-seed", type=int, default=None,
+                    help="Random seed, to reproduce a previous run (reported with failures)")
+    group.addoption("--fuzz-concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                    help="Cases in flight at once (default: %(default)s)")
+
+
+def pytest_configure(config):
+    """Check the codec and transport and start every run with an empty shared response cache."""
+    try:
+        set_default_codec(config.getoption("--json-codec"))
+    except ImportError as error:
+        raise pytest.UsageError(f"--json-codec={config.getoption('--json-codec')} is not installed: {error}")
+    if config.getoption("--api-transport") == "http2":
+        try:
+            create_transport("http2").close()
+        except ImportError as error:
+            raise pytest.UsageError(f"--api-transport=http2 requires httpx[http2]: {error}")
+    cache_file = config.getoption("--api-cache-file")
+    if config.getoption("--api-cache") and cache_file and not hasattr(config, "workerinput"):
+        for path in (cache_file, f"{cache_file}-wal", f"{cache_file}-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip the fuzz tests unless --fuzz is given."""
+    if config.getoption("--fuzz"):
+        return
+    skip = pytest.mark.skip(reason="fuzz test, run with --fuzz")
+    for item in items:
+        if item.get_closest_marker("fuzz") is not None:
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope="session")
+def local_server() -> Generator:
+    """
+    In-process JSONPlaceholder stand-in on an ephemeral port.
+
+    Started once per pytest process (i.e. per xdist worker).
+
+    Yields:
+        LocalAPIServer: Running server
+    """
+    server = LocalAPIServer().start()
+
+    yield server
+
+    server.stop()
+
 
 @pytest.fixture(scope="session")
-def base_url() -> str:
-    """Base URL for the API under test."""
+def base_url(request) -> str:
+    """Base URL for the API under test (the local stand-in with --local-server)."""
+    if request.config.getoption("--local-server"):
+        return request.getfixturevalue("local_server").base_url
     return "https://jsonplaceholder.typicode.com"
 
 
+@pytest.fixture(scope="session")
+def http_session(request, base_url: str, timeout: int) -> Generator:
+    """
+    Pooled session shared by all tests of a worker.
+
+    The session is created (and its pool warmed up) once per pytest
+    process, i.e. once per xdist worker. ``--api-transport=http2``
+    multiplexes its requests over HTTP/2. With ``--record-mode`` other
+    than ``off``, traffic goes through the cassette in ``--cassette-dir``;
+    with ``--api-cache``, GET responses are cached in front of it.
+
+    Yields:
+        requests.Session: Session with a pooled, keep-alive adapter
+    """
+    session = create_pooled_session(
+        pool_maxsize=request.config.getoption("--api-pool-size"),
+        keepalive=not request.config.getoption("--api-no-keepalive")
+    )
+    if request.config.getoption("--api-transport") != "http1":
+        mount_transport(session, create_transport(request.config.getoption("--api-transport")))
+    record_mode = request.config.getoption("--record-mode")
+    cassette = None
+    if record_mode != "off":
+        cassette = use_cassette(session, request.config.getoption("--cassette-dir"), record_mode)
+    cache = None
+    if request.config.getoption("--api-cache"):
+        cache = use_response_cache(session, ResponseCache(
+            ttl=request.config.getoption("--api-cache-ttl"),
+            max_entries=request.config.getoption("--api-cache-size"),
+            path=request.config.getoption("--api-cache-file")
+        ))
+    if record_mode != "replay":
+        warm_up(session, base_url, timeout=timeout)
+
+    yield session
+
+    session.close()
+    if cassette is not None:
+        cassette.close()
+    if cache is not None:
+        cache.close()
+
+
 @pytest.fixture(scope="function")
-def api_client(base_url: str) -> Generator:
+def api_client(http_session: requests.Session) -> Generator:
     """
     API client fixture that provides a requests session.
-    
+
+    The worker's pooled session is shared between tests; headers, cookies
+    and auth changed by a test are restored when the test finishes.
+
     Yields:
         requests.Session: Configured session object
     """
-    session = requests.Session()
-    session.headers.update({
-        "Content-Type": "application/json",
-        "Accept": "application/json"
-    })
-    
-    yield session
-    
-    session.close()
+    with isolated_session(http_session) as session:
+        yield session
 
 
-@pytest.fixture
+@pytest.fixture(scope="function")
+def async_api_client(request, api_client: requests.Session, base_url: str) -> Generator:
+    """
+    Async API client fixture for concurrent fan-out from sync tests.
+
+    The client shares the worker's pooled session. Use ``run`` to drive
+    its coroutines, e.g.
+    ``async_api_client.run(async_api_client.map(fetch, ids))``.
+
+    Yields:
+        AsyncAPIClient: Client bound to base_url
+    """
+    client = AsyncAPIClient(base_url, api_client,
+                            max_concurrency=request.config.getoption("--api-concurrency"))
+
+    yield client
+
+    client.close()
+
+
+@pytest.fixture(scope="function")
+def fuzzer(request, base_url: str, timeout: int) -> Fuzzer:
+    """
+    Contract fuzzer configured from the --fuzz-* options.
+
+    Returns:
+        Fuzzer for base_url
+    """
+    return Fuzzer(base_url, concurrency=request.config.getoption("--fuzz-concurrency"),
+                  timeout=timeout, seed=request.config.getoption("--fuzz-seed"),
+                  max_cases=request.config.getoption("--fuzz-cases"),
+                  time_budget=request.config.getoption("--fuzz-time"))
+
+
+@pytest.fixture(scope="session")
 def timeout() -> int:
     """Default timeout for API requests in seconds."""
     return 10
-
@@ -2,7 +2,14 @@
 API test cases for JSONPlaceholder posts endpoints.
 """
 import pytest
-from utils.api_client import APIClient
+from utils.api_client import (
+    APIClient,
+    validate_list_response,
+    validate_list_response_stream,
+    validate_post_schema,
+)
+from utils.schema import POST_SCHEMA
+from utils.streaming import JSONStreamError, iter_json_array
 
 
 @pytest.mark.get
@@ -14,7 +21,7 @@ def test_get_list_posts_returns_200_and_schema(api_client, base_url, timeout):
     - Status code is 200 (OK)
     - Response is a JSON array
     - Array contains at least one post
-    - First post has required fields with correct data types
+    - Every post has required fields with correct data types
     """
     client = APIClient(base_url, api_client)
     response = client.get("posts", timeout=timeout)
@@ -27,16 +34,53 @@ def test_get_list_posts_returns_200_and_schema(api_client, base_url, timeout):
     assert isinstance(response_data, list), "Response should be a list"
     assert len(response_data) > 0, "Response should contain at least one post"
     
-    # Validate first post schema (check required fields and types)
-    first_post = response_data[0]
-    assert "id" in first_post, "Post should contain 'id' field"
-    assert isinstance(first_post["id"], int), "Post 'id' should be an integer"
-    assert "title" in first_post, "Post should contain 'title' field"
-    assert isinstance(first_post["title"], str), "Post 'title' should be a string"
-    assert "body" in first_post, "Post should contain 'body' field"
-    assert isinstance(first_post["body"], str), "Post 'body' should be a string"
-    assert "userId" in first_post, "Post should contain 'userId' field"
-    assert isinstance(first_post["userId"], int), "Post 'userId' should be an integer"
+    # Validate schema of every post (check required fields and types)
+    validate_list_response(response_data, item_schema=POST_SCHEMA, label="Post")
+
+
+@pytest.mark.get
+def test_stream_list_posts_validates_every_post(api_client, base_url, timeout):
+    """
+    Test GET /posts validated element by element while the body streams in.
+    
+    This test verifies:
+    - Status code is 200 (OK)
+    - Every streamed post has required fields with correct data types
+    - All 100 posts are received
+    """
+    client = APIClient(base_url, api_client)
+    response = client.stream("posts", timeout=timeout)
+    
+    # Verify HTTP status code
+    assert response.status_code == 200, f"Expected 200, got {response.status_code}"
+    
+    # Validate each post as it is decoded, without buffering the whole body
+    post_count = validate_list_response_stream(response, item_schema=POST_SCHEMA, label="Post")
+    assert post_count == 100, f"Expected 100 posts, got {post_count}"
+
+
+@pytest.mark.negative
+def test_stream_malformed_post_fails_before_reading_rest_of_body():
+    """
+    Test a malformed element in a streamed body fails fast.
+    
+    This test verifies:
+    - The elements before the malformed one are yielded
+    - JSONStreamError is raised without reading the remaining chunks
+    """
+    chunks_read = []
+    
+    def chunks():
+        yield b'[{"id": 1}, {"id": 2, "title": tx}, '
+        for index in range(2000):
+            chunks_read.append(index)
+            yield b'{"id": 3}, ' * 1000
+    
+    posts = iter_json_array(chunks())
+    assert next(posts) == {"id": 1}, "Element before the malformed one should be yielded"
+    with pytest.raises(JSONStreamError):
+        next(posts)
+    assert len(chunks_read) <= 2, f"Should fail after a few chunks, read {len(chunks_read)}"
 
 
 @pytest.mark.get
@@ -64,14 +108,7 @@ def test_get_single_post_returns_expected_id_and_fields(api_client, base_url, ti
         f"Expected post id {post_id}, got {post_data['id']}"
     
     # Verify required fields with correct types
-    assert "title" in post_data, "Post data should contain 'title' field"
-    assert isinstance(post_data["title"], str), "Title should be a string"
-    
-    assert "body" in post_data, "Post data should contain 'body' field"
-    assert isinstance(post_data["body"], str), "Body should be a string"
-    
-    assert "userId" in post_data, "Post data should contain 'userId' field"
-    assert isinstance(post_data["userId"], int), "UserId should be an integer"
+    validate_post_schema(post_data)
 
 
 @pytest.mark.negative
@@ -92,3 +129,61 @@ def test_get_non_existing_post_returns_404(api_client, base_url, timeout):
     # Verify HTTP status code (404 = Not Found)
     assert response.status_code == 404, \
         f"Expected 404 for non-existing post, got {response.status_code}"
+
+
+@pytest.mark.negative
+@pytest.mark.fuzz
+def test_fuzz_posts_contract(fuzzer, base_url):
+    """
+    Fuzz the /posts endpoints with cases derived from the post schema.
+    
+    This test verifies, for every generated case:
+    - No 5xx response or transport error
+    - Existing posts are returned with 200 and match the schema, unknown ids get a 4xx
+    - Successful writes echo the sent fields
+    """
+    report = fuzzer.run("posts")
+    
+    # Every distinct violation is reported once, with a shrunk reproducer
+    assert not report.findings, \
+        f"{len(report.findings)} contract violation(s) in {report.stats()} (seed {fuzzer.seed}):\n" + \
+        "\n".join(finding.describe(base_url) for finding in report.findings)
+
+
+@pytest.mark.get
+@pytest.mark.regression
+def test_get_all_posts_concurrently_returns_expected_ids(async_api_client, timeout):
+    """Test GET /posts/{id} for all 100 posts, fanned out concurrently in one batch."""
+    post_ids = list(range(1, 101))
+    
+    async def fetch_post(post_id):
+        return await async_api_client.get(f"posts/{post_id}", timeout=timeout)
+    
+    responses = async_api_client.run(async_api_client.map(fetch_post, post_ids))
+    
+    # Verify every request succeeded and returned the requested post
+    for post_id, response in zip(post_ids, responses):
+        assert response.status_code == 200, \
+            f"Expected 200 for post {post_id}, got {response.status_code}"
+        assert response.json()["id"] == post_id, f"Expected post id {post_id}"
+
+
+@pytest.mark.get
+@pytest.mark.regression
+def test_paginate_posts_returns_every_post_in_order(api_client, base_url, timeout):
+    """
+    Test walking GET /posts page by page with concurrent prefetch.
+    
+    This test verifies:
+    - Pages of 7 posts are walked until the last (short) page
+    - All 100 posts are yielded once, in id order
+    - Every post has required fields with correct data types
+    """
+    client = APIClient(base_url, api_client)
+    posts = list(client.paginate("posts", page_size=7, prefetch=4, timeout=timeout))
+    
+    # Verify the whole collection was walked in order
+    assert [post["id"] for post in posts] == list(range(1, 101)), "Expected posts 1..100 in order"
+    
+    # Validate schema of every post
+    validate_list_response(posts, item_schema=POST_SCHEMA, label="Post")
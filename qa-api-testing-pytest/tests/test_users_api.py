@@ -2,7 +2,8 @@
 API test cases for JSONPlaceholder users endpoints.
 """
 import pytest
-from utils.api_client import APIClient
+from utils.api_client import APIClient, validate_list_response, validate_user_schema
+from utils.schema import USER_SCHEMA
 
 
 @pytest.mark.smoke
@@ -15,7 +16,7 @@ def test_get_list_users_returns_200_and_schema(api_client, base_url, timeout):
     - Status code is 200 (OK)
     - Response is a JSON array
     - Array contains at least one user
-    - First user has required fields with correct data types
+    - Every user has required fields with correct data types
     """
     client = APIClient(base_url, api_client)
     response = client.get("users", timeout=timeout)
@@ -28,19 +29,13 @@ def test_get_list_users_returns_200_and_schema(api_client, base_url, timeout):
     assert isinstance(response_data, list), "Response should be a list"
     assert len(response_data) > 0, "Response should contain at least one user"
     
-    # Validate first user schema (check required fields and types)
-    first_user = response_data[0]
-    assert "id" in first_user, "User should contain 'id' field"
-    assert isinstance(first_user["id"], int), "User 'id' should be an integer"
-    assert "name" in first_user, "User should contain 'name' field"
-    assert isinstance(first_user["name"], str), "User 'name' should be a string"
-    assert "email" in first_user, "User should contain 'email' field"
-    assert isinstance(first_user["email"], str), "User 'email' should be a string"
-    assert "username" in first_user, "User should contain 'username' field"
+    # Validate schema of every user (check required fields and types)
+    validate_list_response(response_data, item_schema=USER_SCHEMA, label="User")
 
 
 @pytest.mark.smoke
 @pytest.mark.get
+@pytest.mark.latency_budget(p95=0.5, p99=1.0, samples=10, concurrency=5)
 @pytest.mark.parametrize("user_id", [1, 2, 3])
 def test_get_single_user_returns_expected_id_and_fields(api_client, base_url, timeout, user_id):
     """Test GET single user returns expected id and fields."""
@@ -57,12 +52,7 @@ def test_get_single_user_returns_expected_id_and_fields(api_client, base_url, ti
     assert user_data["id"] == user_id, f"Expected user id {user_id}, got {user_data['id']}"
     
     # Validate required fields
-    assert "name" in user_data, "User data should contain 'name' field"
-    assert isinstance(user_data["name"], str), "Name should be a string"
-    assert "email" in user_data, "User data should contain 'email' field"
-    assert isinstance(user_data["email"], str), "Email should be a string"
-    assert "username" in user_data, "User data should contain 'username' field"
-    assert isinstance(user_data["username"], str), "Username should be a string"
+    validate_user_schema(user_data)
 
 
 @pytest.mark.smoke
@@ -107,6 +97,36 @@ def test_post_create_user_returns_201_and_created_object(api_client, base_url, t
         f"Email should match input: {new_user['email']}"
 
 
+@pytest.mark.post
+@pytest.mark.regression
+def test_bulk_create_users_returns_201_for_every_item(api_client, base_url, timeout):
+    """
+    Test POST /users for a batch of users sent concurrently with APIClient.bulk.
+    
+    This test verifies:
+    - Every item of the batch returns 201 (Created)
+    - Results are returned in input order
+    - Each created user echoes its submitted fields
+    """
+    client = APIClient(base_url, api_client)
+    new_users = [
+        {"name": f"Bulk User {index}", "username": f"bulkuser{index}", "email": f"bulk.user{index}@example.com"}
+        for index in range(20)
+    ]
+    
+    result = client.bulk((("POST", "users", user) for user in new_users), concurrency=8, timeout=timeout)
+    
+    # Verify every operation succeeded
+    assert not result.failures, "Bulk create failed:\n" + "\n".join(item.describe() for item in result.failures)
+    assert result.stats()["succeeded"] == len(new_users), "Every user should be created"
+    
+    # Verify results are in input order and echo the submitted data
+    for user, item in zip(new_users, result):
+        assert item.status_code == 201, f"Expected 201, got {item.status_code}"
+        assert item.response.json()["email"] == user["email"], \
+            f"Email should match input: {user['email']}"
+
+
 @pytest.mark.put
 def test_put_update_user_returns_200_and_updated_fields(api_client, base_url, timeout):
     """
@@ -163,3 +183,40 @@ def test_get_non_existing_user_returns_404(api_client, base_url, timeout):
     # Verify HTTP status code (404 = Not Found)
     assert response.status_code == 404, \
         f"Expected 404 for non-existing user, got {response.status_code}"
+
+
+@pytest.mark.negative
+@pytest.mark.fuzz
+def test_fuzz_users_contract(fuzzer, base_url):
+    """
+    Fuzz the /users endpoints with cases derived from the user schema.
+    
+    This test verifies, for every generated case:
+    - No 5xx response or transport error
+    - Existing users are returned with 200 and match the schema, unknown ids get a 4xx
+    - Successful writes echo the sent fields
+    """
+    report = fuzzer.run("users")
+    
+    # Every distinct violation is reported once, with a shrunk reproducer
+    assert not report.findings, \
+        f"{len(report.findings)} contract violation(s) in {report.stats()} (seed {fuzzer.seed}):\n" + \
+        "\n".join(finding.describe(base_url) for finding in report.findings)
+
+
+@pytest.mark.get
+@pytest.mark.regression
+def test_get_all_users_concurrently_returns_expected_ids(async_api_client, timeout):
+    """Test GET /users/{id} for every user, fanned out concurrently in one batch."""
+    user_ids = list(range(1, 11))
+    
+    async def fetch_user(user_id):
+        return await async_api_client.get(f"users/{user_id}", timeout=timeout)
+    
+    responses = async_api_client.run(async_api_client.map(fetch_user, user_ids))
+    
+    # Verify every request succeeded and returned the requested user
+    for user_id, response in zip(user_ids, responses):
+        assert response.status_code == 200, \
+            f"Expected 200 for user {user_id}, got {response.status_code}"
+        assert response.json()["id"] == user_id, f"Expected user id {user_id}"
@@ -1,23 +1,156 @@
 """
 API client helper utilities.
 """
+import functools
+import time
 import requests
-from typing import Dict, Any, Optional
+from requests.adapters import BaseAdapter
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Union
+
+from utils import instrumentation
+from utils.bulk import (
+    DEFAULT_BACKOFF,
+    DEFAULT_BULK_CONCURRENCY,
+    DEFAULT_RETRIES,
+    BulkResult,
+    WriteOperation,
+    run_bulk,
+)
+from utils.cassette import use_cassette
+from utils.http_session import create_pooled_session
+from utils.json_codec import JSONCodec, get_codec
+from utils.pagination import DEFAULT_PREFETCH, iter_pages, parse_page
+from utils.response_cache import ResponseCache, use_response_cache
+from utils.schema import POST_SCHEMA, USER_SCHEMA, assert_no_errors, compile_schema, validate_items
+from utils.streaming import DEFAULT_CHUNK_SIZE, iter_response_items
+from utils.transport import create_transport, mount_transport
 
 
 class APIClient:
     """Helper class for API operations."""
     
-    def __init__(self, base_url: str, session: Optional[requests.Session] = None):
+    def __init__(self, base_url: str, session: Optional[requests.Session] = None,
+                 cassette: Optional[str] = None, record_mode: str = "new_episodes",
+                 cache: Optional[ResponseCache] = None, codec: Union[str, JSONCodec, None] = None,
+                 transport: Union[str, BaseAdapter, None] = None):
         """
         Initialize API client.
         
+        A transport, cassette or cache mounted on a shared session (e.g. the
+        ``api_client`` fixture's) is removed again when the test's
+        isolated_session() ends.
+        
         Args:
             base_url: Base URL for the API
-            session: Optional requests session (creates new if not provided)
+            session: Optional requests session (creates a pooled session if not provided)
+            cassette: Optional cassette directory to record/replay requests with
+            record_mode: Cassette mode: record, replay, new_episodes or off
+            cache: Optional response cache for GET requests (invalidated by writes)
+            codec: JSON codec or codec name (auto, orjson, msgspec, stdlib) for
+                   request bodies and response.json() (default: see json_codec.set_default_codec)
+            transport: Optional transport ("http1", "http2" or a requests adapter) to mount
+                       on the session (default: keep the session's transport)
         """
         self.base_url = base_url.rstrip("/")
-        self.session = session or requests.Session()
+        self.session = session or create_pooled_session()
+        if transport is not None:
+            # A shared session's adapter is restored by isolated_session(), so it must stay open
+            mount_transport(self.session, create_transport(transport) if isinstance(transport, str) else transport,
+                            close_previous=session is None)
+        self.cassette = use_cassette(self.session, cassette, record_mode) if cassette else None
+        self.cache = use_response_cache(self.session, cache) if cache is not None else None
+        self.codec = codec if isinstance(codec, JSONCodec) else get_codec(codec)
+    
+    def _url(self, endpoint: str) -> str:
+        return f"{self.base_url}/{endpoint.lstrip('/')}"
+    
+    def _encode_json(self, kwargs: Dict[str, Any]) -> None:
+        body = kwargs.pop("json", None)
+        if body is not None and kwargs.get("data") is None:
+            kwargs["data"] = self.codec.dumps(body)
+            kwargs["headers"] = {"Content-Type": "application/json", **(kwargs.get("headers") or {})}
+    
+    def _decode_json(self, response: requests.Response):
+        decode_json = response.json
+        
+        def codec_json(**json_kwargs):
+            # Keyword arguments are stdlib json.loads() options; only requests supports them
+            if json_kwargs:
+                return decode_json(**json_kwargs)
+            return self.codec.decode_response(response)
+        
+        return codec_json
+    
+    def _send_direct(self, method: str, url: str, kwargs: Dict[str, Any]) -> requests.Response:
+        """Send a request straight through the transport: no cassette, cache, hooks or observers."""
+        send_kwargs = {name: kwargs.get(name) for name in ("timeout", "proxies", "cert")}
+        send_kwargs["verify"] = kwargs.get("verify", self.session.verify)
+        request_kwargs = {name: value for name, value in kwargs.items()
+                          if name not in ("timeout", "proxies", "cert", "verify", "allow_redirects")}
+        request = self.session.prepare_request(requests.Request(method, url, **request_kwargs))
+        adapter = self.session.get_adapter(url)
+        # Cassette and cache adapters wrap the transport as ``inner``
+        while hasattr(adapter, "inner"):
+            adapter = adapter.inner
+        return adapter.send(request, stream=True, **send_kwargs)
+    
+    def request(self, method: str, endpoint: str, stream: bool = False, **kwargs) -> requests.Response:
+        """
+        Perform a request, reporting its timings to registered observers.
+        
+        A ``json`` body is encoded and ``response.json()`` decoded with the
+        client's codec.
+        
+        Args:
+            method: HTTP method
+            endpoint: API endpoint (relative to base_url)
+            stream: Whether to defer downloading the response body
+            **kwargs: Further arguments for requests.Session.request
+            
+        Returns:
+            Response object
+        """
+        url = self._url(endpoint)
+        self._encode_json(kwargs)
+        if not instrumentation.has_observers():
+            response = self.session.request(method, url, stream=stream, **kwargs)
+            response.json = self._decode_json(response)
+            return response
+        
+        timing = instrumentation.RequestTiming(method, url, kwargs)
+        if timing.method in instrumentation.REPEATABLE_METHODS:
+            timing.repeat = functools.partial(self._send_direct, method, url, kwargs)
+        instrumentation.emit("on_request_start", timing)
+        started = time.perf_counter()
+        try:
+            # Always stream so that time-to-first-byte and body download can be told apart
+            response = self.session.request(method, url, stream=True, **kwargs)
+            timing.ttfb = time.perf_counter() - started
+            timing.status_code = response.status_code
+            timing.connection_reused = getattr(response, "connection_reused", None)
+            if not stream:
+                downloading = time.perf_counter()
+                response.content
+                timing.download = time.perf_counter() - downloading
+        except Exception as exc:
+            timing.error = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            timing.total = time.perf_counter() - started
+            instrumentation.emit("on_request_end", timing)
+        
+        decode_json = self._decode_json(response)
+        
+        def timed_json(**json_kwargs):
+            decoding = time.perf_counter()
+            try:
+                return decode_json(**json_kwargs)
+            finally:
+                timing.decode = (timing.decode or 0.0) + time.perf_counter() - decoding
+                instrumentation.emit("on_json_decoded", timing)
+        
+        response.json = timed_json
+        return response
     
     def get(self, endpoint: str, params: Optional[Dict] = None, timeout: int = 10) -> requests.Response:
         """
@@ -31,8 +164,66 @@ class APIClient:
         Returns:
             Response object
         """
-        url = f"{self.base_url}/{endpoint.lstrip('/')}"
-        return self.session.get(url, params=params, timeout=timeout)
+        return self.request("GET", endpoint, params=params, timeout=timeout)
+    
+    def stream(self, endpoint: str, params: Optional[Dict] = None, timeout: int = 10) -> requests.Response:
+        """
+        Perform GET request without reading the response body up front.
+        
+        The body is read lazily, e.g. via iter_response_items() or
+        validate_list_response_stream(). Close the response (or use it as
+        a context manager) if it is not read to the end.
+        
+        Args:
+            endpoint: API endpoint (relative to base_url)
+            params: Optional query parameters
+            timeout: Request timeout in seconds
+            
+        Returns:
+            Streamed response object
+        """
+        return self.request("GET", endpoint, params=params, timeout=timeout, stream=True)
+    
+    def paginate(self, endpoint: str, params: Optional[Dict] = None, page_size: Optional[int] = None,
+                 page_param: str = "_page", size_param: str = "_limit", data_key: str = "data",
+                 first_page: int = 1, prefetch: int = DEFAULT_PREFETCH, max_pages: Optional[int] = None,
+                 timeout: int = 10) -> Iterator[Any]:
+        """
+        Iterate over the items of a paginated collection.
+        
+        Items are yielded lazily page by page while the next ``prefetch``
+        pages are fetched concurrently. Defaults match JSONPlaceholder
+        (``?_page=2&_limit=10``, bare arrays, X-Total-Count); for wrapped
+        APIs pass e.g. ``page_param="page", size_param="per_page"``.
+        
+        Args:
+            endpoint: Collection endpoint (relative to base_url)
+            params: Optional additional query parameters
+            page_size: Optional number of items per page (sent as size_param)
+            page_param: Query parameter holding the page number
+            size_param: Query parameter holding the page size
+            data_key: Key containing the list data for wrapped responses
+            first_page: Number of the first page
+            prefetch: Number of pages fetched ahead of the consumer (0 disables prefetch)
+            max_pages: Optional maximum number of pages to walk
+            timeout: Request timeout in seconds
+            
+        Yields:
+            Collection items in page order
+            
+        Raises:
+            requests.HTTPError: If a page request fails
+        """
+        def fetch_page(page: int):
+            page_params = {**(params or {}), page_param: page}
+            if page_size is not None:
+                page_params[size_param] = page_size
+            response = self.get(endpoint, params=page_params, timeout=timeout)
+            response.raise_for_status()
+            return parse_page(response, data_key, page_size)
+        
+        for items in iter_pages(fetch_page, first_page, prefetch, page_size, max_pages):
+            yield from items
     
     def post(self, endpoint: str, data: Optional[Dict[str, Any]] = None, 
              json: Optional[Dict[str, Any]] = None, timeout: int = 10) -> requests.Response:
@@ -48,8 +239,7 @@ class APIClient:
         Returns:
             Response object
         """
-        url = f"{self.base_url}/{endpoint.lstrip('/')}"
-        return self.session.post(url, data=data, json=json, timeout=timeout)
+        return self.request("POST", endpoint, data=data, json=json, timeout=timeout)
     
     def put(self, endpoint: str, data: Optional[Dict[str, Any]] = None,
             json: Optional[Dict[str, Any]] = None, timeout: int = 10) -> requests.Response:
@@ -65,8 +255,7 @@ class APIClient:
         Returns:
             Response object
         """
-        url = f"{self.base_url}/{endpoint.lstrip('/')}"
-        return self.session.put(url, data=data, json=json, timeout=timeout)
+        return self.request("PUT", endpoint, data=data, json=json, timeout=timeout)
     
     def delete(self, endpoint: str, timeout: int = 10) -> requests.Response:
         """
@@ -79,8 +268,33 @@ class APIClient:
         Returns:
             Response object
         """
-        url = f"{self.base_url}/{endpoint.lstrip('/')}"
-        return self.session.delete(url, timeout=timeout)
+        return self.request("DELETE", endpoint, timeout=timeout)
+    
+    def bulk(self, operations: Iterable[Any], concurrency: int = DEFAULT_BULK_CONCURRENCY,
+             retries: int = DEFAULT_RETRIES, backoff: float = DEFAULT_BACKOFF,
+             timeout: int = 10) -> BulkResult:
+        """
+        Perform many write requests concurrently.
+        
+        Operations run on a bounded thread pool sharing this client's
+        session. Transient failures (connection errors, timeouts, 429 and
+        502-504 responses) are retried with exponential backoff.
+        
+        Args:
+            operations: WriteOperation instances or (method, endpoint[, json]) tuples,
+                        e.g. ``("POST", "users", {"name": "..."})``
+            concurrency: Maximum number of requests in flight
+            retries: Retries per operation for transient failures
+            backoff: Delay in seconds before the first retry (doubled per retry)
+            timeout: Request timeout in seconds
+            
+        Returns:
+            BulkResult with per-item status in input order and throughput stats
+        """
+        def send(operation: WriteOperation) -> requests.Response:
+            return self.request(operation.method, operation.endpoint, json=operation.json, timeout=timeout)
+        
+        return run_bulk(send, operations, concurrency, retries, backoff)
 
 
 def validate_user_schema(data: Dict[str, Any], require_id: bool = True) -> None:
@@ -88,56 +302,112 @@ def validate_user_schema(data: Dict[str, Any], require_id: bool = True) -> None:
     Validate user object schema for JSONPlaceholder API.
     
     This function checks that the user object contains required fields
-    with correct data types. Note: This is specific to JSONPlaceholder
-    API structure (name, username, email fields).
+    with correct data types (see USER_SCHEMA). Note: This is specific to
+    JSONPlaceholder API structure (name, username, email fields).
     
     Args:
         data: User data dictionary to validate
         require_id: Whether ID field is required (default: True)
         
     Raises:
-        AssertionError: If schema validation fails (missing fields or wrong types)
+        AssertionError: If schema validation fails, listing every missing field or wrong type
     """
-    if require_id:
-        assert "id" in data, "User data should contain 'id' field"
-        assert isinstance(data["id"], int), "User 'id' should be an integer"
-    
-    assert "email" in data, "User data should contain 'email' field"
-    assert isinstance(data["email"], str), "User 'email' should be a string"
-    
-    assert "name" in data, "User data should contain 'name' field"
-    assert isinstance(data["name"], str), "User 'name' should be a string"
+    validator = compile_schema(USER_SCHEMA, optional=() if require_id else ("id",))
+    assert_no_errors(validator.errors(data, "User"))
+
+
+def validate_post_schema(data: Dict[str, Any]) -> None:
+    """
+    Validate post object schema for JSONPlaceholder API.
     
-    assert "username" in data, "User data should contain 'username' field"
-    assert isinstance(data["username"], str), "User 'username' should be a string"
+    Args:
+        data: Post data dictionary to validate (see POST_SCHEMA)
+        
+    Raises:
+        AssertionError: If schema validation fails, listing every missing field or wrong type
+    """
+    assert_no_errors(compile_schema(POST_SCHEMA).errors(data, "Post"))
 
 
-def validate_list_response(response_data: Dict[str, Any], data_key: str = "data") -> None:
+def validate_list_response(response_data: Union[Dict[str, Any], List[Any]], data_key: str = "data",
+                           item_schema: Optional[Dict[str, Any]] = None, label: str = "Item") -> None:
     """
     Validate list response schema for paginated APIs.
     
     This function validates that the response contains a list of items
     and optional pagination metadata. Note: JSONPlaceholder returns
     arrays directly, but this function supports wrapped responses too.
+    When item_schema is given, every element of the list is validated
+    and all violations are reported together.
     
     Args:
-        response_data: Response JSON data dictionary
+        response_data: Response JSON data (wrapped dictionary or bare list)
         data_key: Key containing the list data (default: "data")
-                  For JSONPlaceholder, pass the array directly
+                  Ignored when response_data is a bare list (JSONPlaceholder)
+        item_schema: Optional schema every list element must match
+        label: Prefix for item violation messages (e.g. "User")
         
     Raises:
         AssertionError: If schema validation fails
     """
-    assert data_key in response_data, f"Response should contain '{data_key}' key"
-    assert isinstance(response_data[data_key], list), f"'{data_key}' should be a list"
+    if isinstance(response_data, list):
+        items = response_data
+    else:
+        assert data_key in response_data, f"Response should contain '{data_key}' key"
+        items = response_data[data_key]
+        assert isinstance(items, list), f"'{data_key}' should be a list"
+        
+        # Optional pagination fields (not used by JSONPlaceholder but included for flexibility)
+        if "page" in response_data:
+            assert isinstance(response_data["page"], int), "'page' should be an integer"
+        
+        if "per_page" in response_data:
+            assert isinstance(response_data["per_page"], int), "'per_page' should be an integer"
+        
+        if "total" in response_data:
+            assert isinstance(response_data["total"], int), "'total' should be an integer"
     
-    # Optional pagination fields (not used by JSONPlaceholder but included for flexibility)
-    if "page" in response_data:
-        assert isinstance(response_data["page"], int), "'page' should be an integer"
+    if item_schema is not None:
+        validate_items(items, item_schema, label)
+
+
+def validate_list_response_stream(response: requests.Response, data_key: str = "data",
+                                  item_schema: Optional[Dict[str, Any]] = None, label: str = "Item",
+                                  chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Validate a list response while it is being downloaded.
     
-    if "per_page" in response_data:
-        assert isinstance(response_data["per_page"], int), "'per_page' should be an integer"
+    Streaming counterpart of validate_list_response() for responses
+    obtained with APIClient.stream(). Elements are decoded and validated
+    one at a time as they arrive, so memory stays bounded for very large
+    bodies, and validation fails on the first invalid element without
+    downloading the rest of the body.
     
-    if "total" in response_data:
-        assert isinstance(response_data["total"], int), "'total' should be an integer"
-
+    Args:
+        response: Streamed response object
+        data_key: Key containing the list data for wrapped responses (default: "data")
+        item_schema: Optional schema every list element must match
+        label: Prefix for item violation messages (e.g. "User")
+        chunk_size: Number of bytes read at a time
+        
+    Returns:
+        Number of list elements validated
+        
+    Raises:
+        AssertionError: If schema validation fails
+    """
+    validator = compile_schema(item_schema) if item_schema is not None else None
+    metadata: Dict[str, Any] = {}
+    count = 0
+    with response:
+        for item in iter_response_items(response, data_key, metadata, chunk_size):
+            if validator is not None and not validator.is_valid(item):
+                assert_no_errors(validator.errors(item, f"{label} [{count}]"))
+            count += 1
+    
+    # Optional pagination fields (not used by JSONPlaceholder but included for flexibility)
+    for field in ("page", "per_page", "total"):
+        if field in metadata:
+            assert isinstance(metadata[field], int), f"'{field}' should be an integer"
+    
+    return count
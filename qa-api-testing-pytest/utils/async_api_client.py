@@ -0,0 +1,170 @@
+"""
+Asyncio API client helper utilities.
+
+AsyncAPIClient mirrors APIClient's get/post/put/delete as coroutines so
+that many requests can be fanned out concurrently. Requests run on a
+bounded thread pool on top of the same pooled requests.Session used by
+APIClient, so both clients share connections and configuration.
+"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, TypeVar
+
+import requests
+
+from utils.api_client import APIClient
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+DEFAULT_MAX_CONCURRENCY = 16
+
+
+class AsyncAPIClient:
+    """Asyncio helper class for concurrent API operations."""
+
+    def __init__(self, base_url: str, session: Optional[requests.Session] = None,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY):
+        """
+        Initialize async API client.
+
+        Args:
+            base_url: Base URL for the API
+            session: Optional requests session (creates a pooled session if not provided)
+            max_concurrency: Maximum number of requests in flight at once
+        """
+        self._client = APIClient(base_url, session)
+        self.base_url = self._client.base_url
+        self.session = self._client.session
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency,
+                                            thread_name_prefix="async-api-client")
+
+    async def _call(self, func: Callable[..., requests.Response], *args, **kwargs) -> requests.Response:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def get(self, endpoint: str, params: Optional[Dict] = None, timeout: int = 10) -> requests.Response:
+        """
+        Perform GET request.
+
+        Args:
+            endpoint: API endpoint (relative to base_url)
+            params: Optional query parameters
+            timeout: Request timeout in seconds
+
+        Returns:
+            Response object
+        """
+        return await self._call(self._client.get, endpoint, params=params, timeout=timeout)
+
+    async def post(self, endpoint: str, data: Optional[Dict[str, Any]] = None,
+                   json: Optional[Dict[str, Any]] = None, timeout: int = 10) -> requests.Response:
+        """
+        Perform POST request.
+
+        Args:
+            endpoint: API endpoint (relative to base_url)
+            data: Optional form data
+            json: Optional JSON data
+            timeout: Request timeout in seconds
+
+        Returns:
+            Response object
+        """
+        return await self._call(self._client.post, endpoint, data=data, json=json, timeout=timeout)
+
+    async def put(self, endpoint: str, data: Optional[Dict[str, Any]] = None,
+                  json: Optional[Dict[str, Any]] = None, timeout: int = 10) -> requests.Response:
+        """
+        Perform PUT request.
+
+        Args:
+            endpoint: API endpoint (relative to base_url)
+            data: Optional form data
+            json: Optional JSON data
+            timeout: Request timeout in seconds
+
+        Returns:
+            Response object
+        """
+        return await self._call(self._client.put, endpoint, data=data, json=json, timeout=timeout)
+
+    async def delete(self, endpoint: str, timeout: int = 10) -> requests.Response:
+        """
+        Perform DELETE request.
+
+        Args:
+            endpoint: API endpoint (relative to base_url)
+            timeout: Request timeout in seconds
+
+        Returns:
+            Response object
+        """
+        return await self._call(self._client.delete, endpoint, timeout=timeout)
+
+    async def gather(self, *aws: Awaitable[T], limit: Optional[int] = None) -> List[T]:
+        """
+        Await many coroutines with at most ``limit`` running at once.
+
+        Args:
+            *aws: Awaitables to run (e.g. ``client.get(...)`` calls)
+            limit: Concurrency limit (default: max_concurrency)
+
+        Returns:
+            Results in the same order as the awaitables
+        """
+        semaphore = asyncio.Semaphore(limit or self.max_concurrency)
+
+        async def bounded(aw: Awaitable[T]) -> T:
+            async with semaphore:
+                return await aw
+
+        return list(await asyncio.gather(*(bounded(aw) for aw in aws)))
+
+    async def map(self, func: Callable[[T], Awaitable[R]], items: Iterable[T],
+                  limit: Optional[int] = None) -> List[R]:
+        """
+        Apply an async function to every item with bounded concurrency.
+
+        Items are pulled lazily from the iterable, so only ``limit``
+        requests are pending at any time regardless of the input size.
+
+        Args:
+            func: Coroutine function called with each item
+            items: Items to process (e.g. resource IDs)
+            limit: Concurrency limit (default: max_concurrency)
+
+        Returns:
+            Results in the same order as the input items
+        """
+        iterator = iter(enumerate(items))
+        results: Dict[int, R] = {}
+
+        async def worker() -> None:
+            for index, item in iterator:
+                results[index] = await func(item)
+
+        await asyncio.gather(*(worker() for _ in range(limit or self.max_concurrency)))
+        return [results[index] for index in range(len(results))]
+
+    def run(self, aw: Awaitable[T]) -> T:
+        """
+        Run an awaitable to completion from synchronous code.
+
+        Args:
+            aw: Awaitable to run (e.g. ``client.map(...)``)
+
+        Returns:
+            The awaitable's result
+        """
+        async def main() -> T:
+            return await aw
+
+        return asyncio.run(main())
+
+    def close(self) -> None:
+        """Shut down the worker threads (the session is left open)."""
+        self._executor.shutdown(wait=True)
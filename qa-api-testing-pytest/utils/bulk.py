@@ -0,0 +1,165 @@
+"""
+Bulk write operations for seeding and cleaning up test data.
+
+run_bulk() sends many POST/PUT/PATCH/DELETE requests on a bounded thread
+pool. Operations are pulled lazily from the input, so only a window of
+requests is pending at any time; results are returned in input order with
+a per-item status. Transient failures (connection errors, timeouts, 429
+and 5xx gateway errors) are retried with exponential backoff; any other
+request error fails only its own item.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import requests
+
+from utils.histogram import LatencyHistogram
+
+
+DEFAULT_BULK_CONCURRENCY = 16
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = 0.1
+
+TRANSIENT_STATUSES = frozenset({429, 502, 503, 504})
+
+
+class WriteOperation(NamedTuple):
+    """A single write request: ``WriteOperation("POST", "users", {"name": "..."})``."""
+
+    method: str
+    endpoint: str
+    json: Optional[Any] = None
+
+
+class BulkItemResult:
+    """Outcome of one operation."""
+
+    def __init__(self, index: int, operation: WriteOperation):
+        self.index = index
+        self.operation = operation
+        self.response: Optional[requests.Response] = None
+        self.error: Optional[str] = None
+        self.attempts = 0
+        self.elapsed = 0.0
+
+    @property
+    def status_code(self) -> Optional[int]:
+        """Status code of the final attempt (None if no response was received)."""
+        return self.response.status_code if self.response is not None else None
+
+    @property
+    def ok(self) -> bool:
+        """True if the final attempt returned a 2xx status."""
+        return self.response is not None and 200 <= self.response.status_code < 300
+
+    def describe(self) -> str:
+        """One-line description for failure messages."""
+        outcome = self.status_code if self.response is not None else self.error
+        return (f"#{self.index} {self.operation.method} {self.operation.endpoint}: {outcome} "
+                f"after {self.attempts} attempt(s)")
+
+
+class BulkResult:
+    """Ordered per-item results and throughput statistics of a bulk run."""
+
+    def __init__(self, items: List[BulkItemResult], elapsed: float, latencies: LatencyHistogram):
+        self.items = items
+        self.elapsed = elapsed
+        self.latencies = latencies
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __getitem__(self, index: int) -> BulkItemResult:
+        return self.items[index]
+
+    @property
+    def failures(self) -> List[BulkItemResult]:
+        """Items whose final attempt did not succeed."""
+        return [item for item in self.items if not item.ok]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Aggregate throughput statistics.
+
+        Returns:
+            Dict with operation/success/failure/retry counts, elapsed seconds,
+            operations per second and the per-request latency summary
+        """
+        attempts = sum(item.attempts for item in self.items)
+        return {
+            "operations": len(self.items),
+            "succeeded": len(self.items) - len(self.failures),
+            "failed": len(self.failures),
+            "retries": attempts - len(self.items),
+            "elapsed_s": round(self.elapsed, 3),
+            "ops_per_s": round(len(self.items) / self.elapsed, 1) if self.elapsed > 0 else 0.0,
+            "latency": self.latencies.summary(),
+        }
+
+
+def _is_transient(item: BulkItemResult) -> bool:
+    return item.response is None or item.response.status_code in TRANSIENT_STATUSES
+
+
+def run_bulk(send: Callable[[WriteOperation], requests.Response], operations: Iterable[Any],
+             concurrency: int = DEFAULT_BULK_CONCURRENCY, retries: int = DEFAULT_RETRIES,
+             backoff: float = DEFAULT_BACKOFF) -> BulkResult:
+    """
+    Run write operations concurrently.
+
+    Args:
+        send: Callable performing one operation and returning its response
+        operations: WriteOperation instances or (method, endpoint[, json]) tuples
+        concurrency: Maximum number of requests in flight
+        retries: Retries per operation for transient failures
+        backoff: Delay before the first retry; doubled for every further retry
+
+    Returns:
+        BulkResult with one item per operation, in input order
+    """
+    latencies = LatencyHistogram()
+    lock = threading.Lock()
+
+    def execute(numbered: Tuple[int, Any]) -> BulkItemResult:
+        index, operation = numbered
+        item = BulkItemResult(index, WriteOperation(*operation))
+        started = time.perf_counter()
+        for attempt in range(retries + 1):
+            if attempt:
+                time.sleep(backoff * 2 ** (attempt - 1))
+            item.attempts += 1
+            request_started = time.perf_counter()
+            retryable = True
+            try:
+                item.response, item.error = send(item.operation), None
+            except (requests.ConnectionError, requests.Timeout) as error:
+                item.response, item.error = None, f"{type(error).__name__}: {error}"
+            except requests.RequestException as error:
+                # E.g. too many redirects: retrying will not help, but the other items still run
+                item.response, item.error = None, f"{type(error).__name__}: {error}"
+                retryable = False
+            with lock:
+                latencies.record(time.perf_counter() - request_started)
+            if not retryable or not _is_transient(item):
+                break
+        item.elapsed = time.perf_counter() - started
+        return item
+
+    started = time.perf_counter()
+    items: List[BulkItemResult] = []
+    pending: Deque[Future] = deque()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="api-bulk") as executor:
+        # Keep a sliding window of submitted operations instead of submitting the whole input
+        for numbered in enumerate(operations):
+            if len(pending) >= concurrency * 2:
+                items.append(pending.popleft().result())
+            pending.append(executor.submit(execute, numbered))
+        items.extend(future.result() for future in pending)
+    return BulkResult(items, time.perf_counter() - started, latencies)
@@ -0,0 +1,292 @@
+"""
+Record/replay cassette layer for API requests.
+
+Responses are stored in an append-only, zlib-compressed data file with a
+line-based index mapping a normalized request hash to the record's
+offset and length. Data files are memory-mapped for reading, so a
+replayed response costs one dict lookup plus one decompress, and xdist
+workers share the OS page cache instead of each loading the whole store.
+
+Each writer (one per xdist worker) appends to its own shard of the store,
+so recording in parallel never interleaves writes; readers load the
+indexes of all shards.
+
+Record modes:
+    record:       always send the request and (re)record the response
+    replay:       serve recorded responses only, fail on unknown requests
+    new_episodes: serve recorded responses, record the ones not yet stored
+    off:          pass every request through untouched
+"""
+import glob
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import zlib
+from datetime import timedelta
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+
+RECORD_MODES = ("record", "replay", "new_episodes", "off")
+
+_HEADER_SIZE = struct.Struct(">I")
+
+
+class CassetteMissError(requests.exceptions.RequestException):
+    """Raised in replay mode when a request has no recorded response."""
+
+
+def request_key(method: str, url: str, body: Optional[Any] = None) -> str:
+    """
+    Build the normalized hash identifying a request.
+
+    Scheme and host are lower-cased, query parameters are sorted and JSON
+    bodies are re-serialized with sorted keys, so equivalent requests map
+    to the same key regardless of parameter or key order.
+
+    Args:
+        method: HTTP method
+        url: Full request URL including query string
+        body: Request body (bytes, str or None)
+
+    Returns:
+        Hex digest identifying the request
+    """
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    normalized_url = urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", query, ""))
+
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    body = body or b""
+    if body:
+        try:
+            body = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode("utf-8")
+        except ValueError:
+            pass
+
+    digest = hashlib.sha256()
+    digest.update(method.upper().encode("ascii"))
+    digest.update(b"\0")
+    digest.update(normalized_url.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(body)
+    return digest.hexdigest()
+
+
+class CassetteStore:
+    """Indexed, memory-mapped on-disk store of recorded responses."""
+
+    def __init__(self, path: str, writer_id: str = "main"):
+        """
+        Open (or create) a cassette store.
+
+        Args:
+            path: Directory holding the store's shards
+            writer_id: Name of the shard this process appends to
+        """
+        self.path = path
+        self.writer_id = writer_id
+        os.makedirs(path, exist_ok=True)
+        self._lock = threading.Lock()
+        self._index: Dict[str, Tuple[str, int, int]] = {}
+        self._maps: Dict[str, mmap.mmap] = {}
+        self._files: Dict[str, Any] = {}
+        self._data_writer = None
+        self._index_writer = None
+        self._load_index()
+
+    def _shard_path(self, shard: str, suffix: str) -> str:
+        return os.path.join(self.path, f"{shard}{suffix}")
+
+    def _load_index(self) -> None:
+        for index_path in sorted(glob.glob(os.path.join(self.path, "*.idx"))):
+            shard = os.path.basename(index_path)[:-len(".idx")]
+            with open(index_path, "r", encoding="ascii") as index_file:
+                for line in index_file:
+                    fields = line.split()
+                    if len(fields) == 3:
+                        self._index[fields[0]] = (shard, int(fields[1]), int(fields[2]))
+
+    def _view(self, shard: str, end: int) -> mmap.mmap:
+        view = self._maps.get(shard)
+        if view is None or len(view) < end:
+            if view is not None:
+                view.close()
+            data_file = self._files.get(shard)
+            if data_file is None:
+                data_file = open(self._shard_path(shard, ".dat"), "rb")
+                self._files[shard] = data_file
+            view = mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[shard] = view
+        return view
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, Any], bytes]]:
+        """
+        Look up a recorded response.
+
+        Args:
+            key: Request key from request_key()
+
+        Returns:
+            Tuple of (metadata, body) or None if the request was not recorded
+        """
+        entry = self._index.get(key)
+        if entry is None:
+            return None
+        shard, offset, length = entry
+        with self._lock:
+            raw = zlib.decompress(self._view(shard, offset + length)[offset:offset + length])
+        (header_size,) = _HEADER_SIZE.unpack_from(raw)
+        start = _HEADER_SIZE.size
+        meta = json.loads(raw[start:start + header_size])
+        return meta, raw[start + header_size:]
+
+    def put(self, key: str, meta: Dict[str, Any], body: bytes) -> None:
+        """
+        Append a response to this process' shard.
+
+        Args:
+            key: Request key from request_key()
+            meta: JSON-serializable response metadata
+            body: Raw response body
+        """
+        header = json.dumps(meta, separators=(",", ":")).encode("utf-8")
+        record = zlib.compress(_HEADER_SIZE.pack(len(header)) + header + body)
+        with self._lock:
+            if self._data_writer is None:
+                self._data_writer = open(self._shard_path(self.writer_id, ".dat"), "ab")
+                self._index_writer = open(self._shard_path(self.writer_id, ".idx"), "a", encoding="ascii")
+            offset = self._data_writer.tell()
+            self._data_writer.write(record)
+            self._data_writer.flush()
+            self._index_writer.write(f"{key} {offset} {len(record)}\n")
+            self._index_writer.flush()
+            self._index[key] = (self.writer_id, offset, len(record))
+
+    def close(self) -> None:
+        """Release memory maps and file handles."""
+        with self._lock:
+            for view in self._maps.values():
+                view.close()
+            for data_file in self._files.values():
+                data_file.close()
+            for writer in (self._data_writer, self._index_writer):
+                if writer is not None:
+                    writer.close()
+            self._maps.clear()
+            self._files.clear()
+            self._data_writer = self._index_writer = None
+
+
+def build_response(request: requests.PreparedRequest, meta: Dict[str, Any], body: bytes) -> requests.Response:
+    """
+    Build a response object from stored metadata and body without network I/O.
+
+    Args:
+        request: Request the response answers
+        meta: Dict with status, and optionally reason and headers
+        body: Raw response body
+
+    Returns:
+        Fully read requests.Response
+    """
+    response = requests.Response()
+    response.status_code = meta["status"]
+    response.reason = meta.get("reason", "")
+    response.headers = CaseInsensitiveDict(meta.get("headers", {}))
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.url = request.url
+    response.request = request
+    response.elapsed = timedelta(0)
+    response._content = body
+    response._content_consumed = True
+    return response
+
+
+class CassetteAdapter(BaseAdapter):
+    """Transport adapter serving and recording responses through a CassetteStore."""
+
+    def __init__(self, store: CassetteStore, mode: str, inner: BaseAdapter):
+        """
+        Initialize cassette adapter.
+
+        Args:
+            store: Store to read from and record to
+            mode: One of RECORD_MODES
+            inner: Adapter that performs real requests
+        """
+        if mode not in RECORD_MODES:
+            raise ValueError(f"Unknown record mode '{mode}', expected one of {RECORD_MODES}")
+        super().__init__()
+        self.store = store
+        self.mode = mode
+        self.inner = inner
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        """Serve the request from the cassette or send and record it, depending on mode."""
+        if self.mode == "off":
+            return self.inner.send(request, **kwargs)
+
+        key = request_key(request.method, request.url, request.body)
+        if self.mode in ("replay", "new_episodes"):
+            recorded = self.store.get(key)
+            if recorded is not None:
+                response = build_response(request, *recorded)
+                response.connection = self
+                return response
+            if self.mode == "replay":
+                raise CassetteMissError(f"No recorded response for {request.method} {request.url}",
+                                        request=request)
+
+        response = self.inner.send(request, **kwargs)
+        meta = {
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": {name: value for name, value in response.headers.items()
+                        if name.lower() not in ("content-encoding", "transfer-encoding", "content-length")},
+        }
+        self.store.put(key, meta, response.content)
+        return response
+
+    def close(self) -> None:
+        """Close the wrapped adapter."""
+        self.inner.close()
+
+
+def use_cassette(session: requests.Session, path: str, mode: str = "new_episodes",
+                 writer_id: Optional[str] = None) -> CassetteStore:
+    """
+    Route a session's HTTP(S) traffic through a cassette.
+
+    Args:
+        session: Session to install the cassette on
+        path: Cassette store directory
+        mode: One of RECORD_MODES
+        writer_id: Shard name for recordings (default: xdist worker id or "main")
+
+    Returns:
+        The opened CassetteStore
+    """
+    store = CassetteStore(path, writer_id or os.environ.get("PYTEST_XDIST_WORKER", "main"))
+    wrapped: Dict[int, CassetteAdapter] = {}
+    for prefix in ("http://", "https://"):
+        inner = session.get_adapter(prefix)
+        if id(inner) not in wrapped:
+            wrapped[id(inner)] = CassetteAdapter(store, mode, inner)
+        session.mount(prefix, wrapped[id(inner)])
+    return store
@@ -0,0 +1,448 @@
+"""
+Contract fuzzing for the JSONPlaceholder resources.
+
+Cases are generated from the resource schemas in utils/schema.py (the
+ones behind validate_user_schema and validate_post_schema): valid
+payloads, payloads with fields dropped, retyped, emptied, oversized or
+added, bodies that are not objects or not JSON, and path mutations such
+as unknown, negative, huge or non-numeric ids, extra segments and bad
+pagination parameters. Every response is checked against the contract:
+
+* no 5xx responses and no transport errors
+* JSON response bodies
+* existing resources are returned with 200 and match their schema;
+  unknown ones get a 4xx
+* successful writes echo the sent fields (and the id in the path)
+
+Cases are sent concurrently over lean keep-alive ``http.client``
+connections (one per sender thread) rather than requests, whose
+per-request overhead would dominate: thousands of cases per second run
+against the local stand-in server. Each failure is
+shrunk to a minimal reproducer, and failures are deduplicated by
+signature (method, endpoint template and kind of violation).
+
+The ``fuzz`` tests only run with ``--fuzz`` (see conftest.py).
+"""
+import http.client
+import json
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Deque, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from urllib.parse import quote, urlsplit
+
+
+from utils.schema import POST_SCHEMA, USER_SCHEMA, compile_schema
+
+
+SCHEMAS = {"users": USER_SCHEMA, "posts": POST_SCHEMA}
+
+DEFAULT_CASES = 5000
+DEFAULT_TIME_BUDGET = 30.0
+DEFAULT_CONCURRENCY = 32
+DEFAULT_SHRINK_ATTEMPTS = 200
+
+# Client errors a server may legitimately answer a malformed request with
+CLIENT_ERRORS = frozenset({400, 404, 405, 409, 413, 414, 415, 422, 429})
+
+_WRONG_VALUES: List[Any] = [None, True, False, 0, -1, 2 ** 63, -2 ** 63, 1.5, "", "x" * 10000,
+                            "ünïcødé \U0001f600", "\x00\x1f", "<script>", "1; DROP TABLE",
+                            [], {}, [1, "a", None], {"nested": {"deep": [1]}}]
+
+_BAD_IDS = ["0", "-1", "99999999", str(2 ** 63), "abc", "1.5", "1e3", "%20", "%00", "..", "x" * 2000, "²"]
+
+_BAD_QUERIES = ["_page=-1", "_page=abc", "_limit=0", "_limit=-5", "_limit=99999999", "_page=1&_limit=abc",
+                "id=abc", "id=", "%zz=1", "_page=" + "9" * 40]
+
+
+class FuzzCase(NamedTuple):
+    """One request: ``FuzzCase("POST", "/users", b'{"name": 1}', "name: retype int")``."""
+
+    method: str
+    path: str
+    body: Optional[bytes] = None
+    mutation: str = "valid"
+
+    def reproducer(self, base_url: str) -> str:
+        """curl command reproducing the case."""
+        command = f"curl -X {self.method} '{base_url.rstrip('/')}{self.path}'"
+        if self.body is not None:
+            body = self.body.decode("utf-8", "replace").replace("'", "'\\''")
+            command += f" -H 'Content-Type: application/json' --data-binary '{body}'"
+        return command
+
+
+class Finding:
+    """A contract violation, shrunk to its minimal reproducer."""
+
+    def __init__(self, signature: str, case: FuzzCase, detail: str):
+        self.signature = signature
+        self.case = case
+        self.original = case
+        self.detail = detail
+        self.count = 1
+
+    def describe(self, base_url: str) -> str:
+        """Multi-line description for failure messages."""
+        return (f"{self.signature} ({self.count} case(s)): {self.detail}\n"
+                f"    mutation: {self.original.mutation}\n"
+                f"    reproducer: {self.case.reproducer(base_url)}")
+
+
+class FuzzReport:
+    """Findings and throughput of a fuzzing run."""
+
+    def __init__(self, resource: str, cases: int, elapsed: float, findings: List[Finding]):
+        self.resource = resource
+        self.cases = cases
+        self.elapsed = elapsed
+        self.findings = findings
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Aggregate statistics.
+
+        Returns:
+            Dict with case and finding counts, elapsed seconds and cases per second
+        """
+        return {
+            "resource": self.resource,
+            "cases": self.cases,
+            "findings": len(self.findings),
+            "failing_cases": sum(finding.count for finding in self.findings),
+            "elapsed_s": round(self.elapsed, 3),
+            "cases_per_s": round(self.cases / self.elapsed, 1) if self.elapsed > 0 else 0.0,
+        }
+
+
+def _dumps(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+
+def valid_value(expected: Any, rng: random.Random) -> Any:
+    """Generate a value matching a schema entry."""
+    if isinstance(expected, dict):
+        return {field: valid_value(value, rng) for field, value in expected.items()}
+    if isinstance(expected, tuple):
+        expected = rng.choice(expected)
+    if expected is bool:
+        return rng.random() < 0.5
+    if expected is int:
+        return rng.randint(1, 1000)
+    if expected is float:
+        return rng.uniform(-1000, 1000)
+    if expected is str:
+        return "".join(rng.choice("abcdefghij klmnop") for _ in range(rng.randint(1, 24)))
+    if expected is list:
+        return []
+    return None
+
+
+def payload_mutations(schema: Dict[str, Any], rng: random.Random) -> Iterator[Tuple[str, bytes]]:
+    """
+    Generate request bodies derived from a schema, valid and invalid.
+
+    Args:
+        schema: Resource schema (the server assigns ``id``, so it is not sent)
+        rng: Random generator
+
+    Yields:
+        (mutation description, JSON body) tuples, forever
+    """
+    fields = {field: expected for field, expected in schema.items() if field != "id"}
+    while True:
+        payload = {field: valid_value(expected, rng) for field, expected in fields.items()}
+        field = rng.choice(list(fields))
+        choice = rng.random()
+        if choice < 0.15:
+            yield "valid", _dumps(payload)
+        elif choice < 0.3:
+            del payload[field]
+            yield f"{field}: dropped", _dumps(payload)
+        elif choice < 0.7:
+            payload[field] = rng.choice(_WRONG_VALUES)
+            yield f"{field}: {type(payload[field]).__name__} {str(payload[field])[:20]!r}", _dumps(payload)
+        elif choice < 0.8:
+            payload[rng.choice(["id", "extra", "__proto__", ""])] = rng.choice(_WRONG_VALUES)
+            yield "extra field", _dumps(payload)
+        elif choice < 0.9:
+            value = rng.choice([[payload], "string", 42, None, [], True])
+            yield f"top-level {type(value).__name__}", _dumps(value)
+        else:
+            body = _dumps(payload)
+            cut = rng.randint(0, len(body) - 1)
+            yield "malformed JSON", rng.choice([body[:cut], body + b",", b"{" + body, b"\xff\xfe" + body])
+
+
+def generate_cases(resource: str, schema: Dict[str, Any], ids: List[int],
+                   rng: random.Random) -> Iterator[FuzzCase]:
+    """
+    Generate fuzz cases for one resource.
+
+    Args:
+        resource: Collection name, e.g. "users"
+        schema: Resource schema
+        ids: Ids of existing resources
+        rng: Random generator
+
+    Yields:
+        FuzzCase instances, forever
+    """
+    payloads = payload_mutations(schema, rng)
+    while True:
+        choice = rng.random()
+        if choice < 0.5 or not ids:
+            item = str(rng.choice(ids)) if ids else "1"
+            mutation = "existing id"
+        elif choice < 0.8:
+            item = rng.choice(_BAD_IDS)
+            mutation = f"id {item[:20]!r}"
+        else:
+            item = f"{rng.choice(ids)}/{rng.choice(['posts', 'x', '', '1'])}"
+            mutation = "extra segment"
+        method = rng.choice(["GET", "GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"])
+        if method in ("GET", "HEAD") and rng.random() < 0.3:
+            yield FuzzCase(method, f"/{resource}?{rng.choice(_BAD_QUERIES)}", None, "query")
+        elif method == "POST":
+            description, body = next(payloads)
+            yield FuzzCase(method, f"/{resource}", body, description)
+        elif method in ("PUT", "PATCH"):
+            description, body = next(payloads)
+            yield FuzzCase(method, f"/{resource}/{item}", body, f"{mutation}, {description}")
+        else:
+            yield FuzzCase(method, f"/{resource}/{item}", None, mutation)
+
+
+def endpoint_template(path: str) -> str:
+    """Group a fuzzed path under its endpoint template (``/users/{id}``, ``/users/{id}/*``)."""
+    segments = path.split("?")[0].strip("/").split("/")
+    template = "/" + segments[0]
+    if len(segments) > 1:
+        template += "/{id}"
+    if len(segments) > 2:
+        template += "/*"
+    return template
+
+
+class Fuzzer:
+    """Concurrent contract fuzzer for the JSONPlaceholder resources."""
+
+    def __init__(self, base_url: str, concurrency: int = DEFAULT_CONCURRENCY,
+                 timeout: float = 10, seed: Optional[int] = None, max_cases: int = DEFAULT_CASES,
+                 time_budget: float = DEFAULT_TIME_BUDGET, shrink_attempts: int = DEFAULT_SHRINK_ATTEMPTS):
+        """
+        Initialize fuzzer.
+
+        Args:
+            base_url: Base URL of the API
+            concurrency: Maximum number of cases in flight
+            timeout: Request timeout in seconds
+            seed: Random seed (a random one is drawn if not given; see ``self.seed``)
+            max_cases: Default maximum number of cases per run
+            time_budget: Default seconds spent sending cases per run (shrinking comes on top)
+            shrink_attempts: Maximum requests spent shrinking one failure
+        """
+        self.base_url = base_url.rstrip("/")
+        parts = urlsplit(self.base_url)
+        self._connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self._netloc = parts.netloc
+        self._prefix = parts.path
+        self._local = threading.local()
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.max_cases = max_cases
+        self.time_budget = time_budget
+        self.shrink_attempts = shrink_attempts
+
+    def _send(self, case: FuzzCase) -> Tuple[int, bytes]:
+        headers = {"Content-Type": "application/json"} if case.body is not None else {}
+        path = self._prefix + quote(case.path, safe="/?&=%")
+        for attempt in range(2):
+            connection = getattr(self._local, "connection", None)
+            if connection is None:
+                connection = self._local.connection = self._connection_class(self._netloc, timeout=self.timeout)
+            try:
+                connection.request(case.method, path, body=case.body, headers=headers)
+                response = connection.getresponse()
+                return response.status, response.read()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                # A kept-alive connection closed by the server: retry once on a new one
+                connection.close()
+                self._local.connection = None
+                if attempt:
+                    raise
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                self._local.connection = None
+                raise
+        raise AssertionError("unreachable")
+
+    def _existing_ids(self, resource: str) -> List[int]:
+        status, content = self._send(FuzzCase("GET", f"/{resource}"))
+        assert status == 200, f"GET /{resource} returned {status}"
+        return sorted(item["id"] for item in json.loads(content) if isinstance(item, dict) and "id" in item)
+
+    def check(self, case: FuzzCase, ids: frozenset) -> Optional[Tuple[str, str]]:
+        """
+        Send a case and check the response against the contract.
+
+        Args:
+            case: Case to send
+            ids: Ids of existing resources
+
+        Returns:
+            (violation kind, detail) tuple, or None if the response honours the contract
+        """
+        try:
+            status, content = self._send(case)
+        except (OSError, http.client.HTTPException) as error:
+            return f"transport {type(error).__name__}", str(error)[:200]
+
+        if status >= 500:
+            return f"status {status}", content[:200].decode("utf-8", "replace")
+        if case.method in ("HEAD", "OPTIONS") or status == 204 or status in CLIENT_ERRORS:
+            return None
+        try:
+            data = json.loads(content)
+        except ValueError:
+            return "non-JSON body", f"status {status}: {content[:200]!r}"
+        if not 200 <= status < 300:
+            return f"status {status}", "unexpected status"
+
+        resource, _, rest = case.path.lstrip("/").partition("/")
+        item = rest.split("?")[0]
+        if item and "/" in item:
+            return None
+        if item:
+            if not item.isdigit() or int(item) not in ids:
+                return "unknown id accepted", f"status {status}"
+            if case.method == "GET":
+                errors = compile_schema(SCHEMAS[resource]).errors(data, resource[:-1].title())
+                return ("schema violation", "; ".join(errors)) if errors else None
+        if case.method in ("POST", "PUT", "PATCH") and case.body is not None:
+            try:
+                sent = json.loads(case.body)
+            except ValueError:
+                return None
+            if not isinstance(data, dict):
+                return "write response not an object", type(data).__name__
+            if isinstance(sent, dict):
+                changed = [field for field, value in sent.items() if field != "id" and data.get(field) != value]
+                if changed:
+                    return "fields not echoed", ", ".join(sorted(changed))
+            if item and data.get("id") != int(item):
+                return "id not preserved", f"{data.get('id')!r} != {item}"
+            if case.method == "POST" and type(data.get("id")) is not int:
+                return "no id assigned", repr(data.get("id"))
+        return None
+
+    def _signature(self, case: FuzzCase, kind: str) -> str:
+        return f"{case.method} {endpoint_template(case.path)}: {kind}"
+
+    def _simpler(self, case: FuzzCase) -> Iterator[FuzzCase]:
+        if "?" in case.path:
+            yield case._replace(path=case.path.split("?")[0])
+        segments = case.path.split("/")
+        if len(segments) > 3:
+            yield case._replace(path="/".join(segments[:3]))
+        if len(segments) > 2 and len(segments[2]) > 1:
+            yield case._replace(path="/".join(segments[:2] + [segments[2][:len(segments[2]) // 2]] + segments[3:]))
+        if case.body is None:
+            return
+        try:
+            payload = json.loads(case.body)
+        except ValueError:
+            if len(case.body) > 1:
+                yield case._replace(body=case.body[:len(case.body) // 2])
+                yield case._replace(body=case.body[len(case.body) // 2:])
+            return
+        if not isinstance(payload, dict):
+            yield case._replace(body=b"{}")
+            return
+        for field, value in payload.items():
+            yield case._replace(body=_dumps({key: other for key, other in payload.items() if key != field}))
+            if isinstance(value, str) and value:
+                yield case._replace(body=_dumps({**payload, field: value[:len(value) // 2]}))
+            elif isinstance(value, (list, dict)) and value:
+                yield case._replace(body=_dumps({**payload, field: type(value)()}))
+            elif isinstance(value, int) and not isinstance(value, bool) and value not in (0, 1):
+                yield case._replace(body=_dumps({**payload, field: value // 2 if abs(value) > 1 else 1}))
+
+    def shrink(self, case: FuzzCase, signature: str, ids: frozenset) -> FuzzCase:
+        """
+        Reduce a failing case while it still fails with the same signature.
+
+        Args:
+            case: Failing case
+            signature: Signature of its failure
+            ids: Ids of existing resources
+
+        Returns:
+            The smallest failing case found within the attempt budget
+        """
+        attempts = 0
+        improved = True
+        while improved and attempts < self.shrink_attempts:
+            improved = False
+            for candidate in self._simpler(case):
+                attempts += 1
+                result = self.check(candidate, ids)
+                if result is not None and self._signature(candidate, result[0]) == signature:
+                    case, improved = candidate, True
+                    break
+                if attempts >= self.shrink_attempts:
+                    break
+        return case
+
+    def run(self, resource: str, max_cases: Optional[int] = None,
+            time_budget: Optional[float] = None) -> FuzzReport:
+        """
+        Fuzz one resource until the case count or the time budget is exhausted.
+
+        Args:
+            resource: Collection name, one of SCHEMAS
+            max_cases: Maximum number of generated cases (default: the fuzzer's)
+            time_budget: Maximum seconds spent sending cases (default: the fuzzer's)
+
+        Returns:
+            FuzzReport with one shrunk Finding per failure signature
+        """
+        max_cases = self.max_cases if max_cases is None else max_cases
+        time_budget = self.time_budget if time_budget is None else time_budget
+        ids = frozenset(self._existing_ids(resource))
+        cases = generate_cases(resource, SCHEMAS[resource], sorted(ids), random.Random(f"{self.seed}:{resource}"))
+        findings: Dict[str, Finding] = {}
+        lock = threading.Lock()
+
+        def execute(case: FuzzCase) -> None:
+            result = self.check(case, ids)
+            if result is None:
+                return
+            signature = self._signature(case, result[0])
+            with lock:
+                if signature in findings:
+                    findings[signature].count += 1
+                else:
+                    findings[signature] = Finding(signature, case, result[1])
+
+        started = time.perf_counter()
+        deadline = started + time_budget
+        sent = 0
+        pending: Deque[Future] = deque()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="api-fuzz") as executor:
+            while sent < max_cases and time.perf_counter() < deadline:
+                if len(pending) >= self.concurrency * 2:
+                    pending.popleft().result()
+                pending.append(executor.submit(execute, next(cases)))
+                sent += 1
+            for future in pending:
+                future.result()
+        elapsed = time.perf_counter() - started
+
+        for finding in findings.values():
+            finding.case = self.shrink(finding.case, finding.signature, ids)
+        return FuzzReport(resource, sent, elapsed, sorted(findings.values(), key=lambda finding: finding.signature))
+
@@ -0,0 +1,163 @@
+"""
+HDR-style latency histogram.
+
+Latencies are recorded in microseconds into log-linear buckets: values
+below 128 us are counted exactly, larger values fall into buckets whose
+width is 1/64 of their magnitude, so every percentile is reported within
+~1.6% of the true value while memory stays constant no matter how many
+samples are recorded. Histograms are mergeable, which lets per-thread or
+per-worker results be combined without keeping raw samples.
+"""
+import math
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+
+_SUB_BUCKET_BITS = 7
+_SUB_BUCKET_COUNT = 1 << _SUB_BUCKET_BITS
+_SUB_BUCKET_HALF = _SUB_BUCKET_COUNT >> 1
+
+DEFAULT_PERCENTILES = (50.0, 95.0, 99.0)
+
+
+def _bucket_index(value: int) -> int:
+    if value < _SUB_BUCKET_COUNT:
+        return value
+    shift = value.bit_length() - _SUB_BUCKET_BITS
+    return _SUB_BUCKET_COUNT + (shift - 1) * _SUB_BUCKET_HALF + (value >> shift) - _SUB_BUCKET_HALF
+
+
+def _bucket_upper_bound(index: int) -> int:
+    if index < _SUB_BUCKET_COUNT:
+        return index
+    shift, offset = divmod(index - _SUB_BUCKET_COUNT, _SUB_BUCKET_HALF)
+    shift += 1
+    return ((offset + _SUB_BUCKET_HALF + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """Thread-safe, mergeable latency histogram."""
+
+    def __init__(self):
+        """Create an empty histogram."""
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total_us = 0
+        self.min_us: Optional[int] = None
+        self.max_us = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        """
+        Record one latency sample.
+
+        Args:
+            seconds: Latency in seconds
+        """
+        value = max(int(seconds * 1_000_000), 0)
+        index = _bucket_index(value)
+        with self._lock:
+            self.counts[index] = self.counts.get(index, 0) + 1
+            self.count += 1
+            self.total_us += value
+            if self.min_us is None or value < self.min_us:
+                self.min_us = value
+            if value > self.max_us:
+                self.max_us = value
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """
+        Add another histogram's samples to this one.
+
+        Args:
+            other: Histogram to merge in
+        """
+        with self._lock:
+            for index, count in other.counts.items():
+                self.counts[index] = self.counts.get(index, 0) + count
+            self.count += other.count
+            self.total_us += other.total_us
+            if other.min_us is not None and (self.min_us is None or other.min_us < self.min_us):
+                self.min_us = other.min_us
+            self.max_us = max(self.max_us, other.max_us)
+
+    def percentile(self, percent: float) -> float:
+        """
+        Latency at or below which ``percent`` of the samples fall.
+
+        Args:
+            percent: Percentile between 0 and 100
+
+        Returns:
+            Latency in seconds (0.0 for an empty histogram)
+        """
+        with self._lock:
+            if not self.count:
+                return 0.0
+            target = max(math.ceil(percent / 100.0 * self.count), 1)
+            seen = 0
+            for index in sorted(self.counts):
+                seen += self.counts[index]
+                if seen >= target:
+                    return min(_bucket_upper_bound(index), self.max_us) / 1_000_000
+            return self.max_us / 1_000_000
+
+    @property
+    def max(self) -> float:
+        """Largest recorded latency in seconds."""
+        return self.max_us / 1_000_000
+
+    @property
+    def mean(self) -> float:
+        """Mean latency in seconds."""
+        return self.total_us / self.count / 1_000_000 if self.count else 0.0
+
+    def summary(self, percentiles: Iterable[float] = DEFAULT_PERCENTILES) -> Dict[str, float]:
+        """
+        Summarize the distribution in milliseconds.
+
+        Args:
+            percentiles: Percentiles to include
+
+        Returns:
+            Dict with count, mean, min, max and pNN entries
+        """
+        summary: Dict[str, float] = {
+            "count": self.count,
+            "mean_ms": round(self.mean * 1000, 3),
+            "min_ms": round((self.min_us or 0) / 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+        for percent in percentiles:
+            summary[f"p{percent:g}_ms"] = round(self.percentile(percent) * 1000, 3)
+        return summary
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize to a JSON-compatible dict (see from_dict)."""
+        with self._lock:
+            return {
+                "counts": {str(index): count for index, count in self.counts.items()},
+                "count": self.count,
+                "total_us": self.total_us,
+                "min_us": self.min_us,
+                "max_us": self.max_us,
+            }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        """
+        Rebuild a histogram serialized with to_dict().
+
+        Args:
+            data: Serialized histogram
+
+        Returns:
+            LatencyHistogram with the same samples
+        """
+        histogram = cls()
+        histogram.counts = {int(index): count for index, count in data["counts"].items()}
+        histogram.count = data["count"]
+        histogram.total_us = data["total_us"]
+        histogram.min_us = data["min_us"]
+        histogram.max_us = data["max_us"]
+        return histogram
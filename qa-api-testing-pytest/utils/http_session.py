@@ -0,0 +1,155 @@
+"""
+Pooled HTTP session helpers.
+
+This module builds the ``requests.Session`` shared by the API tests. The
+session mounts a tuned connection-pooling adapter so that TCP/TLS
+connections are reused across requests (and across tests) instead of
+being re-established for every test.
+"""
+import socket
+from contextlib import contextmanager
+from typing import Dict, Generator, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+
+DEFAULT_HEADERS = {
+    "Content-Type": "application/json",
+    "Accept": "application/json"
+}
+
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 32
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter with a configurable connection pool and TCP keep-alive."""
+
+    __attrs__ = HTTPAdapter.__attrs__ + ["keepalive"]
+
+    def __init__(self, pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize: int = DEFAULT_POOL_MAXSIZE, keepalive: bool = True,
+                 max_retries: int = 0, pool_block: bool = False):
+        """
+        Initialize pooled adapter.
+
+        Args:
+            pool_connections: Number of per-host connection pools to cache
+            pool_maxsize: Maximum number of connections kept per host
+            keepalive: Whether to enable TCP keep-alive on pooled sockets
+            max_retries: Number of connection retries (default: 0)
+            pool_block: Whether to block when the pool has no free connection
+        """
+        self.keepalive = keepalive
+        super().__init__(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                         max_retries=max_retries, pool_block=pool_block)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        """Create the pool manager, adding keep-alive socket options if enabled."""
+        if self.keepalive:
+            pool_kwargs.setdefault(
+                "socket_options",
+                HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+            )
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+
+    def build_response(self, req, resp):
+        """Build the response, flagging whether it was served over a reused connection."""
+        response = super().build_response(req, resp)
+        connection = getattr(resp, "connection", None)
+        if connection is not None:
+            served = getattr(connection, "_requests_served", 0)
+            connection._requests_served = served + 1
+            response.connection_reused = served > 0
+        return response
+
+
+def create_pooled_session(pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+                          pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+                          keepalive: bool = True,
+                          headers: Optional[Dict[str, str]] = None) -> requests.Session:
+    """
+    Create a requests session backed by a pooled adapter.
+
+    Args:
+        pool_connections: Number of per-host connection pools to cache
+        pool_maxsize: Maximum number of connections kept per host
+        keepalive: Whether to keep connections alive between requests
+        headers: Default headers (defaults to JSON content negotiation headers)
+
+    Returns:
+        Configured requests.Session
+    """
+    session = requests.Session()
+    adapter = PooledHTTPAdapter(pool_connections=pool_connections,
+                                pool_maxsize=pool_maxsize, keepalive=keepalive)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(DEFAULT_HEADERS if headers is None else headers)
+    if not keepalive:
+        session.headers["Connection"] = "close"
+    return session
+
+
+def warm_up(session: requests.Session, url: str, timeout: int = 10) -> bool:
+    """
+    Open a pooled connection to the given URL ahead of the first test.
+
+    Errors are swallowed: a failed warm-up only means the first test
+    pays for the handshake itself.
+
+    Args:
+        session: Session whose pool should be warmed up
+        url: URL to connect to
+        timeout: Request timeout in seconds
+
+    Returns:
+        True if the warm-up request completed, False otherwise
+    """
+    try:
+        session.head(url, timeout=timeout)
+    except requests.RequestException:
+        return False
+    return True
+
+
+@contextmanager
+def isolated_session(session: requests.Session) -> Generator[requests.Session, None, None]:
+    """
+    Restore per-test session state on exit.
+
+    Headers, cookies, auth, default params and mounted adapters changed
+    while the context is active are reverted, so a shared session cannot
+    leak state from one test into the next (e.g. a transport, cassette or
+    response cache mounted by an APIClient). Adapters mounted in the
+    meantime are closed, except wrappers (cassette, cache) around one of
+    the restored adapters, whose pooled connections are left untouched.
+
+    Args:
+        session: Shared session to isolate
+
+    Yields:
+        The same session object
+    """
+    headers = session.headers.copy()
+    cookies = session.cookies.copy()
+    auth = session.auth
+    params = dict(session.params)
+    adapters = session.adapters.copy()
+    try:
+        yield session
+    finally:
+        session.headers.clear()
+        session.headers.update(headers)
+        session.cookies = cookies
+        session.auth = auth
+        session.params = params
+        mounted = {id(adapter): adapter for adapter in session.adapters.values()}
+        session.adapters.clear()
+        session.adapters.update(adapters)
+        restored = [id(adapter) for adapter in adapters.values()]
+        for adapter_id, adapter in mounted.items():
+            if adapter_id not in restored and id(getattr(adapter, "inner", None)) not in restored:
+                adapter.close()
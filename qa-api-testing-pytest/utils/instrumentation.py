@@ -0,0 +1,132 @@
+"""
+Request instrumentation hooks for APIClient.
+
+Observers registered with add_observer() are notified about every request
+made through APIClient. An observer is any object implementing some of:
+
+    on_request_start(timing)   before the request is sent
+    on_request_end(timing)     after the response body was downloaded
+                               (or after the request failed)
+    on_json_decoded(timing)    after response.json() was called
+
+All callbacks receive the same RequestTiming object, which is filled in
+as the request progresses. For idempotent methods ``timing.repeat()``
+re-sends the same request straight through the transport, bypassing any
+cassette or response cache, and without notifying observers.
+When no observer is registered APIClient skips instrumentation entirely,
+so the hooks cost nothing unless used.
+"""
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+# Methods whose requests RequestTiming.repeat may re-send
+REPEATABLE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_observers: List[Any] = []
+_lock = threading.Lock()
+
+
+def endpoint_name(method: str, url: str) -> str:
+    """
+    Group a request under its endpoint template.
+
+    Args:
+        method: HTTP method
+        url: Request URL
+
+    Returns:
+        Endpoint name such as ``GET /users/{id}``
+    """
+    return f"{method.upper()} {_ID_SEGMENT.sub('/{id}', urlsplit(url).path) or '/'}"
+
+
+class RequestTiming:
+    """Timing breakdown of a single request (all durations in seconds)."""
+
+    def __init__(self, method: str, url: str, request_kwargs: Dict[str, Any]):
+        """
+        Initialize timing for a request about to be sent.
+
+        Args:
+            method: HTTP method
+            url: Full request URL
+            request_kwargs: Keyword arguments passed to the session
+        """
+        self.method = method.upper()
+        self.url = url
+        self.endpoint = endpoint_name(method, url)
+        self.request_kwargs = request_kwargs
+        self.started_at = time.time()
+        self.status_code: Optional[int] = None
+        self.connection_reused: Optional[bool] = None
+        self.ttfb: Optional[float] = None
+        self.download: Optional[float] = None
+        self.decode: Optional[float] = None
+        self.total: Optional[float] = None
+        self.error: Optional[str] = None
+        # Set for REPEATABLE_METHODS only
+        self.repeat: Optional[Callable[[], Any]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize to a JSON-compatible dict."""
+        return {
+            "method": self.method,
+            "url": self.url,
+            "endpoint": self.endpoint,
+            "started_at": self.started_at,
+            "status_code": self.status_code,
+            "connection_reused": self.connection_reused,
+            "ttfb": self.ttfb,
+            "download": self.download,
+            "decode": self.decode,
+            "total": self.total,
+            "error": self.error,
+        }
+
+
+def add_observer(observer: Any) -> None:
+    """
+    Register an observer for all APIClient requests.
+
+    Args:
+        observer: Object implementing any of the on_* callbacks
+    """
+    with _lock:
+        _observers.append(observer)
+
+
+def remove_observer(observer: Any) -> None:
+    """
+    Unregister an observer added with add_observer().
+
+    Args:
+        observer: Previously registered observer
+    """
+    with _lock:
+        if observer in _observers:
+            _observers.remove(observer)
+
+
+def has_observers() -> bool:
+    """Return True if any observer is registered."""
+    return bool(_observers)
+
+
+def emit(event: str, timing: RequestTiming) -> None:
+    """
+    Notify observers implementing the given callback.
+
+    Args:
+        event: Callback name (e.g. "on_request_end")
+        timing: Timing of the request
+    """
+    for observer in list(_observers):
+        callback = getattr(observer, event, None)
+        if callback is not None:
+            callback(timing)
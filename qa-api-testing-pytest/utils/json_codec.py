@@ -0,0 +1,227 @@
+"""
+Pluggable JSON codecs for APIClient.
+
+APIClient encodes request bodies and decodes ``response.json()`` with a
+codec from this module instead of requests' built-in stdlib handling.
+Codecs decode straight from the ``response.content`` bytes: orjson and
+msgspec parse the bytes in place, while the stdlib fallback lets
+``json.loads`` detect the encoding of the bytes itself.
+
+    ``auto``     first available of orjson, msgspec, stdlib (default)
+    ``orjson``   requires ``pip install orjson``
+    ``msgspec``  requires ``pip install msgspec``
+    ``stdlib``   json module, always available
+
+Run ``python -m utils.json_codec`` for a micro-benchmark of the
+available codecs on large payloads.
+"""
+import argparse
+import functools
+import json
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+
+CODEC_NAMES = ("auto", "orjson", "msgspec", "stdlib")
+
+
+class JSONCodec:
+    """JSON encoder/decoder working on bytes."""
+
+    name = "stdlib"
+
+    # Exceptions raised by loads() for malformed documents
+    decode_errors: tuple = (ValueError,)
+
+    def loads(self, data: bytes) -> Any:
+        """Decode a JSON document from bytes."""
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        """Encode an object as compact UTF-8 JSON."""
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, allow_nan=False).encode("utf-8")
+
+    def decode_response(self, response: requests.Response) -> Any:
+        """
+        Decode a response body.
+
+        Args:
+            response: Response whose body should be decoded
+
+        Returns:
+            Decoded JSON document
+
+        Raises:
+            requests.JSONDecodeError: If the body is not valid JSON
+        """
+        try:
+            return self.loads(response.content)
+        except self.decode_errors as error:
+            if isinstance(error, json.JSONDecodeError):
+                raise requests.JSONDecodeError(error.msg, error.doc, error.pos) from error
+            raise requests.JSONDecodeError(str(error), "", 0) from error
+
+
+class OrjsonCodec(JSONCodec):
+    """Codec backed by orjson."""
+
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+        self.decode_errors = (orjson.JSONDecodeError,)
+
+    def loads(self, data: bytes) -> Any:
+        return self._orjson.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._orjson.dumps(obj, option=self._orjson.OPT_NON_STR_KEYS)
+
+
+class MsgspecCodec(JSONCodec):
+    """Codec backed by msgspec."""
+
+    name = "msgspec"
+
+    def __init__(self):
+        import msgspec
+        self._decoder = msgspec.json.Decoder()
+        self._encoder = msgspec.json.Encoder()
+        self.decode_errors = (msgspec.DecodeError,)
+
+    def loads(self, data: bytes) -> Any:
+        return self._decoder.decode(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj)
+
+
+_BACKENDS: Dict[str, Callable[[], JSONCodec]] = {
+    "orjson": OrjsonCodec,
+    "msgspec": MsgspecCodec,
+    "stdlib": JSONCodec,
+}
+
+_default_name = "auto"
+
+
+@functools.lru_cache(maxsize=None)
+def _create(name: str) -> JSONCodec:
+    return _BACKENDS[name]()
+
+
+def available_codecs() -> List[str]:
+    """Return the names of the codecs whose backend is installed."""
+    names = []
+    for name in _BACKENDS:
+        try:
+            _create(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def get_codec(name: Optional[str] = None) -> JSONCodec:
+    """
+    Return the (shared, stateless) codec of the given name.
+
+    Args:
+        name: One of CODEC_NAMES (default: the name set with set_default_codec)
+
+    Returns:
+        Codec instance
+
+    Raises:
+        ValueError: If the name is unknown
+        ImportError: If the requested backend is not installed
+    """
+    name = name or _default_name
+    if name == "auto":
+        return _create(available_codecs()[0])
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown JSON codec '{name}', expected one of {', '.join(CODEC_NAMES)}")
+    return _create(name)
+
+
+def set_default_codec(name: str) -> None:
+    """
+    Set the codec used by APIClient instances created without an explicit codec.
+
+    Args:
+        name: One of CODEC_NAMES
+    """
+    global _default_name
+    get_codec(name)
+    _default_name = name
+
+
+def _best_of(func: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def benchmark(items: int = 20000, repeat: int = 5) -> List[Dict[str, Any]]:
+    """
+    Time decoding and encoding of large list payloads with every available codec.
+
+    ``requests`` is the baseline: ``Response.json()`` as used before codecs
+    were pluggable.
+
+    Args:
+        items: Number of list elements per payload
+        repeat: Runs per measurement (the fastest run is reported)
+
+    Returns:
+        One row per payload and codec with decode/encode milliseconds and MB/s
+    """
+    from utils.local_server import seed_posts, seed_users
+
+    users, posts = seed_users(), seed_posts()
+    payloads = {
+        "users": [{**users[index % len(users)], "id": index + 1} for index in range(items)],
+        "posts": [{**posts[index % len(posts)], "id": index + 1} for index in range(items)],
+    }
+    rows = []
+    for payload_name, payload in payloads.items():
+        body = json.dumps(payload).encode("utf-8")
+        response = requests.Response()
+        response._content = body
+        response.encoding = "utf-8"
+        baseline = _best_of(response.json, repeat)
+        rows.append({"payload": payload_name, "codec": "requests", "bytes": len(body),
+                     "decode_ms": round(baseline * 1000, 2), "encode_ms": None,
+                     "decode_mb_s": round(len(body) / baseline / 1e6, 1)})
+        for name in available_codecs():
+            codec = get_codec(name)
+            decode = _best_of(lambda: codec.loads(body), repeat)
+            encode = _best_of(lambda: codec.dumps(payload), repeat)
+            rows.append({"payload": payload_name, "codec": name, "bytes": len(body),
+                         "decode_ms": round(decode * 1000, 2), "encode_ms": round(encode * 1000, 2),
+                         "decode_mb_s": round(len(body) / decode / 1e6, 1)})
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Print the codec micro-benchmark as a table."""
+    parser = argparse.ArgumentParser(description="Benchmark the available JSON codecs")
+    parser.add_argument("--items", type=int, default=20000, help="List elements per payload")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement")
+    args = parser.parse_args(argv)
+
+    print(f"{'payload':<8} {'codec':<9} {'size':>10} {'decode ms':>10} {'decode MB/s':>12} {'encode ms':>10}")
+    for row in benchmark(args.items, args.repeat):
+        encode = "-" if row["encode_ms"] is None else f"{row['encode_ms']:.2f}"
+        print(f"{row['payload']:<8} {row['codec']:<9} {row['bytes'] / 1e6:>8.2f}MB "
+              f"{row['decode_ms']:>10.2f} {row['decode_mb_s']:>12.1f} {encode:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Latency budget marker for API tests.
+
+    @pytest.mark.latency_budget(p95=0.5, p99=1.0, samples=20, concurrency=4)
+
+After a marked test passes, every distinct idempotent (GET, HEAD,
+OPTIONS) APIClient call it made is repeated ``samples`` times
+(``concurrency`` at a time) and the latency percentiles are compared with
+the budget. Samples go straight to the transport, so a response cache or
+cassette cannot answer them, and they are not reported to observers. Budgets are given in seconds
+for any of ``p50``, ``p95``, ``p99`` and ``max``. The test fails with a
+summary of the latency distribution when a budget is exceeded.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
+
+import pytest
+
+from utils import instrumentation
+from utils.histogram import LatencyHistogram
+
+
+BUDGET_KEYS = ("p50", "p95", "p99", "max")
+
+DEFAULT_SAMPLES = 20
+
+
+class _CallRecorder:
+    """Instrumentation observer remembering the distinct calls made by a test."""
+
+    def __init__(self):
+        self.calls: Dict[Tuple[str, str, str], Tuple[str, Callable[[], Any]]] = {}
+
+    def on_request_start(self, timing: instrumentation.RequestTiming) -> None:
+        if timing.repeat is None:
+            return
+        key = (timing.method, timing.url, repr(sorted(timing.request_kwargs.items())))
+        self.calls.setdefault(key, (timing.endpoint, timing.repeat))
+
+
+def _timed(call: Callable[[], Any]) -> float:
+    started = time.perf_counter()
+    response = call()
+    response.content
+    elapsed = time.perf_counter() - started
+    response.close()
+    return elapsed
+
+
+def sample_latency(call: Callable[[], Any], samples: int, concurrency: int = 1) -> LatencyHistogram:
+    """
+    Repeat a request and collect its latency distribution.
+
+    Args:
+        call: Zero-argument callable performing the request and returning the response
+        samples: Number of repetitions
+        concurrency: Number of repetitions in flight at once
+
+    Returns:
+        Histogram of the sampled latencies
+    """
+    histogram = LatencyHistogram()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for elapsed in executor.map(lambda _: _timed(call), range(samples)):
+                histogram.record(elapsed)
+    else:
+        for _ in range(samples):
+            histogram.record(_timed(call))
+    return histogram
+
+
+def check_budget(histogram: LatencyHistogram, budget: Dict[str, float]) -> List[str]:
+    """
+    Compare a latency distribution with a budget.
+
+    Args:
+        histogram: Sampled latencies
+        budget: Maximum seconds per key (p50, p95, p99, max)
+
+    Returns:
+        Description of every exceeded budget (empty if within budget)
+    """
+    violations = []
+    for key, limit in budget.items():
+        actual = histogram.max if key == "max" else histogram.percentile(float(key[1:]))
+        if actual > limit:
+            violations.append(f"{key} {actual * 1000:.1f} ms > {limit * 1000:.1f} ms")
+    return violations
+
+
+_recorder_key = pytest.StashKey[_CallRecorder]()
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_runtest_setup(item: pytest.Item) -> None:
+    """Start recording the APIClient calls of a marked test once its fixtures are set up."""
+    if item.get_closest_marker("latency_budget") is None:
+        return
+    recorder = _CallRecorder()
+    item.stash[_recorder_key] = recorder
+    instrumentation.add_observer(recorder)
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_runtest_call(item: pytest.Item) -> None:
+    """Sample the recorded calls of a passed test and enforce its budget."""
+    recorder = item.stash.get(_recorder_key, None)
+    if recorder is None:
+        return
+    instrumentation.remove_observer(recorder)
+
+    marker = item.get_closest_marker("latency_budget")
+    budget = {key: float(marker.kwargs[key]) for key in BUDGET_KEYS if marker.kwargs.get(key) is not None}
+    samples = int(marker.kwargs.get("samples", DEFAULT_SAMPLES))
+    concurrency = int(marker.kwargs.get("concurrency", 1))
+    if not budget or not recorder.calls:
+        return
+
+    failures = []
+    for (method, url, _), (endpoint, repeat) in recorder.calls.items():
+        histogram = sample_latency(repeat, samples, concurrency)
+        violations = check_budget(histogram, budget)
+        if violations:
+            summary = histogram.summary((50.0, 90.0, 95.0, 99.0))
+            distribution = ", ".join(f"{name}={value}" for name, value in summary.items())
+            failures.append(f"{method} {url} ({endpoint}): {'; '.join(violations)}\n"
+                            f"    distribution over {samples} samples x{concurrency}: {distribution}")
+
+    if failures:
+        pytest.fail("Latency budget exceeded:\n  " + "\n  ".join(failures), pytrace=False)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_teardown(item: pytest.Item) -> None:
+    """Stop recording if the test failed before its budget was checked."""
+    recorder = item.stash.get(_recorder_key, None)
+    if recorder is not None:
+        instrumentation.remove_observer(recorder)
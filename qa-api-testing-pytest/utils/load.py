@@ -0,0 +1,261 @@
+"""
+Load-generation mode for the API test scenarios.
+
+With ``--load``, every selected test is first run once as a normal
+functional test. If it passes, the same test function is then executed
+repeatedly by ``--load-users`` concurrent virtual users for
+``--load-duration`` seconds, optionally paced to ``--load-rps`` scenario
+iterations per second and ramped up over ``--load-ramp-up`` seconds.
+Use the existing markers to pick the scenarios, e.g. ``pytest -m smoke --load``.
+
+Latencies of every request made through APIClient are collected via the
+instrumentation hooks per endpoint (``GET /users/{id}``) into HDR-style histograms,
+together with error rates (5xx responses and failed requests) and per-scenario iteration
+latency and failure rates. Results are printed as a terminal summary and
+written to ``--load-report`` as JSON; xdist workers write one shard each,
+which the controller merges.
+"""
+import glob
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from utils import instrumentation
+from utils.histogram import LatencyHistogram
+
+
+DEFAULT_REPORT_PATH = "reports/load.json"
+
+
+class _Stats:
+    """Latency histogram with request and error counters."""
+
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.count = 0
+        self.errors = 0
+        self.first_error: Optional[str] = None
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, error: Optional[str] = None) -> None:
+        self.histogram.record(seconds)
+        with self._lock:
+            self.count += 1
+            if error is not None:
+                self.errors += 1
+                if self.first_error is None:
+                    self.first_error = error
+
+    def merge(self, data: Dict[str, Any]) -> None:
+        self.histogram.merge(LatencyHistogram.from_dict(data["histogram"]))
+        self.count += data["count"]
+        self.errors += data["errors"]
+        self.seconds += data["seconds"]
+        self.first_error = self.first_error or data["first_error"]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "error_rate": round(self.errors / self.count, 4) if self.count else 0.0,
+            "throughput_per_s": round(self.count / self.seconds, 2) if self.seconds else 0.0,
+            "seconds": round(self.seconds, 3),
+            "first_error": self.first_error,
+            "latency": self.histogram.summary(),
+            "histogram": self.histogram.to_dict(),
+        }
+
+
+class _RateLimiter:
+    """Spreads scenario iterations evenly to hit a target rate across all virtual users."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.next_slot = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self, deadline: float) -> bool:
+        """Block until the next free slot; False once the deadline has passed."""
+        if not self.interval:
+            return time.monotonic() < deadline
+        with self._lock:
+            slot = max(self.next_slot, time.monotonic())
+            self.next_slot = slot + self.interval
+        if slot >= deadline:
+            return False
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        return True
+
+
+class LoadRunner:
+    """Pytest plugin running each passing test as a load scenario."""
+
+    def __init__(self, config: pytest.Config):
+        """
+        Initialize from command line options.
+
+        Args:
+            config: Pytest config
+        """
+        self.config = config
+        self.users = config.getoption("--load-users")
+        self.rps = config.getoption("--load-rps")
+        self.ramp_up = config.getoption("--load-ramp-up")
+        self.duration = config.getoption("--load-duration")
+        self.report_path = config.getoption("--load-report")
+        self.worker_id = getattr(config, "workerinput", {}).get("workerid")
+        self.endpoints: Dict[str, _Stats] = {}
+        self.scenarios: Dict[str, _Stats] = {}
+        self._lock = threading.Lock()
+
+    def _endpoint(self, name: str) -> _Stats:
+        with self._lock:
+            return self.endpoints.setdefault(name, _Stats())
+
+    def on_request_end(self, timing: instrumentation.RequestTiming) -> None:
+        """Record the latency of a request made by a virtual user."""
+        error = timing.error
+        if error is None and timing.status_code >= 500:
+            error = f"HTTP {timing.status_code}"
+        self._endpoint(timing.endpoint).record(timing.total, error)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item: pytest.Item):
+        """Run the load phase after the functional run of a test passed."""
+        outcome = yield
+        if outcome.excinfo is None:
+            self.run_scenario(item)
+
+    def run_scenario(self, item: pytest.Item) -> None:
+        """
+        Execute a test repeatedly with concurrent virtual users.
+
+        Args:
+            item: Test item whose fixtures are already set up
+        """
+        instrumentation.add_observer(self)
+        scenario = self.scenarios.setdefault(item.nodeid, _Stats())
+        counts_before = {name: stats.count for name, stats in self.endpoints.items()}
+        limiter = _RateLimiter(self.rps)
+        started = time.monotonic()
+        deadline = started + self.ramp_up + self.duration
+        threads = [
+            threading.Thread(target=self._virtual_user,
+                             args=(item, scenario, limiter, started + self.ramp_up * index / self.users, deadline),
+                             name=f"load-vu-{index}", daemon=True)
+            for index in range(self.users)
+        ]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            instrumentation.remove_observer(self)
+        elapsed = time.monotonic() - started
+        scenario.seconds += elapsed
+        for name, stats in self.endpoints.items():
+            if stats.count > counts_before.get(name, 0):
+                stats.seconds += elapsed
+
+    @staticmethod
+    def _virtual_user(item: pytest.Item, scenario: _Stats, limiter: _RateLimiter,
+                      start_at: float, deadline: float) -> None:
+        delay = start_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        while limiter.wait(deadline):
+            started = time.perf_counter()
+            error = None
+            try:
+                item.runtest()
+            except Exception as exc:
+                error = f"{type(exc).__name__}: {exc}".splitlines()[0]
+            scenario.record(time.perf_counter() - started, error)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize collected statistics."""
+        return {
+            "config": {
+                "users": self.users,
+                "rps": self.rps,
+                "ramp_up": self.ramp_up,
+                "duration": self.duration,
+            },
+            "endpoints": {name: stats.to_dict() for name, stats in sorted(self.endpoints.items())},
+            "scenarios": {name: stats.to_dict() for name, stats in sorted(self.scenarios.items())},
+        }
+
+    def _shard_path(self, worker_id: str) -> str:
+        root, ext = os.path.splitext(self.report_path)
+        return f"{root}.{worker_id}{ext}"
+
+    def pytest_sessionfinish(self, session: pytest.Session) -> None:
+        """Write the report (one shard per xdist worker)."""
+        if self.worker_id is not None:
+            path = self._shard_path(self.worker_id)
+        else:
+            for shard in glob.glob(self._shard_path("gw*")):
+                with open(shard, "r", encoding="utf-8") as shard_file:
+                    data = json.load(shard_file)
+                for group, stats in (("endpoints", self.endpoints), ("scenarios", self.scenarios)):
+                    for name, values in data[group].items():
+                        stats.setdefault(name, _Stats()).merge(values)
+                os.remove(shard)
+            path = self.report_path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as report_file:
+            json.dump(self.to_dict(), report_file, indent=2)
+
+    def pytest_terminal_summary(self, terminalreporter) -> None:
+        """Print latency percentiles and error rates."""
+        terminalreporter.section("load test summary")
+        for title, group in (("endpoint", self.endpoints), ("scenario", self.scenarios)):
+            terminalreporter.write_line(_format_table(title, group))
+            terminalreporter.write_line("")
+        terminalreporter.write_line(f"Load report written to {self.report_path}")
+
+
+def _format_table(title: str, group: Dict[str, _Stats]) -> str:
+    header = f"{title:<60} {'count':>8} {'err%':>6} {'/s':>8} {'p50ms':>9} {'p95ms':>9} {'p99ms':>9} {'maxms':>9}"
+    lines: List[str] = [header, "-" * len(header)]
+    for name, stats in sorted(group.items()):
+        values = stats.to_dict()
+        latency = values["latency"]
+        lines.append(
+            f"{name[-60:]:<60} {values['count']:>8} {values['error_rate'] * 100:>6.2f} "
+            f"{values['throughput_per_s']:>8.1f} {latency['p50_ms']:>9.2f} {latency['p95_ms']:>9.2f} "
+            f"{latency['p99_ms']:>9.2f} {latency['max_ms']:>9.2f}"
+        )
+    return "\n".join(lines)
+
+
+def pytest_addoption(parser):
+    """Register load-generation options."""
+    group = parser.getgroup("load", "Load generation")
+    group.addoption("--load", action="store_true", default=False,
+                    help="Re-run each passing test as a load scenario")
+    group.addoption("--load-users", type=int, default=10,
+                    help="Number of concurrent virtual users (default: %(default)s)")
+    group.addoption("--load-rps", type=float, default=0.0,
+                    help="Target scenario iterations per second, 0 for unlimited (default: %(default)s)")
+    group.addoption("--load-ramp-up", type=float, default=0.0,
+                    help="Seconds over which virtual users are started (default: %(default)s)")
+    group.addoption("--load-duration", type=float, default=10.0,
+                    help="Seconds each scenario runs at full load (default: %(default)s)")
+    group.addoption("--load-report", default=DEFAULT_REPORT_PATH,
+                    help="JSON report path (default: %(default)s)")
+
+
+def pytest_configure(config):
+    """Enable the load runner when --load is given."""
+    if config.getoption("--load"):
+        config.pluginmanager.register(LoadRunner(config), "load-runner")
@@ -0,0 +1,349 @@
+"""
+In-process stand-in for the JSONPlaceholder API.
+
+LocalAPIServer serves seeded ``/users`` and ``/posts`` resources with the
+same status semantics as https://jsonplaceholder.typicode.com (200 for
+reads and updates, 201 for creates, 404 for unknown resources). Writes are
+echoed back but not persisted, exactly like the public service, so tests
+stay independent of each other. Collections can be filtered by field and
+paged with ``_page``/``_limit`` (the total is sent as ``X-Total-Count``).
+
+The server is a threaded HTTP/1.1 server with keep-alive, so it works with
+the pooled session and concurrent clients; it binds an ephemeral port and
+starts in a few milliseconds. Successful reads carry a weak ETag and are
+answered with 304 Not Modified when it matches If-None-Match.
+
+Connections opened with the HTTP/2 connection preface (h2c with prior
+knowledge) are served over HTTP/2 on the same port when the optional
+``h2`` package is installed, so the HTTP/2 transport can be tested offline.
+"""
+import json
+import socket
+import threading
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+
+USER_SEED = [
+    ("Leanne Graham", "Bret", "Sincere@april.biz"),
+    ("Ervin Howell", "Antonette", "Shanna@melissa.tv"),
+    ("Clementine Bauch", "Samantha", "Nathan@yesenia.net"),
+    ("Patricia Lebsack", "Karianne", "Julianne.OConner@kory.org"),
+    ("Chelsey Dietrich", "Kamren", "Lucio_Hettinger@annie.ca"),
+    ("Mrs. Dennis Schulist", "Leopoldo_Corkery", "Karley_Dach@jasper.info"),
+    ("Kurtis Weissnat", "Elwyn.Skiles", "Telly.Hoeger@billy.biz"),
+    ("Nicholas Runolfsdottir V", "Maxime_Nienow", "Sherwood@rosamond.me"),
+    ("Glenna Reichert", "Delphine", "Chaim_McDermott@dana.io"),
+    ("Clementina DuBuque", "Moriah.Stanton", "Rey.Padberg@karina.biz"),
+]
+
+POSTS_PER_USER = 10
+
+# The HTTP/2 connection preface starts with a request line using the
+# otherwise unused PRI method
+_H2_PREFACE_START = b"PRI * HTTP/2.0"
+
+
+def seed_users() -> List[Dict[str, Any]]:
+    """Build the seeded user resources."""
+    users = []
+    for user_id, (name, username, email) in enumerate(USER_SEED, start=1):
+        users.append({
+            "id": user_id,
+            "name": name,
+            "username": username,
+            "email": email,
+            "address": {
+                "street": f"Street {user_id}",
+                "suite": f"Apt. {100 + user_id}",
+                "city": "Gwenborough",
+                "zipcode": f"{10000 + user_id}",
+                "geo": {"lat": f"{-37.3159 + user_id:.4f}", "lng": f"{81.1496 - user_id:.4f}"}
+            },
+            "phone": f"1-770-736-{8030 + user_id}",
+            "website": f"{username.lower().replace('.', '')}.org",
+            "company": {
+                "name": f"Company {user_id}",
+                "catchPhrase": "Multi-layered client-server neural-net",
+                "bs": "harness real-time e-markets"
+            }
+        })
+    return users
+
+
+def seed_posts() -> List[Dict[str, Any]]:
+    """Build the seeded post resources (10 posts per user)."""
+    posts = []
+    for post_id in range(1, len(USER_SEED) * POSTS_PER_USER + 1):
+        posts.append({
+            "userId": (post_id - 1) // POSTS_PER_USER + 1,
+            "id": post_id,
+            "title": f"post {post_id} title",
+            "body": f"body of post {post_id}\nquia et suscipit suscipit recusandae consequuntur"
+        })
+    return posts
+
+
+def _h2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _dump(data: Any) -> bytes:
+    return json.dumps(data, indent=2).encode("utf-8")
+
+
+class JSONPlaceholderApp:
+    """Request router for the seeded JSONPlaceholder resources."""
+
+    def __init__(self):
+        """Seed resources and pre-serialize the read-only responses."""
+        self.resources: Dict[str, Dict[int, Dict[str, Any]]] = {
+            "users": {user["id"]: user for user in seed_users()},
+            "posts": {post["id"]: post for post in seed_posts()},
+        }
+        self._encoded_items = {
+            name: {item_id: _dump(item) for item_id, item in items.items()}
+            for name, items in self.resources.items()
+        }
+        self._encoded_lists = {name: _dump(list(items.values())) for name, items in self.resources.items()}
+
+    def handle(self, method: str, target: str, body: bytes = b"") -> Tuple[int, bytes, Dict[str, str]]:
+        """
+        Route a request.
+
+        Args:
+            method: HTTP method
+            target: Request target (path and optional query string)
+            body: Raw request body
+
+        Returns:
+            Tuple of (status code, JSON response body, extra response headers)
+        """
+        if method == "OPTIONS":
+            return 204, b"", {"Allow": "GET, HEAD, POST, PUT, PATCH, DELETE, OPTIONS"}
+        parts = urlsplit(target)
+        segments = [segment for segment in parts.path.split("/") if segment]
+        if not segments:
+            return 200, b"{}", {}
+
+        items = self.resources.get(segments[0])
+        if items is None or len(segments) > 2:
+            return 404, b"{}", {}
+        name = segments[0]
+
+        item_id: Optional[int] = None
+        if len(segments) == 2:
+            item_id = int(segments[1]) if segments[1].isdigit() else -1
+            if item_id not in items:
+                return 404, b"{}", {}
+
+        if method in ("GET", "HEAD"):
+            if item_id is not None:
+                return 200, self._encoded_items[name][item_id], {}
+            query = parse_qsl(parts.query)
+            if not query:
+                return 200, self._encoded_lists[name], {}
+            return self._list(list(items.values()), query)
+
+        if method in ("POST", "PUT", "PATCH"):
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError:
+                return 400, b"{}", {}
+            if not isinstance(payload, dict):
+                return 400, b"{}", {}
+            if method == "POST":
+                if item_id is not None:
+                    return 404, b"{}", {}
+                return 201, _dump({**payload, "id": max(items) + 1}), {}
+            if item_id is None:
+                return 404, b"{}", {}
+            if method == "PATCH":
+                return 200, _dump({**items[item_id], **payload, "id": item_id}), {}
+            return 200, _dump({**payload, "id": item_id}), {}
+
+        if method == "DELETE":
+            return (200, b"{}", {}) if item_id is not None else (404, b"{}", {})
+
+        return 405, b"{}", {}
+
+    @staticmethod
+    def _list(items: List[Dict[str, Any]], query: List[Tuple[str, str]]) -> Tuple[int, bytes, Dict[str, str]]:
+        paging = {field: value for field, value in query if field in ("_page", "_limit")}
+        for field, value in query:
+            if field not in paging:
+                items = [item for item in items if str(item.get(field)) == value]
+        if not paging:
+            return 200, _dump(items), {}
+        if not all(value.isdigit() for value in paging.values()):
+            return 400, b"{}", {}
+        limit = int(paging.get("_limit", 10))
+        start = (max(int(paging.get("_page", 1)), 1) - 1) * limit
+        return 200, _dump(items[start:start + limit]), {"X-Total-Count": str(len(items))}
+
+
+def _respond_to(app: JSONPlaceholderApp, method: str, target: str, body: bytes,
+                if_none_match: Optional[str]) -> Tuple[int, bytes, Dict[str, str]]:
+    """Route a request and add the JSON content type and ETag/304 handling."""
+    status, payload, headers = app.handle(method, target, body)
+    headers = {"Content-Type": "application/json; charset=utf-8", **headers}
+    if method in ("GET", "HEAD") and status == 200:
+        headers["ETag"] = f'W/"{zlib.crc32(payload):08x}-{len(payload):x}"'
+        if if_none_match == headers["ETag"]:
+            status, payload = 304, b""
+    return status, payload, headers
+
+
+class _H2Connection:
+    """Serves one HTTP/2 connection opened with prior knowledge (h2c)."""
+
+    def __init__(self, app: JSONPlaceholderApp, rfile: Any, sock: socket.socket):
+        from h2.config import H2Configuration
+        from h2.connection import H2Connection
+
+        self.app = app
+        self.rfile = rfile
+        self.sock = sock
+        self.conn = H2Connection(H2Configuration(client_side=False, header_encoding="utf-8"))
+        self.requests: Dict[int, Tuple[Dict[str, str], bytearray]] = {}
+        self.outgoing: Dict[int, memoryview] = {}
+
+    def serve(self) -> None:
+        from h2 import events
+        from h2.exceptions import ProtocolError
+
+        self.conn.initiate_connection()
+        self.sock.sendall(self.conn.data_to_send())
+        while True:
+            data = self.rfile.read1(65536)
+            if not data:
+                return
+            try:
+                received = self.conn.receive_data(data)
+            except ProtocolError:
+                self.sock.sendall(self.conn.data_to_send())
+                return
+            for event in received:
+                if isinstance(event, events.RequestReceived):
+                    self.requests[event.stream_id] = (dict(event.headers), bytearray())
+                elif isinstance(event, events.DataReceived):
+                    self.requests[event.stream_id][1].extend(event.data)
+                    self.conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                elif isinstance(event, events.StreamEnded):
+                    self._respond(event.stream_id)
+                elif isinstance(event, events.StreamReset):
+                    self.requests.pop(event.stream_id, None)
+                    self.outgoing.pop(event.stream_id, None)
+                elif isinstance(event, events.ConnectionTerminated):
+                    self.sock.sendall(self.conn.data_to_send())
+                    return
+            self._send_pending()
+            self.sock.sendall(self.conn.data_to_send())
+
+    def _respond(self, stream_id: int) -> None:
+        headers, body = self.requests.pop(stream_id)
+        method = headers[":method"]
+        status, payload, extra = _respond_to(self.app, method, headers[":path"], bytes(body),
+                                             headers.get("if-none-match"))
+        response_headers = [(":status", str(status)), ("content-length", str(len(payload)))]
+        response_headers += [(name.lower(), value) for name, value in extra.items()]
+        if method == "HEAD" or not payload:
+            self.conn.send_headers(stream_id, response_headers, end_stream=True)
+        else:
+            self.conn.send_headers(stream_id, response_headers)
+            self.outgoing[stream_id] = memoryview(payload)
+
+    def _send_pending(self) -> None:
+        # Send as much of each response body as the flow-control windows allow
+        for stream_id, data in list(self.outgoing.items()):
+            while data:
+                size = min(self.conn.local_flow_control_window(stream_id), self.conn.max_outbound_frame_size)
+                if size <= 0:
+                    break
+                chunk, data = data[:size], data[size:]
+                self.conn.send_data(stream_id, chunk.tobytes(), end_stream=not data)
+            if data:
+                self.outgoing[stream_id] = data
+            else:
+                del self.outgoing[stream_id]
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def handle(self) -> None:
+        """Serve HTTP/1.1, or HTTP/2 if the client opens with the h2c connection preface."""
+        if self.rfile.peek(len(_H2_PREFACE_START)).startswith(b"PRI ") and _h2_available():
+            _H2Connection(self.server.app, self.rfile, self.connection).serve()
+        else:
+            super().handle()
+
+    def _respond(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        status, payload, headers = _respond_to(self.server.app, self.command, self.path, body,
+                                               self.headers.get("If-None-Match"))
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(payload)
+
+    do_GET = do_HEAD = do_POST = do_PUT = do_PATCH = do_DELETE = do_OPTIONS = _respond
+
+    def log_message(self, format: str, *args) -> None:
+        """Silence per-request logging."""
+
+
+class LocalAPIServer(ThreadingHTTPServer):
+    """Threaded HTTP server running JSONPlaceholderApp on an ephemeral port."""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, app: Optional[JSONPlaceholderApp] = None):
+        """
+        Initialize (and bind) the server.
+
+        Args:
+            host: Interface to bind to
+            port: Port to bind to (0 picks a free ephemeral port)
+            app: Router to serve (defaults to a freshly seeded JSONPlaceholderApp)
+        """
+        super().__init__((host, port), _RequestHandler)
+        self.app = app or JSONPlaceholderApp()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """Base URL of the running server."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "LocalAPIServer":
+        """Start serving in a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, name="local-api-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and release the port."""
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "LocalAPIServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
@@ -0,0 +1,118 @@
+"""
+Paginated collection walking with concurrent prefetch.
+
+iter_pages() fetches page after page of a collection and yields each
+page's items in order. While the caller works through one page, the next
+``prefetch`` pages are already being downloaded on a small thread pool,
+so walking N pages costs roughly N / prefetch round trips instead of N.
+At most ``prefetch`` pages are in flight or buffered at any time, which
+bounds memory use independently of the collection size.
+
+Both wrapped responses (``{"data": [...], "page": 1, "total_pages": 5}``)
+and bare arrays (JSONPlaceholder's ``?_page=1&_limit=10`` with an
+``X-Total-Count`` header) are supported. When the number of pages is
+unknown, the walk stops at the first empty or short page.
+"""
+import math
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple, Union
+
+import requests
+
+
+DEFAULT_PREFETCH = 4
+
+# A fetched page: its items and the last page number, if the server told us
+PageResult = Tuple[List[Any], Optional[int]]
+
+
+def parse_page(response: requests.Response, data_key: str = "data",
+               page_size: Optional[int] = None) -> PageResult:
+    """
+    Extract the items and the last page number from a page response.
+
+    Args:
+        response: Response of one page request
+        data_key: Key holding the list for wrapped responses
+        page_size: Requested page size (used with total counts)
+
+    Returns:
+        Tuple of (items, last page number or None if unknown)
+    """
+    data: Union[Dict[str, Any], List[Any]] = response.json()
+    total: Optional[int] = None
+    if isinstance(data, list):
+        items = data
+    else:
+        assert data_key in data, f"Response should contain '{data_key}' key"
+        items = data[data_key]
+        assert isinstance(items, list), f"'{data_key}' should be a list"
+        if isinstance(data.get("total_pages"), int):
+            return items, data["total_pages"]
+        if isinstance(data.get("per_page"), int):
+            page_size = data["per_page"]
+        if isinstance(data.get("total"), int):
+            total = data["total"]
+    header = response.headers.get("X-Total-Count")
+    if total is None and header is not None and header.isdigit():
+        total = int(header)
+    if total is not None and page_size:
+        return items, max(1, math.ceil(total / page_size))
+    return items, None
+
+
+def iter_pages(fetch_page: Callable[[int], PageResult], first_page: int = 1,
+               prefetch: int = DEFAULT_PREFETCH, page_size: Optional[int] = None,
+               max_pages: Optional[int] = None) -> Iterator[List[Any]]:
+    """
+    Yield the items of consecutive pages, prefetching the following pages.
+
+    The first page is fetched on its own to learn the number of pages;
+    afterwards up to ``prefetch`` pages are requested ahead of the page
+    being consumed. Closing the iterator early cancels pending pages.
+
+    Args:
+        fetch_page: Callable fetching one page number, returning (items, last page or None)
+        first_page: Number of the first page
+        prefetch: Number of pages fetched ahead (0 fetches sequentially)
+        page_size: Expected items per page; a shorter page ends the walk
+        max_pages: Optional maximum number of pages to walk
+
+    Yields:
+        List of items of each page, in page order
+    """
+    stop = first_page + max_pages - 1 if max_pages is not None else None
+    if prefetch <= 0:
+        page = first_page
+        while stop is None or page <= stop:
+            items, last_page = fetch_page(page)
+            if not items:
+                return
+            yield items
+            if (last_page is not None and page >= last_page) or (page_size and len(items) < page_size):
+                return
+            page += 1
+        return
+
+    executor = ThreadPoolExecutor(max_workers=prefetch, thread_name_prefix="api-paginate")
+    pending: Deque[Tuple[int, Future]] = deque([(first_page, executor.submit(fetch_page, first_page))])
+    next_page = first_page + 1
+    try:
+        while pending:
+            page, future = pending.popleft()
+            items, last_page = future.result()
+            if last_page is not None:
+                stop = last_page if stop is None else min(stop, last_page)
+            if not items or (stop is not None and page > stop):
+                return
+            while len(pending) < prefetch and (stop is None or next_page <= stop):
+                pending.append((next_page, executor.submit(fetch_page, next_page)))
+                next_page += 1
+            yield items
+            if (stop is not None and page >= stop) or (page_size and len(items) < page_size):
+                return
+    finally:
+        for _, future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
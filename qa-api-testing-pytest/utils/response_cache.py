@@ -0,0 +1,330 @@
+"""
+Opt-in GET response cache for API requests.
+
+Successful GET responses are kept for ``ttl`` seconds in an LRU store of at
+most ``max_entries`` responses, so repeated reads of the same resource
+(``users/1``, ``posts``...) hit the network once. Once an entry expires and
+the server sent an ETag or Last-Modified header, the next read is
+revalidated with If-None-Match/If-Modified-Since; a 304 answer refreshes
+the entry without downloading the body again. A response is stored once
+its body has been read to the end, so streamed and chunked responses are
+cached as well.
+
+Any POST/PUT/PATCH/DELETE invalidates cached entries for the same resource
+path, its sub-resources and its parent collections (a PUT to ``users/1``
+drops ``users/1`` and ``users``).
+
+The store lives in memory by default (shared by all tests of a process).
+With a file path it is a SQLite database shared by all xdist workers.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from utils.cassette import build_response
+
+
+DEFAULT_TTL = 300.0
+DEFAULT_MAX_ENTRIES = 1024
+
+WRITE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+# Request headers that change the representation and therefore the cache key
+_VARY_HEADERS = ("Accept", "Accept-Encoding", "Authorization")
+
+_STORED_HEADERS_EXCLUDED = ("content-encoding", "transfer-encoding", "content-length")
+
+
+class CacheEntry:
+    """A cached response."""
+
+    def __init__(self, path: str, status: int, reason: str, headers: Dict[str, str],
+                 body: bytes, stored_at: float):
+        self.path = path
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+        self.stored_at = stored_at
+
+    @property
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating this entry."""
+        headers = CaseInsensitiveDict(self.headers)
+        conditional = {}
+        if "ETag" in headers:
+            conditional["If-None-Match"] = headers["ETag"]
+        if "Last-Modified" in headers:
+            conditional["If-Modified-Since"] = headers["Last-Modified"]
+        return conditional
+
+
+def _affected_paths(path: str) -> Tuple[str, List[str]]:
+    path = path.rstrip("/") or "/"
+    segments = [segment for segment in path.split("/") if segment]
+    ancestors = ["/" + "/".join(segments[:depth]) for depth in range(1, len(segments))]
+    return path, ancestors
+
+
+class _MemoryStore:
+    """Per-process LRU store."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def touch(self, key: str, stored_at: float) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._entries[key].stored_at = stored_at
+
+    def invalidate(self, path: str) -> None:
+        path, ancestors = _affected_paths(path)
+        with self._lock:
+            for key in [key for key, entry in self._entries.items()
+                        if entry.path == path or entry.path.startswith(path + "/") or entry.path in ancestors]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def close(self) -> None:
+        pass
+
+
+class _SQLiteStore:
+    """LRU store in a SQLite file shared between processes."""
+
+    def __init__(self, path: str, max_entries: int):
+        self.max_entries = max_entries
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, path TEXT, status INTEGER, "
+            "reason TEXT, headers TEXT, body BLOB, stored_at REAL, accessed_at REAL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS responses_path ON responses (path)")
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT path, status, reason, headers, body, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._connection.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        path, status, reason, headers, body, stored_at = row
+        return CacheEntry(path, status, reason, json.loads(headers), bytes(body), stored_at)
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, entry.path, entry.status, entry.reason, json.dumps(entry.headers),
+                 entry.body, entry.stored_at, time.time())
+            )
+            self._connection.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses "
+                "ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)", (self.max_entries,)
+            )
+
+    def touch(self, key: str, stored_at: float) -> None:
+        with self._lock:
+            self._connection.execute("UPDATE responses SET stored_at = ? WHERE key = ?", (stored_at, key))
+
+    def invalidate(self, path: str) -> None:
+        path, ancestors = _affected_paths(path)
+        with self._lock:
+            self._connection.execute(
+                f"DELETE FROM responses WHERE path = ? OR path LIKE ? ESCAPE '\\' "
+                f"OR path IN ({', '.join('?' * len(ancestors)) or 'NULL'})",
+                (path, path.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "/%", *ancestors)
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class ResponseCache:
+    """LRU/TTL cache of GET responses with conditional revalidation."""
+
+    def __init__(self, ttl: float = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 path: Optional[str] = None):
+        """
+        Initialize response cache.
+
+        Args:
+            ttl: Seconds a response is served without contacting the server
+            max_entries: Maximum number of cached responses (least recently used are evicted)
+            path: Optional SQLite file to share the cache between processes
+        """
+        self.ttl = ttl
+        self.store = _SQLiteStore(path, max_entries) if path else _MemoryStore(max_entries)
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(request: requests.PreparedRequest) -> str:
+        """
+        Build the cache key of a GET request (URL plus representation headers).
+
+        Args:
+            request: Prepared request
+
+        Returns:
+            Hex digest identifying the cached representation
+        """
+        digest = hashlib.sha256(request.url.encode("utf-8"))
+        for header in _VARY_HEADERS:
+            digest.update(b"\0" + (request.headers.get(header) or "").encode("utf-8"))
+        return digest.hexdigest()
+
+    def invalidate(self, url: str) -> None:
+        """
+        Drop cached entries affected by a write to the given URL.
+
+        Args:
+            url: URL (or path) that was written to
+        """
+        self.store.invalidate(urlsplit(url).path)
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        self.store.clear()
+
+    def close(self) -> None:
+        """Release the underlying store."""
+        self.store.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/revalidation/miss counters."""
+        return {"hits": self.hits, "revalidated": self.revalidated, "misses": self.misses}
+
+
+class CachingAdapter(BaseAdapter):
+    """Transport adapter answering GET requests from a ResponseCache."""
+
+    def __init__(self, cache: ResponseCache, inner: BaseAdapter):
+        """
+        Initialize caching adapter.
+
+        Args:
+            cache: Cache to serve from and store to
+            inner: Adapter that performs real requests
+        """
+        super().__init__()
+        self.cache = cache
+        self.inner = inner
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        """Serve GET requests from the cache and invalidate it on writes."""
+        method = request.method.upper()
+        if method != "GET":
+            response = self.inner.send(request, **kwargs)
+            if method in WRITE_METHODS:
+                self.cache.invalidate(request.url)
+            return response
+
+        key = self.cache.key(request)
+        entry = self.cache.store.get(key)
+        if entry is not None and time.time() - entry.stored_at < self.cache.ttl:
+            self.cache.hits += 1
+            return self._from_entry(request, entry)
+        if entry is not None:
+            request.headers.update(entry.validators)
+
+        response = self.inner.send(request, **kwargs)
+
+        if entry is not None and response.status_code == 304:
+            self.cache.revalidated += 1
+            self.cache.store.touch(key, time.time())
+            response.close()
+            return self._from_entry(request, entry)
+
+        self.cache.misses += 1
+        if response.status_code == 200 and "no-store" not in response.headers.get("Cache-Control", ""):
+            self._store_when_read(key, request, response)
+        return response
+
+    def _store_when_read(self, key: str, request: requests.PreparedRequest, response: requests.Response) -> None:
+        """Store the response once its body has been read to the end (streamed or not, any length)."""
+        iter_content = response.iter_content
+        headers = {name: value for name, value in response.headers.items()
+                   if name.lower() not in _STORED_HEADERS_EXCLUDED}
+        stored = []
+
+        def capturing_iter_content(*args, **kwargs):
+            chunks = []
+            for chunk in iter_content(*args, **kwargs):
+                chunks.append(chunk)
+                yield chunk
+            # Text chunks (decode_unicode=True) cannot be stored as the raw body
+            if not stored and all(isinstance(chunk, bytes) for chunk in chunks):
+                stored.append(True)
+                self.cache.store.put(key, CacheEntry(urlsplit(request.url).path, response.status_code,
+                                                     response.reason, headers, b"".join(chunks), time.time()))
+
+        response.iter_content = capturing_iter_content
+
+    def _from_entry(self, request: requests.PreparedRequest, entry: CacheEntry) -> requests.Response:
+        response = build_response(request, {"status": entry.status, "reason": entry.reason,
+                                            "headers": entry.headers}, entry.body)
+        response.connection = self
+        response.from_cache = True
+        return response
+
+    def close(self) -> None:
+        """Close the wrapped adapter."""
+        self.inner.close()
+
+
+def use_response_cache(session: requests.Session, cache: ResponseCache) -> ResponseCache:
+    """
+    Route a session's HTTP(S) traffic through a response cache.
+
+    Args:
+        session: Session to install the cache on
+        cache: Cache to use
+
+    Returns:
+        The same ResponseCache
+    """
+    wrapped: Dict[int, CachingAdapter] = {}
+    for prefix in ("http://", "https://"):
+        inner = session.get_adapter(prefix)
+        if id(inner) not in wrapped:
+            wrapped[id(inner)] = CachingAdapter(cache, inner)
+        session.mount(prefix, wrapped[id(inner)])
+    return cache
@@ -0,0 +1,221 @@
+"""
+Declarative response schemas compiled into fast validators.
+
+A schema is a plain dict mapping field names to the expected type, a tuple
+of allowed types, or a nested schema dict:
+
+    USER_SCHEMA = {"id": int, "name": str, "email": str, "username": str}
+
+compile_schema() turns a schema into a Validator once (results are cached
+per schema). The validator's fast path is generated Python source with all
+field checks inlined into a single expression, so checking every element
+of a 10k-item list response takes milliseconds. Detailed error messages
+are only built for the elements that fail.
+
+Types are matched exactly as produced by the JSON decoder: ``bool`` is not
+accepted where ``int`` is expected, while ``float`` accepts integers.
+"""
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, List, Sequence, Tuple, Union
+
+
+USER_SCHEMA = {
+    "id": int,
+    "name": str,
+    "username": str,
+    "email": str,
+}
+
+POST_SCHEMA = {
+    "userId": int,
+    "id": int,
+    "title": str,
+    "body": str,
+}
+
+MAX_REPORTED_ERRORS = 20
+
+_TYPE_NAMES = {
+    int: "an integer",
+    float: "a number",
+    str: "a string",
+    bool: "a boolean",
+    list: "a list",
+    dict: "an object",
+    type(None): "null",
+}
+
+_ACCEPTED_TYPES = {
+    float: (int, float),
+}
+
+
+class _Missing:
+    """Sentinel type for absent fields; never an accepted type."""
+
+
+_MISSING = _Missing()
+
+
+def _freeze(schema: Dict[str, Any]) -> Tuple:
+    frozen = []
+    for field, expected in schema.items():
+        if isinstance(expected, dict):
+            expected = ("schema", _freeze(expected))
+        elif isinstance(expected, tuple):
+            expected = ("types", expected)
+        else:
+            expected = ("types", (expected,))
+        frozen.append((field, expected))
+    return tuple(frozen)
+
+
+def _accepted(types: Tuple[type, ...]) -> Tuple[type, ...]:
+    accepted: List[type] = []
+    for expected in types:
+        for accepted_type in _ACCEPTED_TYPES.get(expected, (expected,)):
+            if accepted_type not in accepted:
+                accepted.append(accepted_type)
+    return tuple(accepted)
+
+
+def _describe(types: Tuple[type, ...]) -> str:
+    return " or ".join(_TYPE_NAMES.get(expected, expected.__name__) for expected in types)
+
+
+class Validator:
+    """Compiled validator for one schema."""
+
+    def __init__(self, frozen_schema: Tuple, optional: FrozenSet[str]):
+        """
+        Compile a frozen schema.
+
+        Args:
+            frozen_schema: Schema as produced by _freeze()
+            optional: Names of top-level fields that may be absent
+        """
+        self.fields = frozen_schema
+        self.optional = optional
+        self._nested: Dict[str, "Validator"] = {}
+        namespace: Dict[str, Any] = {"_MISSING": _MISSING}
+        clauses = ["type(obj) is dict"]
+
+        for position, (field, (kind, value)) in enumerate(frozen_schema):
+            if kind == "schema":
+                nested = _compile(value, frozenset())
+                self._nested[field] = nested
+                namespace[f"_v{position}"] = nested.is_valid
+                check = f"_v{position}(obj.get({field!r}, _MISSING))"
+            else:
+                namespace[f"_t{position}"] = _accepted(value)
+                check = f"type(obj.get({field!r}, _MISSING)) in _t{position}"
+            if field in optional:
+                check = f"({field!r} not in obj or {check})"
+            clauses.append(check)
+
+        expression = " and ".join(clauses)
+        source = (
+            f"def is_valid(obj):\n"
+            f"    return {expression}\n"
+            f"def invalid_indices(items):\n"
+            f"    return [index for index, obj in enumerate(items) if not ({expression})]\n"
+        )
+        exec(compile(source, "<schema validator>", "exec"), namespace)
+        self.is_valid = namespace["is_valid"]
+        self._invalid_indices = namespace["invalid_indices"]
+
+    def errors(self, obj: Any, label: str = "Item") -> List[str]:
+        """
+        Describe every violation of a single object.
+
+        Args:
+            obj: Decoded JSON value to check
+            label: Prefix used in messages (e.g. "User")
+
+        Returns:
+            List of violation messages (empty if the object is valid)
+        """
+        if not isinstance(obj, dict):
+            return [f"{label} should be an object, got {type(obj).__name__}"]
+        messages = []
+        for field, (kind, value) in self.fields:
+            if field not in obj:
+                if field not in self.optional:
+                    messages.append(f"{label} should contain '{field}' field")
+                continue
+            if kind == "schema":
+                messages.extend(self._nested[field].errors(obj[field], f"{label} '{field}'"))
+            elif type(obj[field]) not in _accepted(value):
+                messages.append(f"{label} '{field}' should be {_describe(value)}, "
+                                f"got {type(obj[field]).__name__}")
+        return messages
+
+    def validate_many(self, items: Sequence[Any], label: str = "Item") -> List[str]:
+        """
+        Check every element of a list in one pass.
+
+        Args:
+            items: Decoded JSON list
+            label: Prefix used in messages (e.g. "Post")
+
+        Returns:
+            List of violation messages for all failing elements
+        """
+        messages = []
+        for index in self._invalid_indices(items):
+            messages.extend(self.errors(items[index], f"{label} [{index}]"))
+        return messages
+
+
+@lru_cache(maxsize=None)
+def _compile(frozen_schema: Tuple, optional: FrozenSet[str]) -> Validator:
+    return Validator(frozen_schema, optional)
+
+
+def compile_schema(schema: Dict[str, Any], optional: Iterable[str] = ()) -> Validator:
+    """
+    Compile (or fetch the cached) validator for a schema.
+
+    Args:
+        schema: Mapping of field name to type, tuple of types or nested schema
+        optional: Names of top-level fields that may be absent
+
+    Returns:
+        Validator for the schema
+    """
+    return _compile(_freeze(schema), frozenset(optional))
+
+
+def assert_no_errors(messages: List[str]) -> None:
+    """
+    Raise a single AssertionError listing all violations.
+
+    Args:
+        messages: Violation messages collected by a Validator
+
+    Raises:
+        AssertionError: If any violations were collected
+    """
+    if not messages:
+        return
+    reported = messages[:MAX_REPORTED_ERRORS]
+    if len(messages) > len(reported):
+        reported.append(f"... and {len(messages) - len(reported)} more violations")
+    raise AssertionError(f"Schema validation failed with {len(messages)} violation(s):\n  "
+                         + "\n  ".join(reported))
+
+
+def validate_items(items: Union[Sequence[Any], Any], schema: Dict[str, Any], label: str = "Item") -> None:
+    """
+    Validate every element of a list response against a schema.
+
+    Args:
+        items: Decoded JSON list
+        schema: Schema every element must match
+        label: Prefix used in messages (e.g. "User")
+
+    Raises:
+        AssertionError: Listing all violations, if any element is invalid
+    """
+    assert isinstance(items, list), f"{label} list should be a list, got {type(items).__name__}"
+    assert_no_errors(compile_schema(schema).validate_many(items, label))
@@ -0,0 +1,186 @@
+"""
+Incremental JSON parsing for large list responses.
+
+iter_json_array() yields the elements of a JSON array as soon as each one
+has been received, reading the body chunk by chunk. Only the unparsed tail
+of the body is buffered, so memory use is bounded by the largest single
+element rather than the size of the whole response. Both bare arrays
+(JSONPlaceholder) and wrapped responses (``{"data": [...], "page": 1}``)
+are supported.
+"""
+import codecs
+import json
+import re
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+import requests
+
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# Text that can still grow into a valid token: the start of a literal or the tail of a number
+_LITERALS = ("true", "false", "null", "NaN", "Infinity", "-Infinity")
+_NUMBER_TAIL = re.compile(r"[-+.eE0-9]*")
+
+
+class JSONStreamError(ValueError):
+    """Raised when a streamed body is not the expected JSON structure."""
+
+
+def _is_truncated(exc: json.JSONDecodeError, buffer: str) -> bool:
+    """Whether a decode error may only mean the value continues in the next chunk."""
+    rest = buffer[exc.pos:]
+    if not rest or exc.msg.startswith("Unterminated string"):
+        return True
+    if exc.msg.startswith("Invalid \\uXXXX escape"):
+        return len(rest) < 6
+    return any(literal.startswith(rest) for literal in _LITERALS) or _NUMBER_TAIL.fullmatch(rest) is not None
+
+
+class _StreamReader:
+    """Buffered cursor over a stream of JSON text chunks."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, minimum: int = 1) -> bool:
+        """Append at least ``minimum`` characters (fewer at end of stream); False at EOF."""
+        if self.eof:
+            return False
+        if self.pos > DEFAULT_CHUNK_SIZE:
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        added = 0
+        while added < minimum:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                text = self._decoder.decode(b"", final=True)
+                self.eof = True
+            else:
+                text = self._decoder.decode(chunk)
+            self.buffer += text
+            added += len(text)
+            if self.eof:
+                break
+        return added > 0 or not self.eof
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it ('' at EOF)."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, expected: str) -> str:
+        """Consume the next non-whitespace character, which must be one of ``expected``."""
+        char = self.peek()
+        if not char or char not in expected:
+            found = repr(char) if char else "end of body"
+            raise JSONStreamError(f"Expected one of {expected!r} at offset {self.pos}, found {found}")
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                obj, end = self._json.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as exc:
+                # Only a value cut off by the end of the buffer is worth reading more for
+                if self.eof or not _is_truncated(exc, self.buffer):
+                    raise JSONStreamError(f"Invalid JSON in streamed body: {exc}") from exc
+            else:
+                # A value ending exactly at the buffer end may be a truncated number or literal
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return obj
+            # Grow the buffer geometrically so large values are not re-parsed per chunk
+            self.fill(max(len(self.buffer) - self.pos, 1))
+
+
+def iter_json_array(chunks: Iterable[bytes], data_key: str = "data",
+                    metadata: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+    """
+    Yield the elements of a streamed JSON array one at a time.
+
+    Args:
+        chunks: Body chunks (e.g. ``response.iter_content(...)``)
+        data_key: Key holding the list when the body is a JSON object
+                  (ignored for bare arrays)
+        metadata: Optional dict filled with the other top-level fields of a
+                  wrapped response (complete once the iterator is exhausted)
+
+    Yields:
+        Decoded array elements
+
+    Raises:
+        JSONStreamError: If the body is malformed or holds no such array
+    """
+    reader = _StreamReader(chunks)
+    first = reader.expect("[{")
+
+    if first == "[":
+        yield from _iter_elements(reader)
+    else:
+        found = False
+        if reader.peek() == "}":
+            reader.pos += 1
+        else:
+            while True:
+                key = reader.value()
+                if not isinstance(key, str):
+                    raise JSONStreamError(f"Expected object key at offset {reader.pos}")
+                reader.expect(":")
+                if key == data_key and reader.peek() == "[":
+                    reader.pos += 1
+                    found = True
+                    yield from _iter_elements(reader)
+                else:
+                    value = reader.value()
+                    if metadata is not None:
+                        metadata[key] = value
+                if reader.expect(",}") == "}":
+                    break
+        if not found:
+            raise JSONStreamError(f"Response should contain '{data_key}' list")
+
+    if reader.peek():
+        raise JSONStreamError(f"Unexpected data after JSON value at offset {reader.pos}")
+
+
+def _iter_elements(reader: _StreamReader) -> Iterator[Any]:
+    if reader.peek() == "]":
+        reader.pos += 1
+        return
+    while True:
+        yield reader.value()
+        if reader.expect(",]") == "]":
+            return
+
+
+def iter_response_items(response: requests.Response, data_key: str = "data",
+                        metadata: Optional[Dict[str, Any]] = None,
+                        chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Yield list elements from a (streamed) response body as they arrive.
+
+    Args:
+        response: Response obtained with ``stream=True`` (e.g. APIClient.stream)
+        data_key: Key holding the list for wrapped responses
+        metadata: Optional dict filled with the other top-level fields
+        chunk_size: Number of bytes read from the socket at a time
+
+    Yields:
+        Decoded list elements
+    """
+    return iter_json_array(response.iter_content(chunk_size=chunk_size), data_key, metadata)
@@ -0,0 +1,193 @@
+"""
+Per-request timing report for the API suite.
+
+With ``--api-timings``, every APIClient request is timed through the
+instrumentation hooks (see utils/instrumentation.py): time to first byte,
+body download, JSON decode, total time and whether a pooled connection
+was reused. Timings are aggregated per endpoint and per test, attached to
+each test's record in the result log (qa_plugins.results, rendered as a
+table in the HTML report) and written to ``--api-timings-report`` as JSON. Under xdist each worker writes a shard
+that the controller merges into the final file.
+"""
+import glob
+import html
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+import pytest
+from qa_plugins.results import attach_html
+
+from utils import instrumentation
+from utils.histogram import LatencyHistogram
+
+
+DEFAULT_REPORT_PATH = "reports/timings.json"
+
+PHASES = ("total", "ttfb", "download", "decode")
+
+
+class _EndpointTimings:
+    """Histograms of each timing phase for one endpoint."""
+
+    def __init__(self):
+        self.requests = 0
+        self.new_connections = 0
+        self.errors = 0
+        self.histograms = {phase: LatencyHistogram() for phase in PHASES}
+
+    def add(self, timing: instrumentation.RequestTiming) -> None:
+        self.requests += 1
+        self.new_connections += timing.connection_reused is False
+        self.errors += timing.error is not None
+        for phase in PHASES:
+            value = getattr(timing, phase)
+            if value is not None:
+                self.histograms[phase].record(value)
+
+    def merge(self, data: Dict[str, Any]) -> None:
+        self.requests += data["requests"]
+        self.new_connections += data["new_connections"]
+        self.errors += data["errors"]
+        for phase in PHASES:
+            self.histograms[phase].merge(LatencyHistogram.from_dict(data["histograms"][phase]))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "errors": self.errors,
+            **{phase: self.histograms[phase].summary() for phase in PHASES},
+            "histograms": {phase: self.histograms[phase].to_dict() for phase in PHASES},
+        }
+
+
+def summarize_test(timings: List[instrumentation.RequestTiming]) -> Dict[str, Any]:
+    """
+    Aggregate the requests made by one test.
+
+    Args:
+        timings: Timings recorded while the test ran
+
+    Returns:
+        Dict with request count, summed phase times (ms) and per-endpoint counts
+    """
+    summary: Dict[str, Any] = {
+        "requests": len(timings),
+        "new_connections": sum(timing.connection_reused is False for timing in timings),
+        "errors": sum(timing.error is not None for timing in timings),
+        "endpoints": {},
+    }
+    for phase in PHASES:
+        summary[f"{phase}_ms"] = round(sum(getattr(timing, phase) or 0.0 for timing in timings) * 1000, 3)
+    for timing in timings:
+        summary["endpoints"][timing.endpoint] = summary["endpoints"].get(timing.endpoint, 0) + 1
+    return summary
+
+
+def _html_table(timings: List[instrumentation.RequestTiming]) -> str:
+    rows = "".join(
+        f"<tr><td>{timing.method}</td><td>{html.escape(timing.url)}</td><td>{html.escape(str(timing.status_code or timing.error))}</td>"
+        f"<td>{'reused' if timing.connection_reused else 'new' if timing.connection_reused is False else '-'}</td>"
+        + "".join(f"<td>{(getattr(timing, phase) or 0.0) * 1000:.2f}</td>" for phase in PHASES)
+        + "</tr>"
+        for timing in timings
+    )
+    header = "".join(f"<th>{phase} ms</th>" for phase in PHASES)
+    return (f"<table><tr><th>method</th><th>url</th><th>status</th><th>connection</th>{header}</tr>"
+            f"{rows}</table>")
+
+
+class TimingCollector:
+    """Pytest plugin collecting APIClient timings per test and per endpoint."""
+
+    def __init__(self, config: pytest.Config):
+        """
+        Initialize from command line options.
+
+        Args:
+            config: Pytest config
+        """
+        self.config = config
+        self.report_path = config.getoption("--api-timings-report")
+        self.worker_id = getattr(config, "workerinput", {}).get("workerid")
+        self.endpoints: Dict[str, _EndpointTimings] = {}
+        self.tests: Dict[str, Dict[str, Any]] = {}
+        self._current: Optional[List[instrumentation.RequestTiming]] = None
+        self._lock = threading.Lock()
+
+    def on_request_end(self, timing: instrumentation.RequestTiming) -> None:
+        """Keep the timing for the running test (phases may still be filled in later)."""
+        with self._lock:
+            if self._current is not None:
+                self._current.append(timing)
+
+    def pytest_sessionstart(self, session: pytest.Session) -> None:
+        """Start observing APIClient requests."""
+        instrumentation.add_observer(self)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item: pytest.Item, nextitem: Optional[pytest.Item]):
+        """Collect the timings of one test (setup, call and teardown)."""
+        self._current = []
+        yield
+        with self._lock:
+            timings, self._current = self._current, None
+        for timing in timings:
+            self.endpoints.setdefault(timing.endpoint, _EndpointTimings()).add(timing)
+        if timings:
+            self.tests[item.nodeid] = summarize_test(timings)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item: pytest.Item, call: pytest.CallInfo):
+        """Attach the request timings of the test to its result record."""
+        outcome = yield
+        report = outcome.get_result()
+        if report.when == "call" and self._current:
+            attach_html(report, _html_table(list(self._current)), name="request timings")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize collected timings."""
+        return {
+            "endpoints": {name: stats.to_dict() for name, stats in sorted(self.endpoints.items())},
+            "tests": dict(sorted(self.tests.items())),
+        }
+
+    def _shard_path(self, worker_id: str) -> str:
+        root, ext = os.path.splitext(self.report_path)
+        return f"{root}.{worker_id}{ext}"
+
+    def pytest_sessionfinish(self, session: pytest.Session) -> None:
+        """Write the report (one shard per xdist worker)."""
+        instrumentation.remove_observer(self)
+        if self.worker_id is not None:
+            path = self._shard_path(self.worker_id)
+        else:
+            for shard in glob.glob(self._shard_path("gw*")):
+                with open(shard, "r", encoding="utf-8") as shard_file:
+                    data = json.load(shard_file)
+                for name, values in data["endpoints"].items():
+                    self.endpoints.setdefault(name, _EndpointTimings()).merge(values)
+                self.tests.update(data["tests"])
+                os.remove(shard)
+            path = self.report_path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as report_file:
+            json.dump(self.to_dict(), report_file, indent=2)
+
+
+def pytest_addoption(parser):
+    """Register timing report options."""
+    group = parser.getgroup("api", "API client options")
+    group.addoption("--api-timings", action="store_true", default=False,
+                    help="Record per-request timings of APIClient calls")
+    group.addoption("--api-timings-report", default=DEFAULT_REPORT_PATH,
+                    help="JSON timing report path (default: %(default)s)")
+
+
+def pytest_configure(config):
+    """Enable the timing collector when --api-timings is given."""
+    if config.getoption("--api-timings"):
+        config.pluginmanager.register(TimingCollector(config), "api-timings")
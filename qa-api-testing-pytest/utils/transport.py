@@ -0,0 +1,239 @@
+"""
+Pluggable HTTP transports for the API session.
+
+requests sends every request through the transport adapter mounted for
+its URL prefix. The default ``http1`` transport is the pooled HTTP/1.1
+adapter from utils/http_session.py, which needs one connection per
+request in flight. The ``http2`` transport sends requests with httpx over
+HTTP/2, multiplexing all concurrent requests (async fan-out, bulk writes,
+page prefetch) as streams over a single connection per host.
+
+Because transports are requests adapters, APIClient's get/post/put/delete,
+the session's headers, and the cassette and response cache layers work
+the same on both. HTTP/2 needs the optional ``httpx[http2]`` dependency.
+Plain ``http://`` URLs use h2c with prior knowledge, and ``https://`` URLs
+negotiate h2 via ALPN.
+"""
+import asyncio
+import threading
+import weakref
+from datetime import timedelta
+from typing import Any, AsyncIterator, Awaitable, Dict, Iterator, Optional, Tuple, TypeVar, Union
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from utils.http_session import PooledHTTPAdapter
+
+
+T = TypeVar("T")
+
+TRANSPORTS = ("http1", "http2")
+
+DEFAULT_MAX_CONNECTIONS = 10
+
+# Connection-specific headers are not allowed in HTTP/2 requests
+_HOP_BY_HOP_HEADERS = frozenset({
+    "connection", "keep-alive", "proxy-connection", "transfer-encoding", "upgrade",
+})
+
+
+async def _next_chunk(chunks: AsyncIterator[bytes]) -> Optional[bytes]:
+    try:
+        return await chunks.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+class _StreamedBody:
+    """File-like view of a streamed httpx response body, as requests expects of ``response.raw``."""
+
+    def __init__(self, adapter: "HTTP2Adapter", response: Any):
+        self._adapter = adapter
+        self._response = response
+        self._chunks: Optional[AsyncIterator[bytes]] = None
+        self._buffer = b""
+
+    def _next(self, chunk_size: int) -> Optional[bytes]:
+        if self._chunks is None:
+            self._chunks = self._response.aiter_bytes(chunk_size)
+        return self._adapter.run(_next_chunk(self._chunks))
+
+    def stream(self, chunk_size: int = 65536, decode_content: bool = True) -> Iterator[bytes]:
+        try:
+            if self._buffer:
+                yield self._buffer
+                self._buffer = b""
+            chunk = self._next(chunk_size)
+            while chunk is not None:
+                yield chunk
+                chunk = self._next(chunk_size)
+        finally:
+            self.close()
+
+    def read(self, amt: Optional[int] = None, **kwargs) -> bytes:
+        while amt is None or len(self._buffer) < amt:
+            chunk = self._next(amt or 65536)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        data, self._buffer = (self._buffer, b"") if amt is None else (self._buffer[:amt], self._buffer[amt:])
+        return data
+
+    def close(self) -> None:
+        if not self._response.is_closed:
+            self._adapter.run(self._response.aclose())
+
+    release_conn = close
+
+
+class HTTP2Adapter(BaseAdapter):
+    """Transport adapter sending requests over HTTP/2 with httpx."""
+
+    def __init__(self, max_connections: int = DEFAULT_MAX_CONNECTIONS, http1_fallback: bool = False,
+                 verify: Union[bool, str] = True):
+        """
+        Initialize HTTP/2 adapter.
+
+        Requests from any thread are handed to an asyncio httpx client on a
+        dedicated event-loop thread, which owns the HTTP/2 connections; this
+        keeps stream IDs in order while many threads share one connection.
+
+        Args:
+            max_connections: Maximum connections across all hosts (each multiplexes many requests)
+            http1_fallback: Use HTTP/1.1 for servers that do not negotiate h2 (disables h2c)
+            verify: TLS verification (True, False or a CA bundle path)
+
+        Raises:
+            ImportError: If httpx or h2 is not installed
+        """
+        import h2  # noqa: F401  (httpx only fails on first use without it)
+        import httpx
+        super().__init__()
+        self._httpx = httpx
+        self.client = httpx.AsyncClient(http1=http1_fallback, http2=True, verify=verify,
+                                        limits=httpx.Limits(max_connections=max_connections),
+                                        follow_redirects=False, trust_env=False)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="http2-transport", daemon=True)
+        self._thread.start()
+        self._seen_streams: "weakref.WeakSet[Any]" = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    def run(self, coroutine: Awaitable[T]) -> T:
+        """Run a coroutine on the transport's event loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def _timeout(self, timeout: Union[None, float, Tuple[float, float]]):
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return self._httpx.Timeout(read, connect=connect)
+        return self._httpx.Timeout(timeout)
+
+    def send(self, request: requests.PreparedRequest, stream: bool = False,
+             timeout: Union[None, float, Tuple[float, float]] = None, **kwargs) -> requests.Response:
+        """
+        Send a prepared request over HTTP/2.
+
+        Per-request ``verify``, ``cert`` and ``proxies`` are ignored; TLS is
+        configured on the adapter.
+        """
+        httpx = self._httpx
+        headers = {name: value for name, value in request.headers.items()
+                   if name.lower() not in _HOP_BY_HOP_HEADERS}
+        outgoing = self.client.build_request(request.method, request.url, headers=headers,
+                                             content=request.body, timeout=self._timeout(timeout))
+        try:
+            incoming = self.run(self.client.send(outgoing, stream=stream))
+        except httpx.TimeoutException as error:
+            raise requests.Timeout(error, request=request) from error
+        except (httpx.ConnectError, httpx.RemoteProtocolError, httpx.ReadError, httpx.WriteError) as error:
+            raise requests.ConnectionError(error, request=request) from error
+        except httpx.HTTPError as error:
+            raise requests.RequestException(error, request=request) from error
+        return self.build_response(request, incoming, stream)
+
+    def build_response(self, request: requests.PreparedRequest, incoming: Any, stream: bool) -> requests.Response:
+        """Wrap an httpx response as a requests.Response, flagging connection reuse."""
+        response = requests.Response()
+        response.status_code = incoming.status_code
+        response.reason = incoming.reason_phrase
+        response.headers = CaseInsensitiveDict(incoming.headers.items())
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.elapsed = incoming.elapsed if not stream else timedelta(0)
+        response.connection = self
+        response.http_version = incoming.http_version
+        if stream:
+            response.raw = _StreamedBody(self, incoming)
+        else:
+            response._content = incoming.content
+            response._content_consumed = True
+        network_stream = incoming.extensions.get("network_stream")
+        if network_stream is not None:
+            with self._lock:
+                response.connection_reused = network_stream in self._seen_streams
+                self._seen_streams.add(network_stream)
+        return response
+
+    def close(self) -> None:
+        """Close all HTTP/2 connections and stop the event-loop thread."""
+        if self._loop.is_closed():
+            return
+        self.run(self.client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+def create_transport(name: str, pool_maxsize: Optional[int] = None, keepalive: bool = True) -> BaseAdapter:
+    """
+    Create a transport adapter by name.
+
+    Args:
+        name: One of TRANSPORTS
+        pool_maxsize: HTTP/1.1 connections kept per host (default: PooledHTTPAdapter default)
+        keepalive: Whether to enable TCP keep-alive (HTTP/1.1 only)
+
+    Returns:
+        Transport adapter to mount on a session
+
+    Raises:
+        ValueError: If the name is unknown
+        ImportError: If the transport's optional dependency is not installed
+    """
+    if name == "http1":
+        kwargs: Dict[str, Any] = {"keepalive": keepalive}
+        if pool_maxsize is not None:
+            kwargs["pool_maxsize"] = pool_maxsize
+        return PooledHTTPAdapter(**kwargs)
+    if name == "http2":
+        return HTTP2Adapter()
+    raise ValueError(f"Unknown transport '{name}', expected one of {', '.join(TRANSPORTS)}")
+
+
+def mount_transport(session: requests.Session, transport: BaseAdapter, close_previous: bool = True) -> BaseAdapter:
+    """
+    Send a session's HTTP(S) traffic through the given transport.
+
+    Mount the transport before installing a cassette or response cache,
+    which wrap whatever adapter is mounted at that time.
+
+    Args:
+        session: Session to mount the transport on
+        transport: Transport adapter
+        close_previous: Close the replaced adapters (keep them open when
+                        they are restored later, see isolated_session)
+
+    Returns:
+        The same transport
+    """
+    for prefix in ("http://", "https://"):
+        previous = session.get_adapter(prefix)
+        session.mount(prefix, transport)
+        if close_previous and previous is not transport and previous not in session.adapters.values():
+            previous.close()
+    return transport
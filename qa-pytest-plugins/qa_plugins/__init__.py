@@ -0,0 +1,3 @@
+"""
+Pytest plugins shared by the API and E2E suites.
+"""
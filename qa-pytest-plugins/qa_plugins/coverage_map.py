@@ -0,0 +1,486 @@
+"""
+Runtime coverage map for change-based test selection.
+
+With ``--record-coverage-map`` every test is profiled while it runs (setup,
+call and teardown). The plugin records which source modules under the
+tracked directories (ini option ``coverage_map_paths``, default ``utils``
+and ``pages``) it calls into, which of those modules its test module
+imports, and which endpoints it hits through APIClient. Modules called by
+higher-scoped fixtures count for every test using the fixture. The map is
+written to ``--coverage-map-file`` together with the commit it was recorded
+at. Under xdist each worker writes a shard that the controller merges.
+
+On later runs, ``--select-changed`` runs only the tests affected by the
+git diff since that commit (or since ``--changed-since``):
+
+* tests calling into a changed module (or, for modules no test calls,
+  such as data-only modules, tests whose module imports it)
+* tests in changed test modules, tests missing from the map and tests
+  that failed when the map was recorded
+
+``--changed-endpoints`` selects the tests hitting the given endpoints
+(e.g. ``"GET /users/{id},POST /users"``). The full suite runs instead
+when the map is missing or stale: its commit is not in the current
+history, configuration or other untracked code (``conftest.py``,
+``pytest.ini``, ``requirements.txt``...) changed, or a non-Python file
+under a tracked directory (a script, stylesheet or page the tests load,
+which profiling cannot attribute to tests) changed.
+"""
+import ast
+import glob
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import pytest
+
+# The suite's APIClient request hooks (only the API suite has them)
+try:
+    from utils import instrumentation
+except ImportError:
+    instrumentation = None
+
+
+MAP_VERSION = 1
+
+DEFAULT_MAP_PATH = ".coverage-map.json"
+DEFAULT_TRACKED_PATHS = ["utils", "pages"]
+
+# Changes to these files may affect any test
+GLOBAL_FILES = ("conftest.py", "pytest.ini", "setup.cfg", "pyproject.toml", "tox.ini")
+GLOBAL_PATTERNS = (re.compile(r"(^|/)requirements[^/]*\.txt$"),)
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+_MISSING = object()
+
+
+def normalize_endpoint(endpoint: str) -> str:
+    """
+    Normalize an endpoint given on the command line.
+
+    Args:
+        endpoint: ``"GET /users/1"``, ``"GET /users/{id}"`` or ``"/users"`` (any method)
+
+    Returns:
+        Endpoint template such as ``"GET /users/{id}"`` or ``"* /users"``
+    """
+    method, _, path = endpoint.strip().rpartition(" ")
+    path = "/" + _ID_SEGMENT.sub("/{id}", "/" + path.strip("/")).strip("/")
+    return f"{(method or '*').upper()} {path}"
+
+
+def _endpoint_matches(recorded: str, wanted: Set[str]) -> bool:
+    method, _, path = recorded.partition(" ")
+    return recorded in wanted or f"* {path}" in wanted
+
+
+class _Deps:
+    """Modules and endpoints used while a test or fixture runs."""
+
+    def __init__(self):
+        self.files: Set[str] = set()
+        self.endpoints: Set[str] = set()
+
+    def update(self, other: "_Deps") -> None:
+        self.files |= other.files
+        self.endpoints |= other.endpoints
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        return {"files": sorted(self.files), "endpoints": sorted(self.endpoints)}
+
+
+class CoverageRecorder:
+    """Pytest plugin recording the coverage map."""
+
+    def __init__(self, config: pytest.Config, map_path: str, tracked: List[str]):
+        """
+        Initialize recorder.
+
+        Args:
+            config: Pytest config
+            map_path: Coverage map file
+            tracked: Tracked source directories, relative to the rootdir
+        """
+        self.config = config
+        self.root = str(config.rootpath)
+        self.map_path = map_path
+        self.tracked = [os.path.join(self.root, path) + os.sep for path in tracked]
+        self.worker_id = getattr(config, "workerinput", {}).get("workerid")
+        self.tests: Dict[str, Dict[str, Any]] = {}
+        self.fixtures: Dict[str, _Deps] = {}
+        self.modules: Dict[str, List[str]] = {}
+        self.foreign_deselected = False
+        self._paths: Dict[str, Optional[str]] = {}
+        self._own_file = os.path.abspath(__file__)
+        self._stack: List[_Deps] = []
+        self._lock = threading.Lock()
+
+    def _resolve(self, filename: str) -> Optional[str]:
+        path = None
+        absolute = os.path.abspath(filename)
+        if absolute != self._own_file and any(absolute.startswith(tracked) for tracked in self.tracked):
+            path = os.path.relpath(absolute, self.root).replace(os.sep, "/")
+        self._paths[filename] = path
+        return path
+
+    def _profile(self, frame, event: str, arg: Any) -> None:
+        if event != "call":
+            return
+        path = self._paths.get(frame.f_code.co_filename, _MISSING)
+        if path is _MISSING:
+            path = self._resolve(frame.f_code.co_filename)
+        if path is not None and self._stack:
+            self._stack[-1].files.add(path)
+
+    def on_request_start(self, timing: Any) -> None:
+        """Record the endpoint of an APIClient request."""
+        if self._stack:
+            self._stack[-1].endpoints.add(timing.endpoint)
+
+    def pytest_sessionstart(self, session: pytest.Session) -> None:
+        """Start observing APIClient requests."""
+        if instrumentation is not None:
+            instrumentation.add_observer(self)
+
+    def pytest_deselected(self, items: List[pytest.Item]) -> None:
+        """Remember that tests were deselected by something other than the coverage map."""
+        if not getattr(self.config, "_coverage_map_selecting", False):
+            self.foreign_deselected = True
+
+    def _imports(self, path: str) -> List[str]:
+        try:
+            with open(path, "r", encoding="utf-8") as source_file:
+                tree = ast.parse(source_file.read(), path)
+        except (OSError, SyntaxError):
+            return []
+        names = []
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names.extend(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names.append(node.module)
+                names.extend(f"{node.module}.{alias.name}" for alias in node.names)
+        imported = set()
+        for name in names:
+            source = getattr(sys.modules.get(name), "__file__", None)
+            resolved = self._resolve(source) if source else None
+            if resolved is not None:
+                imported.add(resolved)
+        return sorted(imported)
+
+    def pytest_collection_modifyitems(self, items: List[pytest.Item]) -> None:
+        """Record the tracked modules each test module imports."""
+        for item in items:
+            path = item.nodeid.split("::")[0]
+            if path not in self.modules:
+                self.modules[path] = self._imports(str(item.path))
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item: pytest.Item, nextitem: Optional[pytest.Item]):
+        """Profile one test (setup, call and teardown)."""
+        deps = _Deps()
+        self._stack = [deps]
+        sys.setprofile(self._profile)
+        threading.setprofile(self._profile)
+        try:
+            yield
+        finally:
+            sys.setprofile(None)
+            threading.setprofile(None)
+            self._stack = []
+        self.tests[item.nodeid] = {**deps.to_dict(), "fixtures": sorted(getattr(item, "fixturenames", [])),
+                                   "failed": self.tests.get(item.nodeid, {}).get("failed", False)}
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_fixture_setup(self, fixturedef: Any, request: pytest.FixtureRequest):
+        """Attribute what a fixture uses to the fixture, so every test using it depends on it."""
+        if not self._stack:
+            yield
+            return
+        deps = _Deps()
+        self._stack.append(deps)
+        try:
+            yield
+        finally:
+            self._stack.remove(deps)
+            with self._lock:
+                self.fixtures.setdefault(fixturedef.argname, _Deps()).update(deps)
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        """Remember failed tests, which are always selected again."""
+        if report.failed:
+            self.tests.setdefault(report.nodeid, {"files": [], "endpoints": [], "fixtures": []})["failed"] = True
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the recorded map (without commit information)."""
+        return {
+            "tests": self.tests,
+            "fixtures": {name: deps.to_dict() for name, deps in sorted(self.fixtures.items())},
+            "modules": self.modules,
+            "complete": not self.foreign_deselected,
+        }
+
+    def _shard_path(self, worker_id: str) -> str:
+        root, ext = os.path.splitext(self.map_path)
+        return f"{root}.{worker_id}{ext}"
+
+    def pytest_sessionfinish(self, session: pytest.Session) -> None:
+        """Write the map (one shard per xdist worker, merged by the controller)."""
+        if instrumentation is not None:
+            instrumentation.remove_observer(self)
+        if self.worker_id is not None:
+            with open(self._shard_path(self.worker_id), "w", encoding="utf-8") as shard_file:
+                json.dump(self.to_dict(), shard_file)
+            return
+
+        recorded = self.to_dict()
+        for shard in glob.glob(self._shard_path("gw*")):
+            with open(shard, "r", encoding="utf-8") as shard_file:
+                data = json.load(shard_file)
+            recorded["tests"].update(data["tests"])
+            recorded["modules"].update(data["modules"])
+            recorded["complete"] = recorded["complete"] and data["complete"]
+            for name, deps in data["fixtures"].items():
+                merged = recorded["fixtures"].setdefault(name, {"files": [], "endpoints": []})
+                for key in ("files", "endpoints"):
+                    merged[key] = sorted(set(merged[key]) | set(deps[key]))
+            os.remove(shard)
+        write_map(self.map_path, recorded, self.root)
+
+
+def _git(root: str, *args: str) -> Optional[str]:
+    try:
+        result = subprocess.run(["git", *args], cwd=root, capture_output=True, text=True, check=False)
+    except OSError:
+        return None
+    return result.stdout if result.returncode == 0 else None
+
+
+def load_map(path: str) -> Optional[Dict[str, Any]]:
+    """
+    Read a coverage map.
+
+    Args:
+        path: Coverage map file
+
+    Returns:
+        Map dict, or None if it is missing, unreadable or of another version
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as map_file:
+            data = json.load(map_file)
+    except (OSError, ValueError):
+        return None
+    return data if data.get("version") == MAP_VERSION else None
+
+
+def write_map(path: str, recorded: Dict[str, Any], root: str) -> None:
+    """
+    Merge newly recorded tests into the map file.
+
+    Entries of tests that did not run are kept. The map only moves to the
+    current commit if the run was not narrowed down by other deselection
+    (``-k``, ``-m``...), since tests left out for another reason may be
+    affected by changes since the old commit.
+
+    Args:
+        path: Coverage map file
+        recorded: Recorded tests, fixtures and test module imports
+        root: Suite root directory (inside the git work tree)
+    """
+    previous = load_map(path) or {}
+    commit = (_git(root, "rev-parse", "HEAD") or "").strip() or None
+    if previous.get("commit") and not recorded["complete"]:
+        commit = previous["commit"]
+    fixtures = previous.get("fixtures", {})
+    fixtures.update(recorded["fixtures"])
+    data = {
+        "version": MAP_VERSION,
+        "commit": commit,
+        "recorded_at": time.time(),
+        "tests": {**previous.get("tests", {}), **recorded["tests"]},
+        "fixtures": fixtures,
+        "modules": {**previous.get("modules", {}), **recorded["modules"]},
+    }
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as map_file:
+        json.dump(data, map_file, indent=1, sort_keys=True)
+
+
+def changed_files(root: str, base: str) -> Optional[List[str]]:
+    """
+    List files changed since a git revision, including uncommitted and untracked files.
+
+    Args:
+        root: Suite root directory (paths are returned relative to it)
+        base: Git revision to compare the working tree with
+
+    Returns:
+        Changed paths relative to root, or None if git could not compute the diff
+    """
+    diff = _git(root, "diff", "--name-only", "--relative", base)
+    untracked = _git(root, "ls-files", "--others", "--exclude-standard")
+    if diff is None or untracked is None:
+        return None
+    return sorted({line for line in (diff + untracked).splitlines() if line})
+
+
+class Selection:
+    """Which tests to run for a set of changes, according to a coverage map."""
+
+    def __init__(self, coverage_map: Optional[Dict[str, Any]], changed: Optional[List[str]],
+                 endpoints: Iterable[str], tracked: List[str], root: str, base: Optional[str]):
+        """
+        Evaluate the map against the changes.
+
+        Args:
+            coverage_map: Loaded map (None if missing)
+            changed: Changed files relative to the suite root (None if only endpoints are given)
+            endpoints: Changed endpoints (command line form)
+            tracked: Tracked source directories
+            root: Suite root directory
+            base: Git revision the changes were computed against
+        """
+        self.map = coverage_map
+        self.changed = changed or []
+        self.endpoints = {normalize_endpoint(endpoint) for endpoint in endpoints if endpoint.strip()}
+        self.tracked = [path.rstrip("/") + "/" for path in tracked]
+        self.stale_reason = self._stale_reason(root, base, changed)
+        self.changed_sources = {path for path in self.changed if path.endswith(".py")
+                                and any(path.startswith(tracked) for tracked in self.tracked)}
+        self.changed_tests = {path for path in self.changed if path not in self.changed_sources}
+        self._imported_only = self._imported_only_sources()
+
+    def _stale_reason(self, root: str, base: Optional[str], changed: Optional[List[str]]) -> Optional[str]:
+        if self.map is None:
+            return "no coverage map recorded"
+        if base is not None:
+            if changed is None:
+                return f"cannot diff against {base}"
+            commit = self.map.get("commit")
+            if commit is None or _git(root, "merge-base", "--is-ancestor", commit, "HEAD") is None:
+                return "map commit is not part of the current history"
+        for path in self.changed:
+            name = path.rsplit("/", 1)[-1]
+            if name in GLOBAL_FILES or any(pattern.search(path) for pattern in GLOBAL_PATTERNS):
+                return f"{path} changed"
+            in_tracked = any(path.startswith(tracked) for tracked in self.tracked)
+            if path.endswith(".py") and not path.startswith("tests/") and not in_tracked:
+                return f"{path} changed outside the tracked directories"
+            if not path.endswith(".py") and in_tracked:
+                return f"{path} changed (non-Python files are not mapped to tests)"
+        return None
+
+    def _imported_only_sources(self) -> Set[str]:
+        if self.map is None:
+            return set()
+        called = set()
+        for entry in self.map["tests"].values():
+            called.update(entry.get("files", ()))
+        for deps in self.map["fixtures"].values():
+            called.update(deps.get("files", ()))
+        return self.changed_sources - called
+
+    def _deps(self, entry: Dict[str, Any]) -> Tuple[Set[str], Set[str]]:
+        files, endpoints = set(entry.get("files", ())), set(entry.get("endpoints", ()))
+        for fixture in entry.get("fixtures", ()):
+            deps = self.map["fixtures"].get(fixture, {})
+            files.update(deps.get("files", ()))
+            endpoints.update(deps.get("endpoints", ()))
+        return files, endpoints
+
+    def is_affected(self, nodeid: str) -> bool:
+        """
+        Decide whether a test has to run.
+
+        Args:
+            nodeid: Test node id
+
+        Returns:
+            True if the test is affected by the changes (or unknown to the map)
+        """
+        if self.stale_reason is not None:
+            return True
+        module = nodeid.split("::")[0]
+        entry = self.map["tests"].get(nodeid)
+        if entry is None or entry.get("failed") or module in self.changed_tests:
+            return True
+        files, endpoints = self._deps(entry)
+        if files & self.changed_sources:
+            return True
+        if self._imported_only & set(self.map["modules"].get(module, ())):
+            return True
+        return any(_endpoint_matches(endpoint, self.endpoints) for endpoint in endpoints)
+
+
+_selection_key = pytest.StashKey[Selection]()
+
+
+def pytest_addoption(parser):
+    """Register coverage map options."""
+    group = parser.getgroup("coverage-map", "Change-based test selection")
+    group.addoption("--record-coverage-map", action="store_true", default=False,
+                    help="Record which modules and endpoints every test uses")
+    group.addoption("--coverage-map-file", default=DEFAULT_MAP_PATH,
+                    help="Coverage map path (default: %(default)s)")
+    group.addoption("--select-changed", action="store_true", default=False,
+                    help="Run only tests affected by changes since the map was recorded")
+    group.addoption("--changed-since", default=None, metavar="REV",
+                    help="Git revision to diff against with --select-changed (default: the map's commit)")
+    group.addoption("--changed-endpoints", default="", metavar="ENDPOINTS",
+                    help='Comma-separated endpoints whose tests to run, e.g. "GET /users/{id},POST /users"')
+    parser.addini("coverage_map_paths", type="linelist", default=DEFAULT_TRACKED_PATHS,
+                  help="Source directories tracked by the coverage map")
+
+
+def pytest_configure(config):
+    """Enable recording and evaluate the selection for this run."""
+    root = str(config.rootpath)
+    map_path = os.path.join(root, config.getoption("--coverage-map-file"))
+    tracked = config.getini("coverage_map_paths")
+    if config.getoption("--record-coverage-map"):
+        config.pluginmanager.register(CoverageRecorder(config, map_path, tracked), "coverage-map-recorder")
+
+    endpoints = [endpoint for endpoint in config.getoption("--changed-endpoints").split(",") if endpoint.strip()]
+    if not config.getoption("--select-changed") and not endpoints:
+        return
+    coverage_map = load_map(map_path)
+    base = None
+    changed: Optional[List[str]] = None
+    if config.getoption("--select-changed"):
+        base = config.getoption("--changed-since") or (coverage_map or {}).get("commit") or "HEAD"
+        changed = changed_files(root, base)
+    config.stash[_selection_key] = Selection(coverage_map, changed, endpoints, tracked, root, base)
+
+
+def pytest_report_header(config):
+    """Describe the change-based selection."""
+    selection = config.stash.get(_selection_key, None)
+    if selection is None:
+        return None
+    if selection.stale_reason is not None:
+        return f"coverage map: {selection.stale_reason}, running the full suite"
+    return (f"coverage map: {len(selection.changed_sources)} changed source module(s), "
+            f"{len(selection.changed_tests)} other changed file(s), {len(selection.endpoints)} changed endpoint(s)")
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(config, items):
+    """Deselect tests not affected by the changes."""
+    selection = config.stash.get(_selection_key, None)
+    if selection is None or selection.stale_reason is not None:
+        return
+    selected = [item for item in items if selection.is_affected(item.nodeid)]
+    deselected = [item for item in items if not selection.is_affected(item.nodeid)]
+    if deselected:
+        config._coverage_map_selecting = True
+        config.hook.pytest_deselected(items=deselected)
+        config._coverage_map_selecting = False
+        items[:] = selected
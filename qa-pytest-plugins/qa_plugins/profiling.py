@@ -0,0 +1,299 @@
+"""
+Collection, fixture and action profiling.
+
+With ``--fixture-profile`` the run is broken down into:
+
+* import and collection time per test module
+* setup and teardown time per fixture, by scope
+* method calls of the classes in the packages listed in the
+  ``profile_packages`` ini option (default ``pages``, e.g. page objects)
+  and, in suites with ``utils/instrumentation.py``, APIClient requests,
+  attributed to the test phase or fixture that made them (concurrent
+  requests add up, so they can exceed the wall-clock time of their test)
+* the remaining self time of every test's setup, call and teardown
+
+The profile is written to ``--fixture-profile-output`` in the collapsed
+stack format read by flamegraph.pl, speedscope and inferno (values in
+microseconds), and the terminal summary lists the ``--fixture-profile-top``
+most expensive entries. Without the option the plugin is not registered
+and no classes are wrapped, so it costs nothing. Under xdist each
+worker writes a shard that the controller merges.
+"""
+import functools
+import glob
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import pytest
+
+# The suite's APIClient request hooks (only the API suite has them)
+try:
+    from utils import instrumentation
+except ImportError:
+    instrumentation = None
+
+
+DEFAULT_PROFILE_PATH = "reports/profile.folded"
+DEFAULT_TOP = 15
+DEFAULT_PROFILE_PACKAGES = ["pages"]
+
+
+class _Frame:
+    """A running profiled section and the time spent in its profiled children."""
+
+    def __init__(self, stack: str, parent: Optional["_Frame"]):
+        self.stack = stack
+        self.parent = parent
+        self.children = 0.0
+        self.started = time.perf_counter()
+
+
+def _stack(*names: str) -> str:
+    # ";" separates frames and a space separates the stack from its value
+    return ";".join(name.replace(";", ",").replace(" ", "_") for name in names)
+
+
+class FixtureProfiler:
+    """Pytest plugin timing collection, fixtures, page-object actions and API requests."""
+
+    def __init__(self, config: pytest.Config, output: str, top: int):
+        """
+        Initialize profiler.
+
+        Args:
+            config: Pytest config
+            output: Collapsed-stack profile path
+            top: Number of entries in the terminal summary
+        """
+        self.config = config
+        self.output = output
+        self.top = top
+        self.worker_id = getattr(config, "workerinput", {}).get("workerid")
+        self.folded: Dict[str, float] = {}
+        self.stats: Dict[str, List[float]] = {}
+        self._frames: List[_Frame] = []
+        self._teardowns: Dict[int, _Frame] = {}
+        self._wrapped: List[tuple] = []
+        self._lock = threading.Lock()
+
+    def _push(self, *names: str, root: bool = False) -> _Frame:
+        """
+        Start a profiled section.
+
+        Args:
+            names: Frames to add below the running section
+            root: Start a new stack instead (its time still counts as a child of the running section)
+        """
+        with self._lock:
+            parent = self._frames[-1] if self._frames else None
+            prefix = parent.stack + ";" if parent is not None and not root else ""
+            frame = _Frame(prefix + _stack(*names), parent)
+            self._frames.append(frame)
+        return frame
+
+    def _pop(self, frame: _Frame, label: Optional[str] = None) -> None:
+        elapsed = time.perf_counter() - frame.started
+        with self._lock:
+            if frame in self._frames:
+                self._frames.remove(frame)
+            if frame.parent is not None:
+                frame.parent.children += elapsed
+            self.folded[frame.stack] = self.folded.get(frame.stack, 0.0) + max(elapsed - frame.children, 0.0)
+            if label is not None:
+                self._record(label, elapsed)
+
+    def _record(self, label: str, elapsed: float) -> None:
+        entry = self.stats.setdefault(label, [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += elapsed
+        entry[2] = max(entry[2], elapsed)
+
+    def on_request_end(self, timing: Any) -> None:
+        """Attribute an APIClient request to the running section."""
+        if timing.total is None:
+            return
+        with self._lock:
+            parent = self._frames[-1] if self._frames else None
+            stack = (parent.stack + ";" if parent else "") + _stack(f"api:{timing.endpoint}")
+            if parent is not None:
+                parent.children += timing.total
+            self.folded[stack] = self.folded.get(stack, 0.0) + timing.total
+            self._record(f"api {timing.endpoint}", timing.total)
+
+    def _wrap(self, owner: type, name: str, method: Callable) -> None:
+        label = f"{owner.__name__}.{name}"
+
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            frame = self._push(f"page:{label}")
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._pop(frame, f"page {label}")
+
+        setattr(owner, name, timed)
+        self._wrapped.append((owner, name, method))
+
+    def instrument_packages(self, packages: List[str]) -> None:
+        """
+        Time the public methods of classes defined in the given packages.
+
+        Args:
+            packages: Package directories relative to the rootdir (e.g. "pages")
+        """
+        roots = [os.path.join(str(self.config.rootpath), package) + os.sep for package in packages]
+        for module in list(sys.modules.values()):
+            source = os.path.abspath(getattr(module, "__file__", None) or os.devnull)
+            if not any(source.startswith(root) for root in roots):
+                continue
+            for owner in list(vars(module).values()):
+                if not isinstance(owner, type) or owner.__module__ != module.__name__:
+                    continue
+                for name, method in list(vars(owner).items()):
+                    if inspect.isfunction(method) and not name.startswith("_"):
+                        self._wrap(owner, name, method)
+
+    def restore(self) -> None:
+        """Undo instrument_packages()."""
+        for owner, name, method in reversed(self._wrapped):
+            setattr(owner, name, method)
+        self._wrapped = []
+
+    def pytest_sessionstart(self, session: pytest.Session) -> None:
+        """Start observing APIClient requests."""
+        if instrumentation is not None:
+            instrumentation.add_observer(self)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_make_collect_report(self, collector: pytest.Collector):
+        """Time importing and collecting a test module."""
+        if not isinstance(collector, pytest.Module):
+            yield
+            return
+        frame = self._push("collect", collector.nodeid)
+        yield
+        self._pop(frame, f"collect {collector.nodeid}")
+
+    def pytest_collection_finish(self, session: pytest.Session) -> None:
+        """Wrap the profiled classes (e.g. page objects) imported by the collected test modules."""
+        self.instrument_packages(self.config.getini("profile_packages"))
+
+    def _phase(self, item: pytest.Item, phase: str):
+        module, _, name = item.nodeid.partition("::")
+        frame = self._push("test", module, name, phase)
+        yield
+        self._pop(frame)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_setup(self, item: pytest.Item):
+        """Time a test's setup."""
+        yield from self._phase(item, "setup")
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item: pytest.Item):
+        """Time a test's call."""
+        yield from self._phase(item, "call")
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_teardown(self, item: pytest.Item, nextitem: Optional[pytest.Item]):
+        """Time a test's teardown."""
+        yield from self._phase(item, "teardown")
+
+    def _fixture_frame(self, fixturedef: Any, phase: str) -> _Frame:
+        # Fixtures get their own stacks, so a session fixture is not charged to the first test using it
+        return self._push("fixture", fixturedef.scope, fixturedef.argname, phase, root=True)
+
+    def _end_fixture(self, frame: _Frame, fixturedef: Any, phase: str) -> None:
+        self._pop(frame, f"fixture {fixturedef.argname} [{fixturedef.scope}] {phase}")
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_fixture_setup(self, fixturedef: Any, request: pytest.FixtureRequest):
+        """Time a fixture's setup and arrange for its teardown to be timed."""
+        frame = self._fixture_frame(fixturedef, "setup")
+        yield
+        self._end_fixture(frame, fixturedef, "setup")
+
+        def teardown_started():
+            self._teardowns[id(fixturedef)] = self._fixture_frame(fixturedef, "teardown")
+
+        # Finalizers run last-in first-out: this one runs before the fixture's own teardown
+        fixturedef.addfinalizer(teardown_started)
+
+    def pytest_fixture_post_finalizer(self, fixturedef: Any, request: pytest.FixtureRequest) -> None:
+        """Finish timing a fixture's teardown."""
+        frame = self._teardowns.pop(id(fixturedef), None)
+        if frame is not None:
+            self._end_fixture(frame, fixturedef, "teardown")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the profile."""
+        return {"folded": self.folded, "stats": self.stats}
+
+    def _shard_path(self, worker_id: str) -> str:
+        return f"{self.output}.{worker_id}.json"
+
+    def pytest_sessionfinish(self, session: pytest.Session) -> None:
+        """Write the profile (one shard per xdist worker, merged by the controller)."""
+        if instrumentation is not None:
+            instrumentation.remove_observer(self)
+        self.restore()
+        if os.path.dirname(self.output):
+            os.makedirs(os.path.dirname(self.output), exist_ok=True)
+        if self.worker_id is not None:
+            with open(self._shard_path(self.worker_id), "w", encoding="utf-8") as shard_file:
+                json.dump(self.to_dict(), shard_file)
+            return
+
+        for shard in glob.glob(self._shard_path("gw*")):
+            with open(shard, "r", encoding="utf-8") as shard_file:
+                data = json.load(shard_file)
+            for stack, value in data["folded"].items():
+                self.folded[stack] = self.folded.get(stack, 0.0) + value
+            for label, (count, total, longest) in data["stats"].items():
+                entry = self.stats.setdefault(label, [0, 0.0, 0.0])
+                entry[0] += count
+                entry[1] += total
+                entry[2] = max(entry[2], longest)
+            os.remove(shard)
+        with open(self.output, "w", encoding="utf-8") as profile_file:
+            for stack, value in sorted(self.folded.items()):
+                microseconds = round(value * 1e6)
+                if microseconds > 0:
+                    profile_file.write(f"{stack} {microseconds}\n")
+
+    def pytest_terminal_summary(self, terminalreporter) -> None:
+        """Print the most expensive collection, fixture, page-object and API entries."""
+        if self.worker_id is not None or not self.stats:
+            return
+        terminalreporter.write_sep("-", f"fixture profile (top {self.top}, full profile: {self.output})")
+        terminalreporter.write_line(f"{'total s':>9} {'count':>6} {'mean ms':>9} {'max ms':>9}  entry")
+        ranked = sorted(self.stats.items(), key=lambda entry: -entry[1][1])[:self.top]
+        for label, (count, total, longest) in ranked:
+            terminalreporter.write_line(f"{total:>9.3f} {count:>6} {total / count * 1000:>9.1f} "
+                                        f"{longest * 1000:>9.1f}  {label}")
+
+
+def pytest_addoption(parser):
+    """Register profiling options."""
+    group = parser.getgroup("profiling", "Collection and fixture profiling")
+    group.addoption("--fixture-profile", action="store_true", default=False,
+                    help="Profile collection, fixtures, page-object actions and API requests")
+    group.addoption("--fixture-profile-output", default=DEFAULT_PROFILE_PATH,
+                    help="Collapsed-stack (flame graph) profile path (default: %(default)s)")
+    group.addoption("--fixture-profile-top", type=int, default=DEFAULT_TOP,
+                    help="Entries in the terminal summary (default: %(default)s)")
+    parser.addini("profile_packages", type="linelist", default=DEFAULT_PROFILE_PACKAGES,
+                  help="Packages whose classes' methods are profiled as page-object actions")
+
+
+def pytest_configure(config):
+    """Enable the profiler when --fixture-profile is given."""
+    if config.getoption("--fixture-profile"):
+        profiler = FixtureProfiler(config, config.getoption("--fixture-profile-output"),
+                                   config.getoption("--fixture-profile-top"))
+        config.pluginmanager.register(profiler, "fixture-profiler")
@@ -0,0 +1,347 @@
+"""
+Streaming test result log.
+
+With ``--results-log=PATH`` every test phase result (setup, call,
+teardown) is appended to a JSON Lines file as soon as it completes, so
+nothing is buffered until the end of the run and a crashed run still
+leaves its results behind. Artifacts such as screenshots are stored as
+files next to the log and referenced by relative path instead of being
+inlined. HTML fragments attached with attach_html() (e.g. the API
+suite's request timing tables) are embedded in the rendered report, and
+other plugins' ``report.extras`` are kept, with images written out as
+artifact files.
+
+Under xdist each worker appends to its own ``<log>.<workerid>.jsonl``
+shard while the controller only writes the session records, so no
+process funnels all results. The shards are merged when reading.
+
+HTML is rendered on demand from the log (``make report``)::
+
+    python -m qa_plugins.results reports/results.jsonl -o reports/report.html
+"""
+import argparse
+import base64
+import glob
+import hashlib
+import html
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+import pytest
+
+
+DEFAULT_LOG_PATH = "reports/results.jsonl"
+
+ARTIFACT_DIR = "artifacts"
+
+# Captured output kept per failed test phase
+MAX_SECTION_CHARS = 20000
+
+_IMAGE_EXTENSIONS = {"image/png": "png", "image/jpeg": "jpg", "image/gif": "gif", "image/svg+xml": "svg"}
+
+
+def attach_artifact(report: pytest.TestReport, path: str, kind: str = "file", name: Optional[str] = None) -> None:
+    """
+    Reference a file (e.g. a screenshot) from a test report's result record.
+
+    Call it from a ``pytest_runtest_makereport`` hook wrapper. The file is
+    not copied or read; the result log stores its path.
+
+    Args:
+        report: Report of the test phase
+        path: Artifact file path
+        kind: Artifact type, e.g. "image", "video", "trace" or "file"
+        name: Display name (default: the file name)
+    """
+    artifacts = getattr(report, "artifacts", [])
+    artifacts.append({"kind": kind, "name": name or os.path.basename(path), "path": os.path.abspath(path)})
+    report.artifacts = artifacts
+
+
+def attach_html(report: pytest.TestReport, content: str, name: Optional[str] = None) -> None:
+    """
+    Embed an HTML fragment (e.g. a table) in a test report's result record.
+
+    Call it from a ``pytest_runtest_makereport`` hook wrapper. The fragment
+    is stored as a ``report.extras`` entry and rendered as-is.
+
+    Args:
+        report: Report of the test phase
+        content: HTML fragment
+        name: Optional display name
+    """
+    extras = getattr(report, "extras", [])
+    extras.append({"name": name, "format_type": "html", "content": content, "mime_type": None, "extension": None})
+    report.extras = extras
+
+
+def shard_paths(path: str) -> List[str]:
+    """Return a log file and its xdist worker shards."""
+    root, ext = os.path.splitext(path)
+    return [path] + sorted(glob.glob(f"{root}.gw*{ext}"))
+
+
+def read_results(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Read all records of a result log, including the worker shards.
+
+    Args:
+        path: Result log path
+
+    Yields:
+        Records ordered by time (session records first)
+    """
+    records = []
+    for shard in shard_paths(path):
+        if not os.path.exists(shard):
+            continue
+        with open(shard, "r", encoding="utf-8") as log_file:
+            for line in log_file:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # Partial last line of a run that was killed
+                    continue
+    records.sort(key=lambda record: (record["type"] != "session_start", record.get("start") or 0))
+    yield from records
+
+
+class ResultLog:
+    """Pytest plugin appending result records to a JSON Lines file."""
+
+    def __init__(self, config: pytest.Config, path: str):
+        """
+        Initialize result log.
+
+        Args:
+            config: Pytest config
+            path: Result log path (workers write a shard next to it)
+        """
+        self.config = config
+        self.worker_id = getattr(config, "workerinput", {}).get("workerid")
+        self.distributed = False
+        self.path = path
+        if self.worker_id is not None:
+            root, ext = os.path.splitext(path)
+            self.path = f"{root}.{self.worker_id}{ext}"
+        self.base_dir = os.path.dirname(os.path.abspath(path))
+        self._lock = threading.Lock()
+        self._file = None
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, separators=(",", ":"), default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def _artifact_path(self, content: bytes, extension: str) -> str:
+        digest = hashlib.sha1(content).hexdigest()[:16]
+        path = os.path.join(self.base_dir, ARTIFACT_DIR, f"{digest}.{extension}")
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as artifact_file:
+                artifact_file.write(content)
+        return path
+
+    def _relative(self, path: str) -> str:
+        return os.path.relpath(path, self.base_dir).replace(os.sep, "/")
+
+    def _extras(self, report: pytest.TestReport) -> List[Dict[str, Any]]:
+        extras = []
+        for extra in getattr(report, "extras", []):
+            if extra.get("mime_type") in _IMAGE_EXTENSIONS and extra.get("content"):
+                path = self._artifact_path(base64.b64decode(extra["content"]), _IMAGE_EXTENSIONS[extra["mime_type"]])
+                extras.append({"kind": "image", "name": extra.get("name") or "image", "path": self._relative(path)})
+            else:
+                extras.append({key: extra.get(key) for key in ("name", "format_type", "content")})
+        return extras
+
+    def pytest_sessionstart(self, session: pytest.Session) -> None:
+        """Start a new log (old worker shards are removed by the controller)."""
+        self.distributed = self.config.pluginmanager.hasplugin("dsession")
+        if self.worker_id is None:
+            for shard in shard_paths(self.path)[1:]:
+                os.remove(shard)
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._file = open(self.path, "w", encoding="utf-8")
+        if self.worker_id is None:
+            self._write({"type": "session_start", "start": time.time(), "rootdir": str(self.config.rootpath),
+                         "args": self.config.invocation_params.args})
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        """Append the result of a test phase (on the worker that ran it)."""
+        if self.distributed:
+            return
+        record = {
+            "type": "test",
+            "nodeid": report.nodeid,
+            "when": report.when,
+            "outcome": report.outcome,
+            "duration": round(report.duration, 6),
+            "start": getattr(report, "start", None),
+            "stop": getattr(report, "stop", None),
+            "worker": self.worker_id,
+        }
+        if report.outcome != "passed":
+            record["longrepr"] = report.longreprtext
+            record["sections"] = [[title, content[-MAX_SECTION_CHARS:]] for title, content in report.sections]
+        if report.when == "call" and getattr(report, "wasxfail", None) is not None:
+            record["xfail"] = report.wasxfail
+        artifacts = [{**artifact, "path": self._relative(artifact["path"])}
+                     for artifact in getattr(report, "artifacts", [])]
+        extras = self._extras(report)
+        if artifacts:
+            record["artifacts"] = artifacts
+        if extras:
+            record["extras"] = extras
+        self._write(record)
+
+    def pytest_collectreport(self, report: pytest.CollectReport) -> None:
+        """Record collection errors."""
+        if report.failed and not self.distributed:
+            self._write({"type": "collect_error", "nodeid": report.nodeid, "start": time.time(),
+                         "worker": self.worker_id, "longrepr": report.longreprtext})
+
+    def pytest_sessionfinish(self, session: pytest.Session, exitstatus: int) -> None:
+        """Close the log."""
+        if self.worker_id is None:
+            self._write({"type": "session_finish", "start": time.time(), "exitstatus": int(exitstatus)})
+        self._file.close()
+
+    def pytest_terminal_summary(self, terminalreporter) -> None:
+        """Point to the log and how to render it."""
+        terminalreporter.write_sep("-", f"Results log: {self.path} (render: python -m qa_plugins.results {self.path})")
+
+
+def summarize(records: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Count test outcomes (a test counts once, with its worst phase outcome)."""
+    outcomes: Dict[str, str] = {}
+    for record in records:
+        if record["type"] == "collect_error":
+            outcomes[record["nodeid"]] = "error"
+        elif record["type"] == "test":
+            outcome = record["outcome"]
+            if record["when"] != "call" and outcome == "failed":
+                outcome = "error"
+            if outcome != "passed" or record["when"] == "call":
+                outcomes.setdefault(record["nodeid"], outcome)
+                if outcome != "passed":
+                    outcomes[record["nodeid"]] = outcome
+    counts: Dict[str, int] = {}
+    for outcome in outcomes.values():
+        counts[outcome] = counts.get(outcome, 0) + 1
+    return counts
+
+
+def _render_extra(extra: Dict[str, Any]) -> str:
+    if extra.get("kind") == "image":
+        path = html.escape(extra["path"])
+        return f'<a href="{path}"><img src="{path}" loading="lazy" alt="{html.escape(extra["name"])}"></a>'
+    if extra.get("kind"):
+        return f'<a href="{html.escape(extra["path"])}">{html.escape(extra["name"])}</a>'
+    if extra.get("format_type") == "html":
+        return extra.get("content") or ""
+    if extra.get("format_type") == "url":
+        return f'<a href="{html.escape(extra["content"])}">{html.escape(extra.get("name") or extra["content"])}</a>'
+    return f"<pre>{html.escape(str(extra.get('content')))}</pre>"
+
+
+def render_html(path: str, output: str) -> str:
+    """
+    Render a result log as an HTML report.
+
+    Artifacts stay separate files, referenced relative to the log, so the
+    report should be written to the log's directory.
+
+    Args:
+        path: Result log path
+        output: HTML file to write
+
+    Returns:
+        The output path
+    """
+    records = list(read_results(path))
+    counts = summarize(records)
+    tests: Dict[str, List[Dict[str, Any]]] = {}
+    for record in records:
+        if record["type"] in ("test", "collect_error"):
+            tests.setdefault(record["nodeid"], []).append(record)
+
+    rows = []
+    for nodeid, phases in tests.items():
+        outcome = "passed"
+        for phase in phases:
+            if phase["type"] == "collect_error" or (phase["outcome"] == "failed" and phase.get("when") != "call"):
+                outcome = "error"
+            elif phase["outcome"] != "passed" and outcome == "passed":
+                outcome = phase["outcome"]
+        duration = sum(phase.get("duration", 0) for phase in phases)
+        details = []
+        for phase in phases:
+            if phase.get("longrepr"):
+                details.append(f"<pre>{html.escape(phase['longrepr'])}</pre>")
+            for title, content in phase.get("sections", []):
+                details.append(f"<h4>{html.escape(title)}</h4><pre>{html.escape(content)}</pre>")
+            details.extend(_render_extra(extra) for extra in phase.get("extras", []) + phase.get("artifacts", []))
+        body = f"<details><summary>{html.escape(nodeid)}</summary>{''.join(details)}</details>" \
+            if details else html.escape(nodeid)
+        worker = phases[0].get("worker") or ""
+        rows.append(f'<tr class="{outcome}"><td>{outcome}</td><td>{body}</td>'
+                    f"<td>{duration:.3f}s</td><td>{html.escape(worker)}</td></tr>")
+
+    summary = ", ".join(f"{count} {outcome}" for outcome, count in sorted(counts.items()))
+    document = f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Test Report</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; width: 100%; }}
+td, th {{ border: 1px solid #ddd; padding: 4px 8px; text-align: left; vertical-align: top; }}
+tr.passed td:first-child {{ color: #2e7d32; }}
+tr.failed td:first-child, tr.error td:first-child {{ color: #c62828; }}
+tr.skipped td:first-child {{ color: #f9a825; }}
+pre {{ white-space: pre-wrap; font-size: 12px; }}
+img {{ max-width: 640px; }}
+</style></head>
+<body><h1>Test Report</h1>
+<p>{html.escape(summary or "no tests")} &mdash; {len(tests)} tests from {html.escape(path)}</p>
+<table><tr><th>Result</th><th>Test</th><th>Duration</th><th>Worker</th></tr>
+{chr(10).join(rows)}
+</table></body></html>
+"""
+    if os.path.dirname(output):
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as output_file:
+        output_file.write(document)
+    return output
+
+
+def pytest_addoption(parser):
+    """Register result log options."""
+    group = parser.getgroup("results", "Streaming result log")
+    group.addoption("--results-log", default=None, metavar="PATH",
+                    help=f"Append test results to a JSON Lines file as they complete (e.g. {DEFAULT_LOG_PATH})")
+
+
+def pytest_configure(config):
+    """Enable the result log when --results-log is given."""
+    path = config.getoption("--results-log")
+    if path:
+        config.pluginmanager.register(ResultLog(config, path), "results-log")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Render a result log as HTML."""
+    parser = argparse.ArgumentParser(description="Render a streaming result log as an HTML report")
+    parser.add_argument("log", nargs="?", default=DEFAULT_LOG_PATH, help="Result log (default: %(default)s)")
+    parser.add_argument("-o", "--output", default=None, help="HTML file (default: report.html next to the log)")
+    args = parser.parse_args(argv)
+    output = args.output or os.path.join(os.path.dirname(args.log), "report.html")
+    print(render_html(args.log, output))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""
+Duration-based xdist scheduling.
+
+Every run stores the duration of each test (setup, call and teardown) in
+``--durations-file``, smoothed over previous runs, together with the
+test's affinity fixtures: fixtures listed in the ``schedule_affinity``
+ini option (e.g. an authenticated state) and every class-, module- or
+package-scoped fixture, since those are set up again on each worker that
+runs one of their tests.
+
+With ``-n N --schedule=lpt`` the xdist controller uses those durations:
+
+* tests with the same affinity fixtures form one work unit, so they run
+  on the same worker and share the fixture; units longer than an even
+  share of the total (total / workers) are split to keep balance
+* units are handed out longest-processing-time first, each to the next
+  worker that runs out of work, which keeps the wall-clock time close to
+  the total test time divided by the number of workers
+
+Tests without a stored duration are assumed to take the median duration.
+"""
+import json
+import os
+import statistics
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+
+DURATIONS_VERSION = 1
+
+DEFAULT_DURATIONS_PATH = ".test-durations.json"
+
+SCHEDULES = ("xdist", "lpt")
+
+# Weight of the latest run in the stored duration
+SMOOTHING = 0.5
+
+# Fixture scopes that are set up more than once per worker
+_AFFINITY_SCOPES = ("class", "module", "package")
+
+
+def load_durations(path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Read stored test durations.
+
+    Args:
+        path: Durations file
+
+    Returns:
+        Dict mapping node ids to ``{"duration": seconds, "affinity": [fixture, ...]}``
+        (empty if the file is missing, unreadable or of another version)
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as durations_file:
+            data = json.load(durations_file)
+    except (OSError, ValueError):
+        return {}
+    return data.get("tests", {}) if data.get("version") == DURATIONS_VERSION else {}
+
+
+def plan_units(nodeids: List[str], durations: Dict[str, Dict[str, Any]],
+               workers: int) -> List[Tuple[str, List[str], float]]:
+    """
+    Group tests into work units and order them longest first.
+
+    Args:
+        nodeids: Collected tests, in collection order
+        durations: Stored durations (see load_durations)
+        workers: Number of xdist workers
+
+    Returns:
+        ``(unit name, node ids, expected seconds)`` tuples in the order to hand them out
+    """
+    known = [entry["duration"] for entry in durations.values()]
+    default = statistics.median(known) if known else 1.0
+    expected = {nodeid: durations.get(nodeid, {}).get("duration", default) for nodeid in nodeids}
+    share = sum(expected.values()) / max(workers, 1)
+
+    groups: Dict[str, List[str]] = {}
+    for nodeid in nodeids:
+        affinity = durations.get(nodeid, {}).get("affinity")
+        groups.setdefault("+".join(affinity) if affinity else nodeid, []).append(nodeid)
+
+    units = []
+    for name, members in groups.items():
+        chunk: List[str] = []
+        chunk_time = 0.0
+        for nodeid in members:
+            if chunk and chunk_time + expected[nodeid] > share:
+                units.append((f"{name}#{len(units)}", chunk, chunk_time))
+                chunk, chunk_time = [], 0.0
+            chunk.append(nodeid)
+            chunk_time += expected[nodeid]
+        units.append((name if len(chunk) == len(members) else f"{name}#{len(units)}", chunk, chunk_time))
+    return sorted(units, key=lambda unit: -unit[2])
+
+
+def predicted_makespan(units: List[Tuple[str, List[str], float]], workers: int) -> float:
+    """Wall-clock time of handing the units out in order to the least loaded worker."""
+    loads = [0.0] * max(workers, 1)
+    for _, _, unit_time in units:
+        loads[loads.index(min(loads))] += unit_time
+    return max(loads)
+
+
+class DurationRecorder:
+    """Pytest plugin storing test durations and affinity fixtures."""
+
+    def __init__(self, config: pytest.Config, path: str):
+        """
+        Initialize recorder.
+
+        Args:
+            config: Pytest config
+            path: Durations file
+        """
+        self.config = config
+        self.path = path
+        self.affinity_fixtures = set(config.getini("schedule_affinity"))
+        self.worker_id = getattr(config, "workerinput", {}).get("workerid")
+        self.durations: Dict[str, float] = {}
+        self.affinity: Dict[str, List[str]] = {}
+
+    def _affinity(self, item: pytest.Item) -> List[str]:
+        fixture_info = getattr(item, "_fixtureinfo", None)
+        if fixture_info is None:
+            return []
+        names = []
+        for name, definitions in fixture_info.name2fixturedefs.items():
+            if name in self.affinity_fixtures or definitions[-1].scope in _AFFINITY_SCOPES:
+                names.append(name)
+        return sorted(names)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item: pytest.Item, call: pytest.CallInfo):
+        """Send the affinity fixtures of a test along with its setup report (also to the xdist controller)."""
+        outcome = yield
+        report = outcome.get_result()
+        if report.when == "setup":
+            report.schedule_affinity = self._affinity(item)
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        """Add up the phase durations of every test (on the controller under xdist)."""
+        if self.worker_id is not None:
+            return
+        self.durations[report.nodeid] = self.durations.get(report.nodeid, 0.0) + report.duration
+        if report.when == "setup":
+            self.affinity[report.nodeid] = getattr(report, "schedule_affinity", [])
+
+    def pytest_sessionfinish(self, session: pytest.Session) -> None:
+        """Merge this run's durations into the durations file."""
+        if self.worker_id is not None or not self.durations:
+            return
+        tests = load_durations(self.path)
+        for nodeid, duration in self.durations.items():
+            previous = tests.get(nodeid, {}).get("duration")
+            if previous is not None:
+                duration = SMOOTHING * duration + (1 - SMOOTHING) * previous
+            tests[nodeid] = {"duration": round(duration, 4), "affinity": self.affinity.get(nodeid, [])}
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as durations_file:
+            json.dump({"version": DURATIONS_VERSION, "tests": dict(sorted(tests.items()))},
+                      durations_file, indent=1)
+
+
+def make_lpt_scheduler(config: pytest.Config, log: Any, durations: Dict[str, Dict[str, Any]]):
+    """
+    Create the LPT scheduler (xdist is only imported when it is used).
+
+    Args:
+        config: Pytest config
+        log: xdist scheduler log producer
+        durations: Stored durations (see load_durations)
+
+    Returns:
+        xdist scheduler instance
+    """
+    from xdist.scheduler import LoadScopeScheduling
+
+    class LPTScheduling(LoadScopeScheduling):
+        """LoadScopeScheduling with duration-ordered, affinity-grouped work units."""
+
+        def __init__(self, config: pytest.Config, log: Any = None):
+            super().__init__(config, log)
+            self.units: List[Tuple[str, List[str], float]] = []
+            self.unit_of: Dict[str, str] = {}
+            self.ordered = False
+
+        def schedule(self) -> None:
+            if self.collection is None and self._check_nodes_have_same_collection():
+                collection = list(next(iter(self.registered_collections.values())))
+                self.units = plan_units(collection, durations, len(self.nodes))
+                self.unit_of = {nodeid: name for name, members, _ in self.units for nodeid in members}
+                config.stash[_plan_key] = (self.units, len(self.nodes))
+            super().schedule()
+
+        def _split_scope(self, nodeid: str) -> str:
+            return self.unit_of[nodeid]
+
+        def _assign_work_unit(self, node: Any) -> None:
+            # The workqueue is filled in collection order; hand out the longest units first
+            if not self.ordered:
+                for name, _, _ in self.units:
+                    self.workqueue.move_to_end(name)
+                self.ordered = True
+            super()._assign_work_unit(node)
+
+    return LPTScheduling(config, log)
+
+
+_plan_key = pytest.StashKey[Tuple[List[Tuple[str, List[str], float]], int]]()
+
+
+def pytest_addoption(parser):
+    """Register scheduling options."""
+    group = parser.getgroup("scheduling", "Duration-based xdist scheduling")
+    group.addoption("--schedule", choices=SCHEDULES, default="xdist",
+                    help="xdist work distribution: xdist's own or longest-processing-time first "
+                         "from stored durations (default: %(default)s)")
+    group.addoption("--durations-file", default=DEFAULT_DURATIONS_PATH,
+                    help="Stored test durations (default: %(default)s)")
+    parser.addini("schedule_affinity", type="linelist", default=[],
+                  help="Expensive fixtures whose tests are kept on the same worker")
+
+
+def pytest_configure(config):
+    """Record test durations on every run."""
+    path = os.path.join(str(config.rootpath), config.getoption("--durations-file"))
+    config.pluginmanager.register(DurationRecorder(config, path), "duration-recorder")
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_make_scheduler(config, log):
+    """Use the LPT scheduler with --schedule=lpt and load distribution."""
+    if config.getoption("--schedule") != "lpt" or config.getoption("dist") != "load":
+        return None
+    path = os.path.join(str(config.rootpath), config.getoption("--durations-file"))
+    return make_lpt_scheduler(config, log, load_durations(path))
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    """Compare the predicted LPT makespan with the ideal even split."""
+    plan = config.stash.get(_plan_key, None)
+    if plan is None:
+        return
+    units, workers = plan
+    total = sum(unit_time for _, _, unit_time in units)
+    terminalreporter.write_sep("-", "lpt schedule")
+    terminalreporter.write_line(
+        f"{len(units)} work units on {workers} workers: expected {total:.2f}s in total, "
+        f"{total / workers:.2f}s per worker ideal, {predicted_makespan(units, workers):.2f}s predicted makespan")
@@ -4,6 +4,61 @@ Pytest configuration and fixtures for Playwright E2E tests.
 import pytest
 from playwright.sync_api import Page, Browser, BrowserContext, sync_playwright
 
+from pages.login_page import LoginPage
+from utils.auth import DEFAULT_AUTH_DIR, DEFAULT_PASSWORD, AuthStateCache, apply_storage_state, persona_for
+from utils.context_pool import DEFAULT_MAX_USES, ContextPool
+from utils.har import DEFAULT_HAR_DIR, HarStore
+from utils.local_app import LocalAppServer
+from utils.network import (DEFAULT_BLOCKED_TYPES, DEFAULT_BLOCKED_URLS, DEFAULT_CACHE_DIR, DEFAULT_CACHED_TYPES,
+                           DEFAULT_TTL, AssetCache, AssetRouter)
+
+
+pytest_plugins = ["qa_plugins.coverage_map", "qa_plugins.profiling", "qa_plugins.results", "qa_plugins.scheduling"]
+
+CONTEXT_OPTIONS = {"viewport": {"width": 1920, "height": 1080}, "ignore_https_errors": True}
+
+test_failed_key = pytest.StashKey[bool]()
+
+
+def pytest_addoption(parser):
+    """Register application, browser context pool, authentication, network routing and HAR options."""
+    group = parser.getgroup("app", "Application under test")
+    group.addoption("--local-app", action="store_true", default=False,
+                    help="Run against the local SauceDemo stand-in instead of www.saucedemo.com")
+    group = parser.getgroup("context-pool", "Browser context pool")
+    group.addoption("--no-context-pool", action="store_true", default=False,
+                    help="Create a new browser context for every test instead of reusing pooled ones")
+    group.addoption("--context-pool-size", type=int, default=1,
+                    help="Contexts pre-warmed per worker (default: %(default)s)")
+    group.addoption("--context-max-uses", type=int, default=DEFAULT_MAX_USES,
+                    help="Tests a pooled context serves before it is replaced (default: %(default)s)")
+    group = parser.getgroup("auth", "Authenticated state")
+    group.addoption("--no-auth-cache", action="store_true", default=False,
+                    help="Log tests marked 'authenticated' in through the UI instead of reusing a stored session")
+    group.addoption("--auth-dir", default=DEFAULT_AUTH_DIR,
+                    help="Directory for stored sessions (default: %(default)s)")
+    group = parser.getgroup("network", "Network routing")
+    group.addoption("--no-asset-routing", action="store_true", default=False,
+                    help="Load every resource from the network (as tests marked 'full_render' do)")
+    group.addoption("--asset-cache-dir", default=DEFAULT_CACHE_DIR,
+                    help="Static asset cache shared by contexts and workers (default: %(default)s)")
+    group.addoption("--asset-cache-ttl", type=float, default=DEFAULT_TTL,
+                    help="Seconds a cached asset is served before it is fetched again (default: %(default)s)")
+    group = parser.getgroup("har", "HAR record/replay")
+    group.addoption("--har-mode", choices=["record", "replay"], default=None,
+                    help="Record each test's traffic to a HAR, or serve it from the recorded HAR")
+    group.addoption("--har-dir", default=DEFAULT_HAR_DIR,
+                    help="Directory of recorded HARs and their compressed bodies (default: %(default)s)")
+    group.addoption("--har-not-found", choices=["abort", "fallback"], default="abort",
+                    help="Replay: abort requests missing from the HAR, or send them to the network "
+                         "(default: %(default)s)")
+    parser.addini("blocked_resource_types", type="linelist", default=DEFAULT_BLOCKED_TYPES,
+                  help="Playwright resource types aborted by the network routing layer")
+    parser.addini("blocked_url_patterns", type="linelist", default=DEFAULT_BLOCKED_URLS,
+                  help="URL substrings (analytics etc.) aborted by the network routing layer")
+    parser.addini("cached_resource_types", type="linelist", default=DEFAULT_CACHED_TYPES,
+                  help="Resource types served from the on-disk asset cache")
+
 
 @pytest.fixture(scope="session")
 def playwright():
@@ -23,28 +78,152 @@ def browser(playwright) -> Browser:
     browser.close()
 
 
+@pytest.fixture(scope="session")
+def context_pool(request, browser) -> ContextPool:
+    """Per-worker pool of pre-warmed browser contexts (None with --no-context-pool)."""
+    if request.config.getoption("--no-context-pool"):
+        yield None
+        return
+    pool = ContextPool(browser, CONTEXT_OPTIONS, size=request.config.getoption("--context-pool-size"),
+                       max_uses=request.config.getoption("--context-max-uses"))
+    yield pool
+    pool.close()
+
+
+@pytest.fixture(scope="session")
+def har_store(request) -> HarStore:
+    """Recorded HARs (None without --har-mode)."""
+    if request.config.getoption("--har-mode") is None:
+        return None
+    return HarStore(request.config.getoption("--har-dir"))
+
+
+@pytest.fixture(scope="session")
+def auth_cache(request, browser, base_url, har_store) -> AuthStateCache:
+    """
+    Logged-in storage states per persona for this worker.
+
+    None with --no-auth-cache, and with --har-mode, where the login has to
+    happen inside the recorded context.
+    """
+    if request.config.getoption("--no-auth-cache") or har_store is not None:
+        return None
+    worker_id = getattr(request.config, "workerinput", {}).get("workerid", "master")
+    return AuthStateCache(browser, base_url, CONTEXT_OPTIONS, directory=request.config.getoption("--auth-dir"),
+                          worker_id=worker_id)
+
+
 @pytest.fixture(scope="function")
-def context(browser) -> BrowserContext:
-    """Browser context for each test."""
-    context = browser.new_context(
-        viewport={"width": 1920, "height": 1080},
-        ignore_https_errors=True
-    )
+def context(request, browser, context_pool, auth_cache, har_store) -> BrowserContext:
+    """
+    Browser context for each test.
+
+    Taken from the context pool and reset afterwards; tests marked
+    ``fresh_context`` (or runs with --no-context-pool or --har-mode) get a
+    new context. Tests marked ``authenticated`` start with the persona's
+    stored session.
+    """
+    persona = persona_for(request.node) if auth_cache is not None else None
+    state = auth_cache.state(persona) if persona else None
+    recording = None
+    if context_pool is None or har_store is not None or request.node.get_closest_marker("fresh_context"):
+        context = browser.new_context(storage_state=state, **CONTEXT_OPTIONS)
+        entry = None
+        if request.config.getoption("--har-mode") == "record":
+            recording = har_store.record(context)
+        elif har_store is not None:
+            not_found = request.config.getoption("--har-not-found")
+            if not har_store.replay(context, request.node.nodeid, not_found) and not_found == "abort":
+                context.close()
+                pytest.fail(f"No HAR recorded for {request.node.nodeid} (run with --har-mode=record)")
+    else:
+        entry = context_pool.acquire()
+        context = entry.context
+        if state is not None:
+            apply_storage_state(context, entry.page, state)
     yield context
-    context.close()
+    failed = request.node.stash.get(test_failed_key, False)
+    if failed and persona and context.pages and auth_cache.is_login_page(context.pages[0]):
+        # The stored session was rejected: log in again for the next test
+        auth_cache.invalidate(persona)
+    if entry is None:
+        context.close()
+        if recording is not None and failed:
+            har_store.discard(recording)
+        elif recording is not None:
+            har_store.pack(recording, request.node.nodeid)
+    else:
+        context_pool.release(entry, failed=failed)
+
+
+@pytest.fixture(scope="session")
+def asset_cache(request) -> AssetCache:
+    """On-disk static asset cache, shared by all contexts and xdist workers."""
+    return AssetCache(request.config.getoption("--asset-cache-dir"), request.config.getoption("--asset-cache-ttl"))
+
+
+@pytest.fixture(scope="function")
+def asset_routing(request, context, asset_cache, har_store) -> AssetRouter:
+    """
+    Block non-essential requests and serve static assets from the cache.
+
+    Tests marked ``full_render`` (or runs with --no-asset-routing) load
+    everything from the network. With --har-mode assets are left to the
+    HAR instead of the cache. The requests and bytes saved are added to
+    the test's report. The local app (--local-app) is not worth caching.
+    """
+    if request.config.getoption("--no-asset-routing") or request.node.get_closest_marker("full_render"):
+        yield None
+        return
+    config = request.config
+    cache = asset_cache if har_store is None and not config.getoption("--local-app") else None
+    router = AssetRouter(cache, config.getini("blocked_resource_types"), config.getini("blocked_url_patterns"),
+                         config.getini("cached_resource_types"))
+    context.route("**/*", router.handle)
+    yield router
+    context.unroute("**/*", router.handle)
+    request.node.user_properties.append(("network", dict(router.stats)))
+    request.node.add_report_section("teardown", "network", router.summary())
 
 
 @pytest.fixture(scope="function")
-def page(context) -> Page:
+def page(request, context, asset_routing, auth_cache, base_url) -> Page:
     """Page instance for each test."""
-    page = context.new_page()
+    # A pooled context comes with a pre-warmed page, which the pool resets
+    pooled = bool(context.pages)
+    page = context.pages[0] if pooled else context.new_page()
+    persona = persona_for(request.node)
+    if persona and auth_cache is None:
+        login_page = LoginPage(page)
+        login_page.navigate(base_url)
+        login_page.login(persona, DEFAULT_PASSWORD)
     yield page
-    page.close()
+    if not pooled:
+        page.close()
 
 
 @pytest.fixture(scope="session")
-def base_url() -> str:
-    """Base URL for the application under test."""
+def local_app():
+    """
+    Local SauceDemo stand-in on an ephemeral port.
+
+    Started once per pytest process (i.e. per xdist worker).
+
+    Yields:
+        LocalAppServer: Running server
+    """
+    server = LocalAppServer().start()
+
+    yield server
+
+    server.stop()
+
+
+@pytest.fixture(scope="session")
+def base_url(request) -> str:
+    """Base URL for the application under test (the local stand-in with --local-app)."""
+    if request.config.getoption("--local-app"):
+        return request.getfixturevalue("local_app").base_url
     return "https://www.saucedemo.com"
 
 
@@ -62,6 +241,9 @@ def pytest_runtest_makereport(item, call):
     """
     outcome = yield
     rep = outcome.get_result()
+    if rep.failed:
+        # A failed test's pooled context is discarded rather than reused
+        item.stash[test_failed_key] = True
     
     # Only capture screenshot on test failure during the call phase
     if rep.when == "call" and rep.failed:
@@ -70,6 +252,8 @@ def pytest_runtest_makereport(item, call):
             page = item.funcargs["page"]
             try:
                 import os
+                # Imported here: the plugin is registered (and assert-rewritten) via pytest_plugins
+                from qa_plugins.results import attach_artifact
                 # Create screenshots directory if it doesn't exist
                 screenshot_dir = "reports/screenshots"
                 os.makedirs(screenshot_dir, exist_ok=True)
@@ -79,8 +263,27 @@ def pytest_runtest_makereport(item, call):
                 
                 # Capture full-page screenshot
                 page.screenshot(path=screenshot_path, full_page=True)
+                attach_artifact(rep, screenshot_path, kind="image", name="screenshot")
                 print(f"\n[SCREENSHOT] Saved: {screenshot_path}")
             except Exception as e:
                 # Log error but don't fail the test report generation
                 print(f"[WARNING] Failed to capture screenshot: {e}")
 
+
+def pytest_terminal_summary(terminalreporter):
+    """Print the requests and bytes the network routing layer saved (over all workers)."""
+    totals = {}
+    for reports in terminalreporter.stats.values():
+        for report in reports:
+            if getattr(report, "when", None) != "teardown":
+                continue
+            for name, stats in report.user_properties:
+                if name == "network":
+                    for key, value in stats.items():
+                        totals[key] = totals.get(key, 0) + value
+    if totals:
+        terminalreporter.write_sep("-", "network routing")
+        terminalreporter.write_line(
+            f"{totals['blocked']} requests blocked, {totals['cache_hits']} served from cache "
+            f"({totals['bytes_from_cache'] / 1e6:.1f} MB), {totals['cache_misses']} cache misses "
+            f"of {totals['requests']} requests")
@@ -4,8 +4,12 @@ Page Object Model for the SauceDemo cart page.
 This module contains the CartPage class which handles interactions
 with the shopping cart page, including item management and checkout navigation.
 """
+from typing import Iterable, Union
+
 from playwright.sync_api import Page
 
+from pages.state import AppState
+
 
 class CartPage:
     """Page Object for the cart page."""
@@ -22,6 +26,35 @@ class CartPage:
         self.checkout_button = page.locator("#checkout")
         self.continue_shopping_button = page.locator("#continue-shopping")
     
+    @classmethod
+    def with_items(cls, page: Page, base_url: str, items: Iterable[Union[str, int]],
+                   user: str = "standard_user") -> "CartPage":
+        """
+        Open the cart page with the given items, seeded without the UI.
+        
+        Args:
+            page: Playwright Page instance (before its first navigation to the app)
+            base_url: Base URL of the application
+            items: Product names (or ids) in the cart
+            user: Username to be logged in as
+            
+        Returns:
+            CartPage on the loaded cart page
+        """
+        AppState(user=user, cart=items).apply(page, base_url)
+        cart_page = cls(page)
+        cart_page.navigate(base_url)
+        return cart_page
+    
+    def navigate(self, base_url: str) -> None:
+        """
+        Navigate to the cart page (requires a logged-in session).
+        
+        Args:
+            base_url: Base URL of the application
+        """
+        self.page.goto(f"{base_url}/cart.html")
+    
     def is_loaded(self) -> bool:
         """
         Check if the cart page is fully loaded.
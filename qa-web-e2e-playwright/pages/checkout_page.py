@@ -4,8 +4,12 @@ Page Object Model for the SauceDemo checkout pages.
 This module contains the CheckoutPage class which handles interactions
 with both the checkout information page and the checkout overview page.
 """
+from typing import Iterable, Union
+
 from playwright.sync_api import Page
 
+from pages.state import AppState
+
 
 class CheckoutPage:
     """Page Object for the checkout flow (information, overview)."""
@@ -31,6 +35,48 @@ class CheckoutPage:
         self.finish_button = page.locator("#finish")
         self.cancel_button_overview = page.locator("#cancel")
     
+    @classmethod
+    def with_items(cls, page: Page, base_url: str, items: Iterable[Union[str, int]],
+                   user: str = "standard_user", overview: bool = False) -> "CheckoutPage":
+        """
+        Open a checkout page with the given cart, seeded without the UI.
+        
+        Args:
+            page: Playwright Page instance (before its first navigation to the app)
+            base_url: Base URL of the application
+            items: Product names (or ids) in the cart
+            user: Username to be logged in as
+            overview: Open the overview page instead of the information page
+            
+        Returns:
+            CheckoutPage on the loaded page
+        """
+        AppState(user=user, cart=items).apply(page, base_url)
+        checkout_page = cls(page)
+        if overview:
+            checkout_page.navigate_to_overview(base_url)
+        else:
+            checkout_page.navigate(base_url)
+        return checkout_page
+    
+    def navigate(self, base_url: str) -> None:
+        """
+        Navigate to the checkout information page (requires a logged-in session).
+        
+        Args:
+            base_url: Base URL of the application
+        """
+        self.page.goto(f"{base_url}/checkout-step-one.html")
+    
+    def navigate_to_overview(self, base_url: str) -> None:
+        """
+        Navigate to the checkout overview page (requires a logged-in session).
+        
+        Args:
+            base_url: Base URL of the application
+        """
+        self.page.goto(f"{base_url}/checkout-step-two.html")
+    
     def is_information_page_loaded(self) -> bool:
         """
         Check if checkout information page is fully loaded.
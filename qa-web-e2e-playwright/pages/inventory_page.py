@@ -4,8 +4,12 @@ Page Object Model for the SauceDemo inventory/products page.
 This module contains the InventoryPage class which handles interactions
 with the product listing page, including adding items to cart and navigation.
 """
+from typing import Iterable, Union
+
 from playwright.sync_api import Page
 
+from pages.state import AppState
+
 
 class InventoryPage:
     """Page Object for the inventory/products page."""
@@ -18,6 +22,35 @@ class InventoryPage:
         self.logout_link = page.locator("#logout_sidebar_link")
         self.product_items = page.locator(".inventory_item")
     
+    @classmethod
+    def with_items(cls, page: Page, base_url: str, items: Iterable[Union[str, int]],
+                   user: str = "standard_user") -> "InventoryPage":
+        """
+        Open the inventory page with the given items already in the cart.
+        
+        Args:
+            page: Playwright Page instance (before its first navigation to the app)
+            base_url: Base URL of the application
+            items: Product names (or ids) in the cart
+            user: Username to be logged in as
+            
+        Returns:
+            InventoryPage on the loaded inventory page
+        """
+        AppState(user=user, cart=items).apply(page, base_url)
+        inventory_page = cls(page)
+        inventory_page.navigate(base_url)
+        return inventory_page
+    
+    def navigate(self, base_url: str) -> None:
+        """
+        Navigate to the inventory page (requires a logged-in session).
+        
+        Args:
+            base_url: Base URL of the application
+        """
+        self.page.goto(f"{base_url}/inventory.html")
+    
     def is_loaded(self) -> bool:
         """
         Check if the inventory page is fully loaded.
@@ -0,0 +1,115 @@
+"""
+Direct seeding of the SauceDemo client-side state.
+
+SauceDemo keeps its whole session in the browser: the logged-in user in
+the ``session-username`` cookie and the cart in the ``cart-contents``
+localStorage entry (a JSON list of product ids). AppState writes both into
+the context before the first navigation, so a test can open the page it
+verifies directly instead of logging in and clicking through the
+preceding steps. The page objects expose it as ``with_items()``, e.g.:
+
+    cart_page = CartPage.with_items(page, base_url, ["Sauce Labs Backpack"])
+"""
+import json
+import time
+from typing import Dict, Iterable, List, Optional, Union
+from urllib.parse import urlsplit
+
+from playwright.sync_api import Page
+
+
+PRODUCT_IDS = {
+    "Sauce Labs Backpack": 4,
+    "Sauce Labs Bike Light": 0,
+    "Sauce Labs Bolt T-Shirt": 1,
+    "Sauce Labs Fleece Jacket": 5,
+    "Sauce Labs Onesie": 2,
+    "Test.allTheThings() T-Shirt (Red)": 3,
+}
+
+SESSION_COOKIE = "session-username"
+CART_STORAGE_KEY = "cart-contents"
+
+# SauceDemo's own login sets a session cookie valid for 10 minutes
+SESSION_LIFETIME = 600
+
+
+def seed_local_storage(page: Page, origin: str, items: Dict[str, str]) -> None:
+    """
+    Write localStorage entries for an origin before the app is first loaded.
+
+    The origin is opened with a stubbed empty document, so no request
+    reaches the application.
+
+    Args:
+        page: Page to write with (left on about:blank)
+        origin: Origin such as "https://www.saucedemo.com"
+        items: Keys and values to store
+    """
+    pattern = f"{origin}/**"
+
+    def empty_document(route):
+        route.fulfill(status=200, content_type="text/html", body="<html></html>")
+
+    page.route(pattern, empty_document)
+    try:
+        page.goto(f"{origin}/")
+        page.evaluate("items => { for (const [k, v] of Object.entries(items)) localStorage.setItem(k, v); }",
+                      items)
+    finally:
+        page.unroute(pattern, empty_document)
+    page.goto("about:blank")
+
+
+def product_id(item: Union[str, int]) -> int:
+    """
+    Resolve a product name (or id) to its SauceDemo product id.
+
+    Args:
+        item: Product name as shown on the inventory page, or its id
+
+    Returns:
+        Product id
+
+    Raises:
+        ValueError: If the product is unknown
+    """
+    if isinstance(item, int) and item in PRODUCT_IDS.values():
+        return item
+    if item in PRODUCT_IDS:
+        return PRODUCT_IDS[item]
+    raise ValueError(f"Unknown product: {item!r} (known: {', '.join(PRODUCT_IDS)})")
+
+
+class AppState:
+    """Client-side state to seed: logged-in user and cart contents."""
+
+    def __init__(self, user: Optional[str] = "standard_user", cart: Iterable[Union[str, int]] = ()):
+        """
+        Initialize state.
+
+        Args:
+            user: Username to be logged in as (None to stay logged out)
+            cart: Product names or ids in the cart
+        """
+        self.user = user
+        self.cart: List[int] = [product_id(item) for item in cart]
+
+    def apply(self, page: Page, base_url: str) -> None:
+        """
+        Write the state into the page's context (before navigating to the app).
+
+        Args:
+            page: Page whose context receives the state
+            base_url: Base URL of the application
+        """
+        parts = urlsplit(base_url)
+        if self.user is not None:
+            page.context.add_cookies([{
+                "name": SESSION_COOKIE,
+                "value": self.user,
+                "domain": parts.hostname,
+                "path": "/",
+                "expires": time.time() + SESSION_LIFETIME,
+            }])
+        seed_local_storage(page, f"{parts.scheme}://{parts.netloc}", {CART_STORAGE_KEY: json.dumps(self.cart)})
@@ -45,23 +45,19 @@ def test_invalid_login_shows_error(page, base_url):
 
 @pytest.mark.smoke
 @pytest.mark.cart
+@pytest.mark.authenticated
 def test_add_item_to_cart_and_verify_count(page, base_url):
     """
     Test adding an item to cart and verifying the cart count badge updates.
     
     Steps:
-    1. Login to application
-    2. Navigate to inventory page
-    3. Add first item to cart
-    4. Verify cart badge count increases by 1
+    1. Navigate to inventory page (already logged in as standard_user)
+    2. Add first item to cart
+    3. Verify cart badge count increases by 1
     """
-    # Login first to access inventory
-    login_page = LoginPage(page)
-    login_page.navigate(base_url)
-    login_page.login("standard_user", "secret_sauce")
-    
     # Navigate to inventory and add item to cart
     inventory_page = InventoryPage(page)
+    inventory_page.navigate(base_url)
     assert inventory_page.is_loaded(), "Inventory page should be loaded"
     
     # Get initial cart count before adding item
@@ -78,18 +74,10 @@ def test_add_item_to_cart_and_verify_count(page, base_url):
 @pytest.mark.checkout
 def test_checkout_flow_up_to_overview(page, base_url):
     """Test checkout flow from cart to overview page and verify summary is visible."""
-    # Login and add item to cart
-    login_page = LoginPage(page)
-    login_page.navigate(base_url)
-    login_page.login("standard_user", "secret_sauce")
-    
-    inventory_page = InventoryPage(page)
-    inventory_page.add_item_to_cart(index=0)
-    
-    # Go to cart
-    inventory_page.click_cart_icon()
-    cart_page = CartPage(page)
+    # Start on the cart page with an item in it (state seeded, no login or clicks)
+    cart_page = CartPage.with_items(page, base_url, ["Sauce Labs Backpack"])
     assert cart_page.is_loaded(), "Cart page should be loaded"
+    assert cart_page.get_cart_item_count() == 1, "Cart should contain the seeded item"
     
     # Start checkout
     cart_page.click_checkout()
@@ -110,20 +98,18 @@ def test_checkout_flow_up_to_overview(page, base_url):
 
 
 @pytest.mark.smoke
+@pytest.mark.authenticated
 def test_logout_works(page, base_url):
     """Test that logout functionality works correctly."""
-    # Login first
-    login_page = LoginPage(page)
-    login_page.navigate(base_url)
-    login_page.login("standard_user", "secret_sauce")
-    
-    # Verify we're on inventory page
+    # Verify we're on inventory page (already logged in as standard_user)
     inventory_page = InventoryPage(page)
+    inventory_page.navigate(base_url)
     assert inventory_page.is_loaded(), "Inventory page should be loaded after login"
     
     # Logout
     inventory_page.logout()
     
     # Verify we're back on login page
+    login_page = LoginPage(page)
     assert login_page.is_login_button_visible(), "Login button should be visible after logout"
 
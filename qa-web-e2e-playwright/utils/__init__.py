@@ -0,0 +1,3 @@
+"""
+Pytest plugins and helpers for the E2E suite.
+"""
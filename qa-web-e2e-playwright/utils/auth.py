@@ -0,0 +1,180 @@
+"""
+Cached authenticated browser state.
+
+Logging in through the UI costs a page load and a form submit. Tests
+marked ``authenticated`` instead start with the storage state (cookies
+and localStorage) of a session created once per worker and user persona:
+
+    @pytest.mark.authenticated                  # standard_user
+    @pytest.mark.authenticated("problem_user")  # another persona
+    @pytest.mark.authenticated(False)           # opt out of a module-level mark
+
+AuthStateCache logs in with a throwaway context, keeps the resulting
+``storage_state`` in memory and in
+``<directory>/<persona>.<host hash>.<worker>.json`` (reused by later runs
+against the same host and port), and logs in again once a session cookie is about
+to expire or the session was invalidated (a test ended up on the login
+page).
+"""
+import hashlib
+import json
+import os
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+from playwright.sync_api import Browser, BrowserContext, Page
+
+from pages.login_page import LoginPage
+from pages.state import seed_local_storage
+
+
+DEFAULT_AUTH_DIR = ".auth"
+DEFAULT_PERSONA = "standard_user"
+DEFAULT_PASSWORD = "secret_sauce"
+
+# Sessions are refreshed this many seconds before their cookies expire
+EXPIRY_MARGIN = 60
+
+
+def persona_for(item: Any) -> Optional[str]:
+    """
+    Persona a test should start logged in as.
+
+    Args:
+        item: Pytest test item
+
+    Returns:
+        Username from the closest ``authenticated`` marker, or None if the
+        test is not marked (or marked ``authenticated(False)``)
+    """
+    marker = item.get_closest_marker("authenticated")
+    if marker is None:
+        return None
+    persona = marker.args[0] if marker.args else marker.kwargs.get("user", DEFAULT_PERSONA)
+    if persona is True:
+        return DEFAULT_PERSONA
+    return persona or None
+
+
+def apply_storage_state(context: BrowserContext, page: Page, state: Dict[str, Any]) -> None:
+    """
+    Load a storage state into an existing context.
+
+    Args:
+        context: Context to add the cookies to
+        page: Page used to write localStorage
+        state: Storage state as returned by context.storage_state()
+    """
+    if state["cookies"]:
+        context.add_cookies(state["cookies"])
+    for origin in state.get("origins", []):
+        if origin.get("localStorage"):
+            items = {entry["name"]: entry["value"] for entry in origin["localStorage"]}
+            seed_local_storage(page, origin["origin"], items)
+
+
+def is_expired(state: Dict[str, Any], margin: float = EXPIRY_MARGIN) -> bool:
+    """
+    Check whether a storage state's session is (about to be) expired.
+
+    Args:
+        state: Storage state
+        margin: Seconds of validity the session must have left
+
+    Returns:
+        True if it has no cookies or a cookie expires within ``margin``
+    """
+    if not state.get("cookies"):
+        return True
+    deadline = time.time() + margin
+    return any(0 < cookie.get("expires", -1) < deadline for cookie in state["cookies"])
+
+
+class AuthStateCache:
+    """Per-worker cache of logged-in storage states, one per persona."""
+
+    def __init__(self, browser: Browser, base_url: str, context_options: Optional[Dict[str, Any]] = None,
+                 directory: str = DEFAULT_AUTH_DIR, worker_id: str = "master",
+                 password: str = DEFAULT_PASSWORD):
+        """
+        Initialize cache.
+
+        Args:
+            browser: Browser to log in with
+            base_url: Base URL of the application
+            context_options: Keyword arguments for browser.new_context()
+            directory: Directory the storage states are saved in
+            worker_id: xdist worker id (states are not shared between workers)
+            password: Password of every persona
+        """
+        self.browser = browser
+        self.base_url = base_url
+        self.context_options = context_options or {}
+        self.directory = directory
+        self.worker_id = worker_id
+        self.password = password
+        self.states: Dict[str, Dict[str, Any]] = {}
+        self.logins = 0
+        # States saved against another application (e.g. --local-app) must not be reused
+        self._host_key = hashlib.sha1(urlsplit(base_url).netloc.lower().encode()).hexdigest()[:10]
+
+    def _path(self, persona: str) -> str:
+        return os.path.join(self.directory, f"{persona}.{self._host_key}.{self.worker_id}.json")
+
+    def state(self, persona: str = DEFAULT_PERSONA) -> Dict[str, Any]:
+        """
+        Storage state of a logged-in persona, logging in if needed.
+
+        Args:
+            persona: Username to log in as
+
+        Returns:
+            Storage state with an unexpired session
+        """
+        state = self.states.get(persona)
+        if state is None and os.path.exists(self._path(persona)):
+            with open(self._path(persona), "r", encoding="utf-8") as state_file:
+                state = json.load(state_file)
+        if state is None or is_expired(state):
+            state = self._login(persona)
+        self.states[persona] = state
+        return state
+
+    def _login(self, persona: str) -> Dict[str, Any]:
+        context = self.browser.new_context(**self.context_options)
+        try:
+            page = context.new_page()
+            login_page = LoginPage(page)
+            login_page.navigate(self.base_url)
+            login_page.login(persona, self.password)
+            page.wait_for_url("**/inventory.html")
+            os.makedirs(self.directory, exist_ok=True)
+            state = context.storage_state(path=self._path(persona))
+        finally:
+            context.close()
+        self.logins += 1
+        return state
+
+    def invalidate(self, persona: str) -> None:
+        """
+        Drop a persona's session so the next state() call logs in again.
+
+        Args:
+            persona: Username whose session is no longer valid
+        """
+        self.states.pop(persona, None)
+        if os.path.exists(self._path(persona)):
+            os.remove(self._path(persona))
+
+    def is_login_page(self, page: Page) -> bool:
+        """
+        Check whether a page was sent back to the login page.
+
+        Args:
+            page: Page of a finished test
+
+        Returns:
+            True if the page is on the application's login page
+        """
+        return page.url.split("?")[0].rstrip("/") == self.base_url.rstrip("/")
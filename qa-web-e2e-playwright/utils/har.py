@@ -0,0 +1,156 @@
+"""
+HAR record/replay of each test's network traffic.
+
+With ``--har-mode=record`` every test runs in a new context whose traffic
+Playwright records (``route_from_har(update=True)``). When a passing test's
+context closes, HarStore packs the recording into ``<har-dir>``:
+
+* ``<test>.har`` holds the requests and responses, with bodies up to
+  INLINE_LIMIT bytes inlined (base64)
+* larger bodies go to ``blobs/<sha1 of body>.<ext>.gz``, gzip-compressed
+  and stored once however many tests load them
+
+With ``--har-mode=replay`` the test's HAR is served back through
+``route_from_har``. Requests missing from it are aborted (``--har-not-found
+=abort``, the default) or sent to the network (``fallback``), so with a
+complete archive the application never has to be reachable. The blobs are
+decompressed once into ``<har-dir>/.replay/``, shared by all workers.
+"""
+import base64
+import gzip
+import json
+import os
+import re
+import shutil
+import tempfile
+from typing import Any, Dict
+
+from playwright.sync_api import BrowserContext
+
+from utils.network import write_atomic
+
+
+DEFAULT_HAR_DIR = "hars"
+INLINE_LIMIT = 4096
+REPLAY_DIR = ".replay"
+
+
+def har_name(nodeid: str) -> str:
+    """
+    File name of a test's HAR.
+
+    Args:
+        nodeid: Pytest node id
+
+    Returns:
+        E.g. "tests_test_e2e_flows.py__test_logout_works.har"
+    """
+    return re.sub(r"[^\w.-]+", "_", nodeid.replace("::", "__")) + ".har"
+
+
+class HarStore:
+    """Directory of per-test HARs with a shared, compressed body store."""
+
+    def __init__(self, directory: str = DEFAULT_HAR_DIR, inline_limit: int = INLINE_LIMIT):
+        """
+        Initialize store.
+
+        Args:
+            directory: Directory holding the HARs and blobs
+            inline_limit: Largest body (bytes) kept inside a HAR
+        """
+        self.directory = directory
+        self.inline_limit = inline_limit
+        self.blob_dir = os.path.join(directory, "blobs")
+        self.replay_dir = os.path.join(directory, REPLAY_DIR)
+
+    def record(self, context: BrowserContext) -> str:
+        """
+        Start recording a context's traffic (written when the context closes).
+
+        Args:
+            context: New browser context
+
+        Returns:
+            Path of the raw recording, to pass to pack()
+        """
+        path = os.path.join(tempfile.mkdtemp(prefix="har-"), "recording.har")
+        context.route_from_har(path, update=True, update_content="attach", update_mode="minimal")
+        return path
+
+    def pack(self, recording: str, nodeid: str) -> str:
+        """
+        Move a finished recording into the store.
+
+        Args:
+            recording: Path returned by record(), after its context was closed
+            nodeid: Pytest node id of the recorded test
+
+        Returns:
+            Path of the test's HAR
+        """
+        recording_dir = os.path.dirname(recording)
+        with open(recording, "r", encoding="utf-8") as har_file:
+            har = json.load(har_file)
+        for entry in har["log"]["entries"]:
+            content = entry["response"]["content"]
+            attached = content.pop("_file", None)
+            if attached is None:
+                continue
+            with open(os.path.join(recording_dir, attached), "rb") as body_file:
+                body = body_file.read()
+            if len(body) <= self.inline_limit:
+                content["text"] = base64.b64encode(body).decode("ascii")
+                content["encoding"] = "base64"
+                continue
+            # Attachments are named after the SHA-1 of their content, so equal bodies share a blob
+            blob = os.path.join(self.blob_dir, attached + ".gz")
+            if not os.path.exists(blob):
+                write_atomic(blob, gzip.compress(body, mtime=0))
+            content["_file"] = attached
+        path = os.path.join(self.directory, har_name(nodeid))
+        write_atomic(path, json.dumps(har, indent=1, sort_keys=True).encode())
+        shutil.rmtree(recording_dir, ignore_errors=True)
+        return path
+
+    def discard(self, recording: str) -> None:
+        """
+        Drop a recording (e.g. of a failed test).
+
+        Args:
+            recording: Path returned by record()
+        """
+        shutil.rmtree(os.path.dirname(recording), ignore_errors=True)
+
+    def replay(self, context: BrowserContext, nodeid: str, not_found: str = "abort") -> bool:
+        """
+        Serve a test's traffic from its HAR.
+
+        Args:
+            context: New browser context
+            nodeid: Pytest node id of the test
+            not_found: "abort" or "fallback" (to the network) for unrecorded requests
+
+        Returns:
+            False if no HAR was recorded for the test
+        """
+        source = os.path.join(self.directory, har_name(nodeid))
+        if not os.path.exists(source):
+            return False
+        with open(source, "r", encoding="utf-8") as har_file:
+            har: Dict[str, Any] = json.load(har_file)
+        for entry in har["log"]["entries"]:
+            attached = entry["response"]["content"].get("_file")
+            if attached is not None:
+                self._materialize(attached)
+        path = os.path.join(self.replay_dir, har_name(nodeid))
+        os.makedirs(self.replay_dir, exist_ok=True)
+        shutil.copyfile(source, path)
+        context.route_from_har(path, not_found=not_found)
+        return True
+
+    def _materialize(self, attached: str) -> None:
+        path = os.path.join(self.replay_dir, attached)
+        if not os.path.exists(path):
+            with open(os.path.join(self.blob_dir, attached + ".gz"), "rb") as blob_file:
+                write_atomic(path, gzip.decompress(blob_file.read()))
@@ -0,0 +1,167 @@
+"""
+Local stand-in for the SauceDemo web application.
+
+LocalAppServer serves a small single-page app (``utils/saucedemo/``) with
+the DOM contract the page objects rely on (``#user-name``,
+``.inventory_item``, ``.shopping_cart_badge``, ``#checkout``,
+``.summary_total_label``, ``#logout_sidebar_link``, ...) and the same
+behavior: the same users and error messages on login, the cart kept in
+the ``cart-contents`` localStorage entry, the session in the
+``session-username`` cookie, checkout with 8% tax, and logged-out visitors
+of inner pages sent back to the login page. Because the state format
+matches, ``pages/state.py`` seeding works against it unchanged.
+
+The server is a threaded HTTP/1.1 server with keep-alive that binds an
+ephemeral port, so each xdist worker runs its own copy and hundreds of
+parallel contexts never touch the public site. Scripts and stylesheets
+are sent with a Cache-Control max-age, the pages themselves with no-cache.
+"""
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from pages.state import PRODUCT_IDS
+
+
+PASSWORD = "secret_sauce"
+
+USERS = [
+    "standard_user",
+    "locked_out_user",
+    "problem_user",
+    "performance_glitch_user",
+    "error_user",
+    "visual_user",
+]
+
+PRODUCTS = {
+    "Sauce Labs Backpack": (29.99, "carry.allTheThings() with the sleek, streamlined Sly Pack."),
+    "Sauce Labs Bike Light": (9.99, "A red light isn't the desired state in testing but it sure helps when riding."),
+    "Sauce Labs Bolt T-Shirt": (15.99, "Get your testing superhero on with the Sauce Labs bolt T-shirt."),
+    "Sauce Labs Fleece Jacket": (49.99, "A midweight quarter-zip fleece jacket for the cold server room."),
+    "Sauce Labs Onesie": (7.99, "Rib snap infant onesie for the junior automation engineer in development."),
+    "Test.allTheThings() T-Shirt (Red)": (15.99, "This classic Sauce Labs t-shirt is perfect to wear when cozying up."),
+}
+
+# Pages rendered by the app (everything else but /static/ is a 404)
+PAGES = (
+    "/",
+    "/inventory.html",
+    "/inventory-item.html",
+    "/cart.html",
+    "/checkout-step-one.html",
+    "/checkout-step-two.html",
+    "/checkout-complete.html",
+)
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "saucedemo")
+
+ASSET_MAX_AGE = 3600
+
+_CONTENT_TYPES = {
+    ".html": "text/html; charset=utf-8",
+    ".js": "application/javascript; charset=utf-8",
+    ".css": "text/css; charset=utf-8",
+}
+
+
+def catalog_script() -> bytes:
+    """Build /static/catalog.js, the catalog and users read by app.js (inventory order, A to Z)."""
+    catalog = [
+        {"id": PRODUCT_IDS[name], "name": name, "price": price, "description": description}
+        for name, (price, description) in sorted(PRODUCTS.items())
+    ]
+    return (f"var CATALOG = {json.dumps(catalog)};\n"
+            f"var USERS = {json.dumps(USERS)};\n"
+            f"var PASSWORD = {json.dumps(PASSWORD)};\n").encode()
+
+
+def load_assets() -> Dict[str, Tuple[bytes, str, str]]:
+    """
+    Load the files the server sends.
+
+    Returns:
+        Dict of path to (body, content type, cache control)
+    """
+    assets = {"/static/catalog.js": (catalog_script(), _CONTENT_TYPES[".js"], f"public, max-age={ASSET_MAX_AGE}")}
+    for name in ("app.js", "app.css"):
+        with open(os.path.join(STATIC_DIR, name), "rb") as asset_file:
+            assets[f"/static/{name}"] = (asset_file.read(), _CONTENT_TYPES[os.path.splitext(name)[1]],
+                                         f"public, max-age={ASSET_MAX_AGE}")
+    with open(os.path.join(STATIC_DIR, "index.html"), "rb") as page_file:
+        page = page_file.read()
+    for path in PAGES:
+        assets[path] = (page, _CONTENT_TYPES[".html"], "no-cache")
+    return assets
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _respond(self) -> None:
+        asset = self.server.assets.get(urlsplit(self.path).path)
+        if asset is None:
+            body, content_type, cache_control = b"Not Found", "text/plain; charset=utf-8", "no-cache"
+            self.send_response(404)
+        else:
+            body, content_type, cache_control = asset
+            self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", cache_control)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    do_GET = do_HEAD = _respond
+
+    def log_message(self, format: str, *args) -> None:
+        """Silence per-request logging."""
+
+
+class LocalAppServer(ThreadingHTTPServer):
+    """Threaded HTTP server running the SauceDemo stand-in on an ephemeral port."""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        """
+        Initialize (and bind) the server.
+
+        Args:
+            host: Interface to bind to
+            port: Port to bind to (0 picks a free ephemeral port)
+        """
+        super().__init__((host, port), _RequestHandler)
+        self.assets = load_assets()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """Base URL of the running server."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "LocalAppServer":
+        """Start serving in a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, name="local-app-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and release the port."""
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "LocalAppServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
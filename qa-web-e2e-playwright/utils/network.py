@@ -0,0 +1,188 @@
+"""
+Network routing layer for browser contexts.
+
+AssetRouter is installed with ``context.route("**/*", ...)`` and
+
+* aborts requests for blocked resource types (by default images, fonts
+  and media) and for URLs of analytics and error-reporting services
+* serves cacheable static assets (by default scripts and stylesheets)
+  from an on-disk cache shared by all contexts and xdist workers
+
+The cache is content addressed: ``blobs/<sha256 of body>`` holds each
+distinct body once, ``urls/<sha256 of URL>.json`` maps a URL to its
+status, headers and blob. Files are written to a temporary name and
+renamed, so concurrent workers never read a partial entry.
+
+Every router counts the requests it blocked or served from the cache and
+the bytes it served, so the saving can be reported per test.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from playwright.sync_api import Error
+
+
+DEFAULT_CACHE_DIR = ".asset-cache"
+DEFAULT_TTL = 24 * 3600
+DEFAULT_BLOCKED_TYPES = ["image", "font", "media"]
+DEFAULT_BLOCKED_URLS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "segment.io",
+    "hotjar.com",
+    "backtrace.io",
+]
+DEFAULT_CACHED_TYPES = ["script", "stylesheet"]
+
+# Response headers that describe the original transfer, not the body we serve
+_HOP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+def write_atomic(path: str, content: bytes) -> None:
+    """Write a file under a temporary name and rename it, so readers never see it partially written."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    with os.fdopen(descriptor, "wb") as temporary_file:
+        temporary_file.write(content)
+    os.replace(temporary, path)
+
+
+class AssetCache:
+    """Content-addressed on-disk store of static asset responses."""
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, ttl: float = DEFAULT_TTL):
+        """
+        Initialize cache.
+
+        Args:
+            directory: Cache directory (shared between workers and runs)
+            ttl: Seconds a stored response is served before it is fetched again
+        """
+        self.directory = directory
+        self.ttl = ttl
+
+    def _url_path(self, url: str) -> str:
+        return os.path.join(self.directory, "urls", hashlib.sha256(url.encode()).hexdigest() + ".json")
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.directory, "blobs", digest)
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a stored response.
+
+        Args:
+            url: Request URL
+
+        Returns:
+            Dict with status, headers and body, or None if missing or expired
+        """
+        try:
+            with open(self._url_path(url), "r", encoding="utf-8") as entry_file:
+                entry = json.load(entry_file)
+            if time.time() - entry["stored"] > self.ttl:
+                return None
+            with open(self._blob_path(entry["blob"]), "rb") as blob_file:
+                body = blob_file.read()
+        except (OSError, ValueError, KeyError):
+            return None
+        return {"status": entry["status"], "headers": entry["headers"], "body": body}
+
+    def put(self, url: str, status: int, headers: Dict[str, str], body: bytes) -> None:
+        """
+        Store a response.
+
+        Args:
+            url: Request URL
+            status: Response status
+            headers: Response headers
+            body: Decoded response body
+        """
+        digest = hashlib.sha256(body).hexdigest()
+        if not os.path.exists(self._blob_path(digest)):
+            write_atomic(self._blob_path(digest), body)
+        headers = {name: value for name, value in headers.items() if name.lower() not in _HOP_HEADERS}
+        entry = {"url": url, "status": status, "headers": headers, "blob": digest, "stored": time.time()}
+        write_atomic(self._url_path(url), json.dumps(entry).encode())
+
+
+def is_cacheable(headers: Dict[str, str]) -> bool:
+    """
+    Check whether response headers allow storing the response.
+
+    Args:
+        headers: Response headers (lower-case names)
+
+    Returns:
+        False for ``Cache-Control: no-store`` or ``private`` responses
+    """
+    cache_control = headers.get("cache-control", "").lower()
+    return "no-store" not in cache_control and "private" not in cache_control
+
+
+class AssetRouter:
+    """Route handler blocking non-essential requests and serving cached assets."""
+
+    def __init__(self, cache: Optional[AssetCache], blocked_types: List[str] = DEFAULT_BLOCKED_TYPES,
+                 blocked_urls: List[str] = DEFAULT_BLOCKED_URLS, cached_types: List[str] = DEFAULT_CACHED_TYPES):
+        """
+        Initialize router.
+
+        Args:
+            cache: Asset cache (None to only block)
+            blocked_types: Playwright resource types to abort
+            blocked_urls: Substrings of URLs to abort
+            cached_types: Resource types served from the cache
+        """
+        self.cache = cache
+        self.blocked_types = set(blocked_types)
+        self.blocked_urls = list(blocked_urls)
+        self.cached_types = set(cached_types)
+        self.stats = {"requests": 0, "blocked": 0, "cache_hits": 0, "cache_misses": 0, "bytes_from_cache": 0}
+
+    def handle(self, route: Any) -> None:
+        """Route handler for context.route("**/*", router.handle)."""
+        request = route.request
+        self.stats["requests"] += 1
+        if request.resource_type in self.blocked_types or any(url in request.url for url in self.blocked_urls):
+            self.stats["blocked"] += 1
+            route.abort("blockedbyclient")
+            return
+        if self.cache is None or request.method != "GET" or request.resource_type not in self.cached_types:
+            route.fallback()
+            return
+
+        cached = self.cache.get(request.url)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            self.stats["bytes_from_cache"] += len(cached["body"])
+            route.fulfill(status=cached["status"], headers=cached["headers"], body=cached["body"])
+            return
+
+        self.stats["cache_misses"] += 1
+        try:
+            response = route.fetch()
+        except Error:
+            route.fallback()
+            return
+        body = response.body()
+        if response.status == 200 and is_cacheable(response.headers):
+            self.cache.put(request.url, response.status, response.headers, body)
+        route.fulfill(response=response, body=body)
+
+    def summary(self) -> str:
+        """
+        One-line description of what the router saved.
+
+        Returns:
+            E.g. "12 requests blocked, 3 served from cache (1.2 MB), 0 cache misses"
+        """
+        megabytes = self.stats["bytes_from_cache"] / 1e6
+        return (f"{self.stats['blocked']} requests blocked, {self.stats['cache_hits']} served from cache "
+                f"({megabytes:.1f} MB), {self.stats['cache_misses']} cache misses")
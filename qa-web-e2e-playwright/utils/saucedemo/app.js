@@ -0,0 +1,316 @@
+/*
+ * Client side of the local SauceDemo stand-in (see utils/local_app.py).
+ *
+ * Like the real application, all state lives in the browser: the logged-in
+ * user in the "session-username" cookie and the cart in the "cart-contents"
+ * localStorage entry (a JSON list of product ids). Each page is rendered
+ * from that state with the same ids and classes as www.saucedemo.com.
+ * CATALOG, USERS and PASSWORD come from /static/catalog.js.
+ */
+(function () {
+  "use strict";
+
+  var SESSION_COOKIE = "session-username";
+  var CART_KEY = "cart-contents";
+  var SESSION_SECONDS = 600;
+  var TAX_RATE = 0.08;
+  var LOCKED_OUT_USER = "locked_out_user";
+
+  var root = document.getElementById("root");
+
+  function sessionUser() {
+    var match = document.cookie.match(new RegExp("(?:^|; )" + SESSION_COOKIE + "=([^;]*)"));
+    return match ? decodeURIComponent(match[1]) : null;
+  }
+
+  function getCart() {
+    try {
+      return JSON.parse(localStorage.getItem(CART_KEY)) || [];
+    } catch (error) {
+      return [];
+    }
+  }
+
+  function setCart(ids) {
+    if (ids.length) {
+      localStorage.setItem(CART_KEY, JSON.stringify(ids));
+    } else {
+      localStorage.removeItem(CART_KEY);
+    }
+  }
+
+  function product(id) {
+    return CATALOG.filter(function (item) { return item.id === id; })[0];
+  }
+
+  function cartProducts() {
+    return getCart().map(product).filter(Boolean);
+  }
+
+  function slug(name) {
+    return name.toLowerCase().replace(/[^a-z0-9]+/g, "-").replace(/^-|-$/g, "");
+  }
+
+  function escape(text) {
+    return String(text).replace(/[&<>"']/g, function (c) {
+      return {"&": "&amp;", "<": "&lt;", ">": "&gt;", "\"": "&quot;", "'": "&#39;"}[c];
+    });
+  }
+
+  function money(value) {
+    return "$" + value.toFixed(2);
+  }
+
+  function go(path) {
+    window.location.href = path;
+  }
+
+  function errorBox(error) {
+    return '<div class="error-message-container' + (error ? " error" : "") + '">' +
+      (error ? '<h3 data-test="error">' + escape(error) + "</h3>" : "") + "</div>";
+  }
+
+  function cartButton(item) {
+    if (getCart().indexOf(item.id) >= 0) {
+      return '<button class="btn btn_secondary btn_small" id="remove-' + slug(item.name) + '" data-remove="' +
+        item.id + '">Remove</button>';
+    }
+    return '<button class="btn btn_primary btn_small" id="add-to-cart-' + slug(item.name) + '" data-add="' +
+      item.id + '">Add to cart</button>';
+  }
+
+  function header(title) {
+    var count = getCart().length;
+    return '<div id="header_container" class="header_container">' +
+      '<div class="bm-menu-wrap" id="menu">' +
+      '<nav class="bm-item-list">' +
+      '<a id="inventory_sidebar_link" class="bm-item menu-item" href="/inventory.html">All Items</a>' +
+      '<a id="logout_sidebar_link" class="bm-item menu-item" href="#" data-action="logout">Logout</a>' +
+      '<a id="reset_sidebar_link" class="bm-item menu-item" href="#" data-action="reset">Reset App State</a>' +
+      "</nav>" +
+      '<button id="react-burger-cross-btn" type="button" data-action="close-menu">Close Menu</button>' +
+      "</div>" +
+      '<div class="primary_header">' +
+      '<button id="react-burger-menu-btn" type="button" data-action="open-menu">Open Menu</button>' +
+      '<div class="app_logo">Swag Labs</div>' +
+      '<div id="shopping_cart_container" class="shopping_cart_container">' +
+      '<a class="shopping_cart_link" data-test="shopping-cart-link" href="/cart.html">' +
+      (count ? '<span class="shopping_cart_badge" data-test="shopping-cart-badge">' + count + "</span>" : "") +
+      "</a></div></div>" +
+      '<div class="header_secondary_container"><span class="title" data-test="title">' + escape(title) +
+      "</span></div></div>";
+  }
+
+  function cartItem(item, removable) {
+    return '<div class="cart_item" data-test="inventory-item">' +
+      '<div class="cart_quantity">1</div>' +
+      '<div class="cart_item_label">' +
+      '<div class="inventory_item_name" data-test="inventory-item-name">' + escape(item.name) + "</div>" +
+      '<div class="inventory_item_desc">' + escape(item.description) + "</div>" +
+      '<div class="item_pricebar"><div class="inventory_item_price">' + money(item.price) + "</div>" +
+      (removable ? cartButton(item) : "") + "</div></div></div>";
+  }
+
+  function renderLogin(error, username, password) {
+    root.innerHTML = '<div class="login_logo">Swag Labs</div>' +
+      '<div class="login_wrapper"><form id="login-form">' +
+      '<input class="form_input" placeholder="Username" type="text" data-test="username" id="user-name" ' +
+      'name="user-name" autocorrect="off" autocapitalize="none">' +
+      '<input class="form_input" placeholder="Password" type="password" data-test="password" id="password" ' +
+      'name="password">' +
+      errorBox(error) +
+      '<input type="submit" class="submit-button btn_action" data-test="login-button" id="login-button" ' +
+      'name="login-button" value="Login">' +
+      "</form></div>";
+    document.getElementById("user-name").value = username || "";
+    document.getElementById("password").value = password || "";
+    document.getElementById("login-form").addEventListener("submit", function (event) {
+      event.preventDefault();
+      var user = document.getElementById("user-name").value;
+      var secret = document.getElementById("password").value;
+      if (!user) {
+        renderLogin("Epic sadface: Username is required", user, secret);
+      } else if (!secret) {
+        renderLogin("Epic sadface: Password is required", user, secret);
+      } else if (USERS.indexOf(user) < 0 || secret !== PASSWORD) {
+        renderLogin("Epic sadface: Username and password do not match any user in this service", user, secret);
+      } else if (user === LOCKED_OUT_USER) {
+        renderLogin("Epic sadface: Sorry, this user has been locked out.", user, secret);
+      } else {
+        document.cookie = SESSION_COOKIE + "=" + encodeURIComponent(user) + "; path=/; max-age=" + SESSION_SECONDS;
+        go("/inventory.html");
+      }
+    });
+  }
+
+  function renderInventory() {
+    root.innerHTML = header("Products") +
+      '<div class="inventory_container"><div class="inventory_list" data-test="inventory-list">' +
+      CATALOG.map(function (item) {
+        return '<div class="inventory_item" data-test="inventory-item">' +
+          '<div class="inventory_item_description"><div class="inventory_item_label">' +
+          '<a id="item_' + item.id + '_title_link" href="/inventory-item.html?id=' + item.id + '">' +
+          '<div class="inventory_item_name" data-test="inventory-item-name">' + escape(item.name) + "</div></a>" +
+          '<div class="inventory_item_desc">' + escape(item.description) + "</div></div>" +
+          '<div class="pricebar"><div class="inventory_item_price">' + money(item.price) + "</div>" +
+          cartButton(item) + "</div></div></div>";
+      }).join("") +
+      "</div></div>";
+  }
+
+  function renderItem() {
+    var item = product(Number(new URLSearchParams(window.location.search).get("id")));
+    if (!item) {
+      root.innerHTML = header("") + '<div class="inventory_details"><div class="inventory_details_name">' +
+        "ITEM NOT FOUND</div></div>";
+      return;
+    }
+    root.innerHTML = header("") +
+      '<div class="inventory_details"><button id="back-to-products" data-go="/inventory.html">Back to products</button>' +
+      '<div class="inventory_details_name large_size" data-test="inventory-item-name">' + escape(item.name) + "</div>" +
+      '<div class="inventory_details_desc large_size">' + escape(item.description) + "</div>" +
+      '<div class="inventory_details_price">' + money(item.price) + "</div>" + cartButton(item) + "</div>";
+  }
+
+  function renderCart() {
+    root.innerHTML = header("Your Cart") +
+      '<div id="cart_contents_container" class="cart_contents_container"><div class="cart_list">' +
+      '<div class="cart_quantity_label">QTY</div><div class="cart_desc_label">Description</div>' +
+      cartProducts().map(function (item) { return cartItem(item, true); }).join("") +
+      '</div><div class="cart_footer">' +
+      '<button id="continue-shopping" class="btn btn_secondary back" data-go="/inventory.html">Continue Shopping</button>' +
+      '<button id="checkout" class="btn btn_action checkout_button" data-go="/checkout-step-one.html">Checkout</button>' +
+      "</div></div>";
+  }
+
+  function renderCheckoutInformation(error, values) {
+    values = values || {};
+    root.innerHTML = header("Checkout: Your Information") +
+      '<div id="checkout_info_container" class="checkout_info_container"><form id="checkout-form">' +
+      '<div class="checkout_info">' +
+      '<input class="form_input" placeholder="First Name" type="text" data-test="firstName" id="first-name">' +
+      '<input class="form_input" placeholder="Last Name" type="text" data-test="lastName" id="last-name">' +
+      '<input class="form_input" placeholder="Zip/Postal Code" type="text" data-test="postalCode" id="postal-code">' +
+      errorBox(error) + "</div>" +
+      '<div class="checkout_buttons">' +
+      '<button id="cancel" class="btn btn_secondary back cart_cancel_link" type="button" data-go="/cart.html">' +
+      "Cancel</button>" +
+      '<input type="submit" class="submit-button btn btn_primary cart_button btn_action" data-test="continue" ' +
+      'id="continue" name="continue" value="Continue">' +
+      "</div></form></div>";
+    ["first-name", "last-name", "postal-code"].forEach(function (id) {
+      document.getElementById(id).value = values[id] || "";
+    });
+    document.getElementById("checkout-form").addEventListener("submit", function (event) {
+      event.preventDefault();
+      var entered = {};
+      ["first-name", "last-name", "postal-code"].forEach(function (id) {
+        entered[id] = document.getElementById(id).value;
+      });
+      if (!entered["first-name"]) {
+        renderCheckoutInformation("Error: First Name is required", entered);
+      } else if (!entered["last-name"]) {
+        renderCheckoutInformation("Error: Last Name is required", entered);
+      } else if (!entered["postal-code"]) {
+        renderCheckoutInformation("Error: Postal Code is required", entered);
+      } else {
+        go("/checkout-step-two.html");
+      }
+    });
+  }
+
+  function renderCheckoutOverview() {
+    var items = cartProducts();
+    var subtotal = items.reduce(function (sum, item) { return sum + item.price; }, 0);
+    var tax = Math.round(subtotal * TAX_RATE * 100) / 100;
+    root.innerHTML = header("Checkout: Overview") +
+      '<div id="checkout_summary_container" class="checkout_summary_container"><div class="cart_list">' +
+      items.map(function (item) { return cartItem(item, false); }).join("") +
+      "</div>" +
+      '<div class="summary_info">' +
+      '<div class="summary_info_label">Payment Information:</div>' +
+      '<div class="summary_value_label">SauceCard #31337</div>' +
+      '<div class="summary_info_label">Shipping Information:</div>' +
+      '<div class="summary_value_label">Free Pony Express Delivery!</div>' +
+      '<div class="summary_info_label">Price Total</div>' +
+      '<div class="summary_subtotal_label" data-test="subtotal-label">Item total: ' + money(subtotal) + "</div>" +
+      '<div class="summary_tax_label" data-test="tax-label">Tax: ' + money(tax) + "</div>" +
+      '<div class="summary_info_label summary_total_label" data-test="total-label">Total: ' +
+      money(subtotal + tax) + "</div>" +
+      '<div class="cart_footer">' +
+      '<button id="cancel" class="btn btn_secondary back cart_cancel_link" data-go="/inventory.html">Cancel</button>' +
+      '<button id="finish" class="btn btn_action cart_button" data-action="finish">Finish</button>' +
+      "</div></div></div>";
+  }
+
+  function renderCheckoutComplete() {
+    root.innerHTML = header("Checkout: Complete!") +
+      '<div id="checkout_complete_container" class="checkout_complete_container">' +
+      '<h2 class="complete-header" data-test="complete-header">Thank you for your order!</h2>' +
+      '<div class="complete-text">Your order has been dispatched, and will arrive just as fast as the pony ' +
+      "can get there!</div>" +
+      '<button id="back-to-products" class="btn btn_primary btn_small" data-go="/inventory.html">Back Home</button>' +
+      "</div>";
+  }
+
+  var PAGES = {
+    "/inventory.html": renderInventory,
+    "/inventory-item.html": renderItem,
+    "/cart.html": renderCart,
+    "/checkout-step-one.html": function () { renderCheckoutInformation(); },
+    "/checkout-step-two.html": renderCheckoutOverview,
+    "/checkout-complete.html": renderCheckoutComplete
+  };
+
+  var path = window.location.pathname;
+
+  function render() {
+    PAGES[path]();
+  }
+
+  root.addEventListener("click", function (event) {
+    var target = event.target.closest("[data-add], [data-remove], [data-go], [data-action]");
+    if (!target) {
+      return;
+    }
+    var cart = getCart();
+    if (target.hasAttribute("data-add")) {
+      cart.push(Number(target.getAttribute("data-add")));
+      setCart(cart);
+      render();
+    } else if (target.hasAttribute("data-remove")) {
+      var id = Number(target.getAttribute("data-remove"));
+      setCart(cart.filter(function (other) { return other !== id; }));
+      render();
+    } else if (target.hasAttribute("data-go")) {
+      go(target.getAttribute("data-go"));
+    } else {
+      event.preventDefault();
+      var action = target.getAttribute("data-action");
+      var menu = document.getElementById("menu");
+      if (action === "open-menu") {
+        menu.classList.add("open");
+      } else if (action === "close-menu") {
+        menu.classList.remove("open");
+      } else if (action === "reset") {
+        setCart([]);
+        render();
+      } else if (action === "logout") {
+        document.cookie = SESSION_COOKIE + "=; path=/; max-age=0";
+        go("/");
+      } else if (action === "finish") {
+        setCart([]);
+        go("/checkout-complete.html");
+      }
+    }
+  });
+
+  if (!PAGES[path]) {
+    renderLogin();
+  } else if (!sessionUser()) {
+    window.history.replaceState(null, "", "/");
+    renderLogin("Epic sadface: You can only access '" + path + "' when you are logged in.");
+  } else {
+    render();
+  }
+})();